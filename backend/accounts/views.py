@@ -6,6 +6,7 @@ from django.contrib.auth import get_user_model
 from django.conf import settings
 from .serializers import UserSerializer
 import requests
+from core.timing import track_external
 
 User = get_user_model()
 
@@ -33,26 +34,28 @@ class GoogleCallbackView(APIView):
             return Response({"error": "Código não fornecido"}, status=400)
 
         try:
-            token_res = requests.post(
-                "https://oauth2.googleapis.com/token",
-                data={
-                    "code": code,
-                    "client_id": settings.GOOGLE_OAUTH_CLIENT_ID,
-                    "client_secret": settings.GOOGLE_OAUTH_CLIENT_SECRET,
-                    "redirect_uri": settings.GOOGLE_OAUTH_REDIRECT_URI,
-                    "grant_type": "authorization_code",
-                },
-                timeout=10
-            )
+            with track_external("google"):
+                token_res = requests.post(
+                    "https://oauth2.googleapis.com/token",
+                    data={
+                        "code": code,
+                        "client_id": settings.GOOGLE_OAUTH_CLIENT_ID,
+                        "client_secret": settings.GOOGLE_OAUTH_CLIENT_SECRET,
+                        "redirect_uri": settings.GOOGLE_OAUTH_REDIRECT_URI,
+                        "grant_type": "authorization_code",
+                    },
+                    timeout=10
+                )
             token_data = token_res.json()
             if "error" in token_data:
                 return Response(token_data, status=400)
 
-            userinfo_res = requests.get(
-                "https://www.googleapis.com/oauth2/v2/userinfo",
-                headers={"Authorization": f"Bearer {token_data['access_token']}"},
-                timeout=10
-            )
+            with track_external("google"):
+                userinfo_res = requests.get(
+                    "https://www.googleapis.com/oauth2/v2/userinfo",
+                    headers={"Authorization": f"Bearer {token_data['access_token']}"},
+                    timeout=10
+                )
             userinfo = userinfo_res.json()
             email = userinfo.get("email")
             name = userinfo.get("name", email.split("@")[0])
@@ -0,0 +1,93 @@
+from prometheus_client import Histogram
+from core.timing import current_timings
+
+LABELS = ["view", "action", "method"]
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+route_latency_seconds = Histogram(
+    "django_route_latency_seconds",
+    "Latência por rota (viewset/ação DRF).",
+    LABELS,
+    buckets=LATENCY_BUCKETS,
+)
+route_db_queries = Histogram(
+    "django_route_db_queries",
+    "Consultas SQL por requisição, por rota.",
+    LABELS,
+    buckets=QUERY_BUCKETS,
+)
+route_db_seconds = Histogram(
+    "django_route_db_seconds",
+    "Tempo em SQL por requisição, por rota.",
+    LABELS,
+    buckets=LATENCY_BUCKETS,
+)
+route_external_seconds = Histogram(
+    "django_route_external_seconds",
+    "Tempo em chamadas HTTP externas (LLM, OAuth) por requisição, por rota.",
+    LABELS,
+    buckets=LATENCY_BUCKETS,
+)
+route_render_seconds = Histogram(
+    "django_route_render_seconds",
+    "Tempo de renderização (serialização JSON/CSV) da resposta, por rota.",
+    LABELS,
+    buckets=LATENCY_BUCKETS,
+)
+route_response_bytes = Histogram(
+    "django_route_response_bytes",
+    "Tamanho do corpo da resposta, por rota (streaming fica de fora).",
+    LABELS,
+    buckets=SIZE_BUCKETS,
+)
+
+def view_labels(request, view_func):
+    """
+    (view, action) de uma view resolvida: classe e ação do viewset DRF
+    (list, stats, balance_series...); APIViews usam o método HTTP como ação.
+    """
+    method = request.method.lower()
+    cls = getattr(view_func, "cls", None)
+    if cls is None:
+        name = getattr(request.resolver_match, "view_name", None) or view_func.__name__
+        return name, method
+    actions = getattr(view_func, "actions", None) or {}
+    return cls.__name__, actions.get(method, method)
+
+class RouteMetricsMiddleware:
+    """
+    Histogramas Prometheus por rota: latência, nº e tempo de SQL, chamadas
+    externas, renderização e tamanho da resposta. Lê os tempos medidos pelo ServerTimingMiddleware,
+    que precisa vir antes na lista de middlewares; a observação acontece quando
+    a resposta termina, então respostas streaming contam o corpo inteiro.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        labels = getattr(request, "_route_metric_labels", None)
+        timings = current_timings()
+        if labels is None or timings is None:
+            return response
+
+        view, action = labels
+        values = {"view": view, "action": action, "method": request.method}
+        timings.on_finish(lambda: self._observe(values, timings, response))
+        return response
+
+    def _observe(self, values, timings, response):
+        route_latency_seconds.labels(**values).observe(timings.total_ms / 1000)
+        route_db_queries.labels(**values).observe(timings.db_count)
+        route_db_seconds.labels(**values).observe(timings.db_ms / 1000)
+        route_external_seconds.labels(**values).observe(timings.external_ms / 1000)
+        route_render_seconds.labels(**values).observe(timings.render_ms / 1000)
+        if not response.streaming:
+            route_response_bytes.labels(**values).observe(len(response.content))
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._route_metric_labels = view_labels(request, view_func)
@@ -42,6 +42,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django_prometheus.middleware.PrometheusBeforeMiddleware',
+    'core.timing.ServerTimingMiddleware',
+    'core.metrics.RouteMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -77,7 +79,8 @@ AUTH_USER_MODEL = 'accounts.User'
 DB_HOST = 'localhost' if os.environ.get('GITHUB_ACTIONS') == 'true' else 'db'
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        # backend instrumentado: consultas, erros e conexões no /metrics
+        'ENGINE': 'django_prometheus.db.backends.postgresql',
         'NAME': os.environ.get('POSTGRES_DB'),
         'USER': os.environ.get('POSTGRES_USER'),
         'PASSWORD': os.environ.get('POSTGRES_PASSWORD'),
@@ -155,4 +158,20 @@ CORS_ALLOWED_ORIGINS = [FRONTEND_ORIGIN, *LOCAL_FRONTENDS]
 CSRF_TRUSTED_ORIGINS = [FRONTEND_ORIGIN, *LOCAL_FRONTENDS]
 
 GROQ_API_KEY = os.environ.get("GROQ_API_KEY", "")
-GROQ_MODEL = os.environ.get("GROQ_MODEL", "openai/gpt-oss-120b")
\ No newline at end of file
+GROQ_MODEL = os.environ.get("GROQ_MODEL", "openai/gpt-oss-120b")
+# respostas analíticas cacheadas por (usuário, parâmetros, versão dos dados);
+# o TTL só limita memória, a invalidação vem da versão
+FINANCE_ANALYTICS_CACHE_TIMEOUT = int(os.environ.get("FINANCE_ANALYTICS_CACHE_TIMEOUT", "86400"))
+
+# pool local de jobs em segundo plano (importações); EAGER roda na própria thread
+FINANCE_JOB_WORKERS = int(os.environ.get("FINANCE_JOB_WORKERS", "2"))
+FINANCE_JOBS_EAGER = os.environ.get("FINANCE_JOBS_EAGER", "false").lower() == "true"
+# job PENDING/RUNNING sem atualização há mais que isso é dado como perdido (FAILED) na consulta
+FINANCE_JOB_STALE_MINUTES = int(os.environ.get("FINANCE_JOB_STALE_MINUTES", "30"))
+# arquivos de importação até este tamanho são processados na própria requisição
+FINANCE_IMPORT_SYNC_MAX_BYTES = int(os.environ.get("FINANCE_IMPORT_SYNC_MAX_BYTES", str(256 * 1024)))
+
+# Server-Timing: SQL, render e HTTP externo por requisição; DEBUG expõe as
+# consultas mais lentas para staff (?debug_sql=1)
+SERVER_TIMING_DEBUG = os.environ.get("SERVER_TIMING_DEBUG", "false").lower() == "true"
+SERVER_TIMING_SLOW_QUERIES = int(os.environ.get("SERVER_TIMING_SLOW_QUERIES", "5"))
@@ -0,0 +1,53 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from prometheus_client import REGISTRY
+from rest_framework.test import APIClient
+
+User = get_user_model()
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+class RouteMetricsMiddlewareTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="m@example.com", password="123", name="M")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_observes_viewset_action(self):
+        labels = {"view": "TransactionViewSet", "action": "stats", "method": "GET"}
+        before = _sample("django_route_latency_seconds_count", **labels)
+        queries_before = _sample("django_route_db_queries_sum", **labels)
+        bytes_before = _sample("django_route_response_bytes_sum", **labels)
+
+        response = self.client.get("/api/finance/transactions/stats/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(_sample("django_route_latency_seconds_count", **labels), before + 1)
+        self.assertGreater(_sample("django_route_db_queries_sum", **labels), queries_before)
+        self.assertEqual(
+            _sample("django_route_response_bytes_sum", **labels) - bytes_before, len(response.content)
+        )
+
+    def test_streaming_response_is_observed_after_the_body(self):
+        labels = {"view": "TransactionViewSet", "action": "export", "method": "GET"}
+        before = _sample("django_route_latency_seconds_count", **labels)
+        queries_before = _sample("django_route_db_queries_sum", **labels)
+
+        response = self.client.get("/api/finance/transactions/export/")
+        self.assertEqual(_sample("django_route_latency_seconds_count", **labels), before)
+
+        b"".join(response.streaming_content)
+        self.assertEqual(_sample("django_route_latency_seconds_count", **labels), before + 1)
+        self.assertGreater(_sample("django_route_db_queries_sum", **labels), queries_before)
+
+    def test_list_and_apiview_labels(self):
+        wallets = {"view": "WalletViewSet", "action": "list", "method": "GET"}
+        me = {"view": "MeView", "action": "get", "method": "GET"}
+        before = (_sample("django_route_db_seconds_count", **wallets), _sample("django_route_db_seconds_count", **me))
+
+        self.client.get("/api/finance/wallets/")
+        self.client.get("/api/accounts/auth/me/")
+
+        self.assertEqual(_sample("django_route_db_seconds_count", **wallets), before[0] + 1)
+        self.assertEqual(_sample("django_route_db_seconds_count", **me), before[1] + 1)
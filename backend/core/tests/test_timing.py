@@ -0,0 +1,73 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from core.timing import RequestTimings, track_external, current_timings
+
+User = get_user_model()
+
+def _entries(header):
+    return {part.strip().split(";")[0]: part.strip() for part in header.split(",")}
+
+class ServerTimingMiddlewareTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="t@example.com", password="123", name="T")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_header_reports_db_app_render_and_total(self):
+        response = self.client.get("/api/finance/wallets/")
+        self.assertEqual(response.status_code, 200)
+        entries = _entries(response["Server-Timing"])
+        self.assertEqual(set(entries), {"db", "app", "render", "total"})
+        self.assertRegex(entries["db"], r'^db;dur=[\d.]+;desc="[1-9]\d* queries"$')
+        self.assertNotIn("sql-1", entries)
+
+    def test_timing_allow_origin_only_for_known_frontends(self):
+        response = self.client.get("/api/finance/wallets/", HTTP_ORIGIN="http://localhost:3000")
+        self.assertEqual(response["Timing-Allow-Origin"], "http://localhost:3000")
+        response = self.client.get("/api/finance/wallets/", HTTP_ORIGIN="http://evil.example")
+        self.assertFalse(response.has_header("Timing-Allow-Origin"))
+
+    def test_streaming_header_has_no_partial_db_entry(self):
+        response = self.client.get("/api/finance/transactions/export/")
+        self.assertEqual(response.status_code, 200)
+        entries = _entries(response["Server-Timing"])
+        self.assertEqual(set(entries), {"total"})
+        b"".join(response.streaming_content)
+
+    @override_settings(SERVER_TIMING_DEBUG=True, SERVER_TIMING_SLOW_QUERIES=2)
+    def test_debug_sql_only_for_staff(self):
+        response = self.client.get("/api/finance/wallets/", {"debug_sql": "1"})
+        self.assertNotIn("sql-1", _entries(response["Server-Timing"]))
+
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get("/api/finance/wallets/", HTTP_X_DEBUG_SQL="1")
+        entries = _entries(response["Server-Timing"])
+        self.assertIn("sql-1", entries)
+        self.assertIn("sql-2", entries)
+        self.assertNotIn("sql-3", entries)
+        self.assertIn('desc="SELECT', response["Server-Timing"])
+
+class RequestTimingsTests(TestCase):
+    def test_finish_runs_callbacks_once(self):
+        timings = RequestTimings()
+        calls = []
+        timings.on_finish(lambda: calls.append(1))
+        timings.finish()
+        timings.finish()
+        self.assertEqual(calls, [1])
+
+    def test_external_calls_outside_a_request_are_ignored(self):
+        self.assertIsNone(current_timings())
+        with track_external("llm"):
+            pass
+
+    def test_server_timing_escapes_sql_and_lists_external_calls(self):
+        timings = RequestTimings(keep_queries=True)
+        timings.queries.append((3.0, 'SELECT "a"\n  FROM b'))
+        timings.add_external("llm", 120.0)
+        timings.add_external("llm", 30.0)
+        header = timings.server_timing(slow_queries=1)
+        self.assertIn('ext-llm;dur=150.0;desc="2 calls"', header)
+        self.assertIn('sql-1;dur=3.0;desc="SELECT \\"a\\" FROM b"', header)
@@ -0,0 +1,182 @@
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import connections
+
+_current = ContextVar("request_timings", default=None)
+
+def _ms(started):
+    return (time.perf_counter() - started) * 1000
+
+def _quote(text):
+    return '"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+class RequestTimings:
+    """
+    Tempos de uma requisição: SQL (via execute_wrapper em todas as conexões),
+    renderização da resposta e chamadas HTTP externas (track_external).
+    Callbacks de on_finish rodam quando a resposta termina: logo após a view
+    ou, em respostas streaming, depois do último pedaço do corpo.
+    """
+
+    def __init__(self, keep_queries=False):
+        self.started = time.perf_counter()
+        self.db_ms = 0.0
+        self.db_count = 0
+        self.render_ms = 0.0
+        self.external = {}
+        self.keep_queries = keep_queries
+        self.queries = []
+        self._finish_callbacks = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = _ms(started)
+            self.db_ms += elapsed
+            self.db_count += 1
+            if self.keep_queries:
+                self.queries.append((elapsed, sql))
+
+    @property
+    def total_ms(self):
+        return _ms(self.started)
+
+    @property
+    def external_ms(self):
+        return sum(ms for ms, _ in self.external.values())
+
+    def add_external(self, name, elapsed, calls=1):
+        ms, count = self.external.get(name, (0.0, 0))
+        self.external[name] = (ms + elapsed, count + calls)
+
+    def on_finish(self, callback):
+        self._finish_callbacks.append(callback)
+
+    def finish(self):
+        callbacks, self._finish_callbacks = self._finish_callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def slowest(self, limit):
+        return sorted(self.queries, key=lambda q: q[0], reverse=True)[:limit]
+
+    def server_timing(self, slow_queries=0):
+        total = self.total_ms
+        # app: tudo que não é SQL, renderização ou HTTP externo (view, serializers, permissões)
+        app = max(0.0, total - self.db_ms - self.render_ms - self.external_ms)
+        entries = [
+            f'db;dur={self.db_ms:.1f};desc="{self.db_count} queries"',
+            f"app;dur={app:.1f}",
+            f"render;dur={self.render_ms:.1f}",
+        ]
+        for name, (ms, count) in sorted(self.external.items()):
+            entries.append(f'ext-{name};dur={ms:.1f};desc="{count} calls"')
+        for index, (ms, sql) in enumerate(self.slowest(slow_queries), start=1):
+            entries.append(f"sql-{index};dur={ms:.1f};desc={_quote(' '.join(sql.split())[:200])}")
+        entries.append(f"total;dur={total:.1f}")
+        return ", ".join(entries)
+
+    def streaming_server_timing(self):
+        # o header sai antes do corpo: SQL e chamadas externas feitas durante o
+        # stream ainda não aconteceram, então só o tempo até o início é informado
+        return f'total;dur={self.total_ms:.1f};desc="até o início do stream"'
+
+def current_timings():
+    return _current.get()
+
+@contextmanager
+def _measuring(timings):
+    token = _current.set(timings)
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timings))
+            yield
+    finally:
+        _current.reset(token)
+
+@contextmanager
+def track_external(name, calls=1):
+    """
+    Conta o bloco como chamada HTTP externa (LLM, OAuth) da requisição atual.
+    calls=0 soma só o tempo, para a leitura em partes de uma chamada já contada.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings = _current.get()
+        if timings is not None:
+            timings.add_external(name, _ms(started), calls=calls)
+
+class ServerTimingMiddleware:
+    """
+    Header Server-Timing em todas as respostas: db (tempo e nº de consultas),
+    app, render, ext-<serviço> e total. Com SERVER_TIMING_DEBUG ligado, usuários
+    staff que mandam ?debug_sql=1 (ou X-Debug-SQL: 1) recebem também as
+    consultas mais lentas como entradas sql-N.
+
+    Respostas streaming (export CSV, SSE) fazem SQL e chamadas externas enquanto
+    o corpo é gerado, depois do header: nelas o header traz só o total até o
+    início do stream, e a medição continua pedaço a pedaço até o fim do corpo
+    para quem usa on_finish (métricas por rota).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = RequestTimings(keep_queries=settings.SERVER_TIMING_DEBUG)
+        with _measuring(timings):
+            response = self.get_response(request)
+
+        if response.streaming:
+            response["Server-Timing"] = timings.streaming_server_timing()
+            if response.is_async:
+                timings.finish()
+            else:
+                response.streaming_content = self._measure_stream(response.streaming_content, timings)
+        else:
+            slow = settings.SERVER_TIMING_SLOW_QUERIES if self._debug_sql(request) else 0
+            response["Server-Timing"] = timings.server_timing(slow_queries=slow)
+            timings.finish()
+        origin = request.headers.get("Origin")
+        if origin and origin in settings.CORS_ALLOWED_ORIGINS:
+            response["Timing-Allow-Origin"] = origin
+        return response
+
+    def _measure_stream(self, content, timings):
+        # mede cada next() (o corpo pode rodar em outra thread sob ASGI) e fecha
+        # a medição quando o stream acaba ou o cliente desconecta
+        iterator = iter(content)
+        try:
+            while True:
+                with _measuring(timings):
+                    chunk = next(iterator, None)
+                if chunk is None:
+                    return
+                yield chunk
+        finally:
+            timings.finish()
+
+    def process_template_response(self, request, response):
+        # respostas DRF são renderizadas depois da view; mede até o post-render
+        timings = _current.get()
+        if timings is not None:
+            started = time.perf_counter()
+
+            def rendered(response):
+                timings.render_ms += _ms(started)
+            response.add_post_render_callback(rendered)
+        return response
+
+    def _debug_sql(self, request):
+        if not settings.SERVER_TIMING_DEBUG:
+            return False
+        user = getattr(request, "user", None)
+        wants = request.GET.get("debug_sql") == "1" or request.headers.get("X-Debug-SQL") == "1"
+        return wants and bool(user and user.is_staff)
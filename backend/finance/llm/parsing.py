@@ -0,0 +1,149 @@
+import json
+import re
+
+def extract_json(content: str):
+    """JSON da resposta do modelo, tolerando cercas de código, vírgulas sobrando e truncamento."""
+    if not content:
+        return None
+
+    s = content.strip()
+    if s.startswith("```"):
+        s = re.sub(r"^```[a-zA-Z0-9_-]*\s*", "", s)
+        s = s.replace("```", "").strip()
+
+    start = s.find("{")
+    end = s.rfind("}")
+    if start == -1 or end == -1:
+        return None
+
+    candidate = s[start:end + 1]
+
+    try:
+        return json.loads(candidate)
+    except json.JSONDecodeError:
+        pass
+
+    candidate = re.sub(r",(\s*[}\]])", r"\1", candidate)
+
+    try:
+        return json.loads(candidate)
+    except json.JSONDecodeError:
+        pass
+
+    try:
+        in_string = False
+        escape = False
+
+        for char in candidate:
+            if escape:
+                escape = False
+                continue
+            if char == '\\':
+                escape = True
+                continue
+            if char == '"':
+                in_string = not in_string
+
+        if in_string:
+            candidate += '"'
+
+        candidate = re.sub(r'[,:](\s*)$', r'\1', candidate)
+
+        open_brackets = candidate.count("[") - candidate.count("]")
+        open_braces = candidate.count("{") - candidate.count("}")
+
+        if open_brackets > 0:
+            candidate += "]" * open_brackets
+        if open_braces > 0:
+            candidate += "}" * open_braces
+
+        return json.loads(candidate)
+    except Exception:
+        return None
+
+
+PLAN_SECTIONS = ("overview", "strategy", "goals", "risks")
+
+class PlanSectionParser:
+    """
+    Lê o JSON do plano (PLAN_SCHEMA_HINT) aos pedaços, como chega do streaming,
+    e devolve o título e cada seção de "spec" assim que ela fecha, sem esperar
+    o resto da resposta.
+    """
+
+    def __init__(self, sections=PLAN_SECTIONS):
+        self.sections = set(sections)
+        self.text = ""
+        self.pos = 0
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.string_start = None
+        self.last_string = None
+        self.expect_value = False
+        self.keys = {}
+        self.value_start = None
+        self.emitted = set()
+
+    def feed(self, chunk):
+        """Acrescenta um trecho; retorna [(nome, valor)] do que fechou nele."""
+        self.text += chunk
+        text = self.text
+        done = []
+
+        for i in range(self.pos, len(text)):
+            ch = text[i]
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == "\\":
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+                    self.last_string = text[self.string_start:i + 1]
+                    if self.expect_value:
+                        self.expect_value = False
+                        if self.depth == 1 and self.keys.get(1) == "title":
+                            self._emit(done, "title", self.last_string)
+                continue
+
+            if ch == '"':
+                self.in_string = True
+                self.string_start = i
+            elif ch == ":":
+                self.keys[self.depth] = _loads(self.last_string)
+                self.expect_value = True
+            elif ch == ",":
+                self.keys.pop(self.depth, None)
+                self.expect_value = False
+            elif ch in "{[":
+                if self.depth == 2 and self.expect_value and self._watching():
+                    self.value_start = i
+                self.expect_value = False
+                self.depth += 1
+            elif ch in "}]":
+                self.keys.pop(self.depth, None)
+                self.depth -= 1
+                if self.depth == 2 and self.value_start is not None:
+                    self._emit(done, self.keys.get(2), text[self.value_start:i + 1])
+                    self.value_start = None
+
+        self.pos = len(text)
+        return done
+
+    def _watching(self):
+        section = self.keys.get(2)
+        return self.keys.get(1) == "spec" and section in self.sections and section not in self.emitted
+
+    def _emit(self, done, name, raw):
+        value = _loads(raw)
+        if value is None or name in self.emitted:
+            return
+        self.emitted.add(name)
+        done.append((name, value))
+
+def _loads(raw):
+    try:
+        return json.loads(raw) if raw else None
+    except json.JSONDecodeError:
+        return None
@@ -0,0 +1,57 @@
+import json
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from finance.services.benchmark import compare_reports, run_benchmarks
+
+User = get_user_model()
+
+class Command(BaseCommand):
+	help = (
+		"Mede as leituras da API (latência p50/p95, consultas, memória) sobre um banco populado "
+		"(ex.: seed_finance) e grava JSON comparável entre commits. Limpa o cache a cada iteração."
+	)
+
+	def add_arguments(self, parser):
+		parser.add_argument("--user", default="seed0@seed.local", help="E-mail ou id do usuário medido.")
+		parser.add_argument("--iterations", type=int, default=20)
+		parser.add_argument("--warmup", type=int, default=2)
+		parser.add_argument("--warm-cache", action="store_true", help="Não limpa o cache entre iterações.")
+		parser.add_argument("--only", action="append", help="Prefixo dos casos a medir (pode repetir), ex.: transactions.")
+		parser.add_argument("--output", help="Arquivo JSON de saída.")
+		parser.add_argument("--compare", help="Relatório JSON de referência; falha se houver regressão.")
+		parser.add_argument("--threshold", type=float, default=20.0, help="Regressão tolerada no p95, em %%.")
+
+	def handle(self, *args, **options):
+		lookup = {"pk": options["user"]} if str(options["user"]).isdigit() else {"email": options["user"]}
+		user = User.objects.filter(**lookup).first()
+		if user is None:
+			raise CommandError(f"Usuário {options['user']} não encontrado (rode seed_finance antes).")
+		if options["iterations"] < 1:
+			raise CommandError("--iterations deve ser >= 1.")
+
+		self.stdout.write(f"{'caso':<40} {'p50':>9} {'p95':>9} {'sql':>4} {'pico':>10}")
+		report = run_benchmarks(
+			user,
+			iterations=options["iterations"],
+			warmup=options["warmup"],
+			cold_cache=not options["warm_cache"],
+			only=options.get("only"),
+			progress=lambda name, r: self.stdout.write(
+				f"{name:<40} {r['p50_ms']:>7.1f}ms {r['p95_ms']:>7.1f}ms {r['queries']:>4} {r['peak_kb']:>8.0f}KB"
+			),
+		)
+
+		if options.get("output"):
+			with open(options["output"], "w", encoding="utf-8") as out:
+				json.dump(report, out, indent=2, ensure_ascii=False)
+			self.stdout.write(self.style.SUCCESS(f"Relatório gravado em {options['output']}."))
+
+		if options.get("compare"):
+			with open(options["compare"], encoding="utf-8") as handle:
+				baseline = json.load(handle)
+			regressions = compare_reports(baseline, report, options["threshold"])
+			for line in regressions:
+				self.stderr.write(line)
+			if regressions:
+				raise CommandError(f"{len(regressions)} regressão(ões) em relação a {options['compare']}.")
+			self.stdout.write(self.style.SUCCESS("Sem regressões."))
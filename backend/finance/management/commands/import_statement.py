@@ -0,0 +1,51 @@
+import os
+from django.core.management.base import BaseCommand, CommandError
+from finance.models import ImportJob, Wallet
+from finance.services.importer import IMPORT_BATCH_SIZE, run_import_job
+
+class Command(BaseCommand):
+	help = "Importa extratos bancários (CSV/OFX) para uma carteira, em lotes e com uso constante de memória."
+
+	def add_arguments(self, parser):
+		parser.add_argument("files", nargs="+", help="Arquivos .csv ou .ofx.")
+		parser.add_argument("--wallet", type=int, required=True, help="Id da carteira de destino.")
+		parser.add_argument("--format", choices=ImportJob.Format.values, help="Força o formato (padrão: extensão do arquivo).")
+		parser.add_argument("--encoding", default="utf-8-sig")
+		parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+
+	def handle(self, *args, **options):
+		try:
+			wallet = Wallet.objects.select_related("user").get(pk=options["wallet"])
+		except Wallet.DoesNotExist:
+			raise CommandError(f"Carteira {options['wallet']} não encontrada.")
+
+		failed_files = 0
+		for path in options["files"]:
+			fmt = options.get("format") or os.path.splitext(path)[1].lstrip(".").lower()
+			if fmt not in ImportJob.Format.values:
+				raise CommandError(f"{path}: formato desconhecido (use --format).")
+
+			job = ImportJob.objects.create(
+				user=wallet.user, wallet=wallet, filename=os.path.basename(path)[:255], format=fmt,
+			)
+			with open(path, "rb") as handle:
+				job = run_import_job(
+					job.pk,
+					fileobj=handle,
+					encoding=options["encoding"],
+					batch_size=options["batch_size"],
+					progress=lambda s, path=path: self.stdout.write(f"{path}: {s['processed']} linha(s) lida(s)..."),
+				)
+
+			if job.status == ImportJob.Status.FAILED:
+				failed_files += 1
+				self.stderr.write(f"{path}: falhou - {job.detail}")
+				continue
+			self.stdout.write(self.style.SUCCESS(
+				f"{path}: {job.imported} importada(s), {job.skipped} pulada(s), {job.failed} com erro."
+			))
+			for error in job.errors:
+				self.stdout.write(f"  linha {error['line']}: {error['error']}")
+
+		if failed_files:
+			raise CommandError(f"{failed_files} arquivo(s) não puderam ser importados.")
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+from finance.services.rollups import find_rollup_mismatches, rebuild_monthly_rollups
+
+class Command(BaseCommand):
+	help = "Recalcula (backfill) e verifica a tabela MonthlyRollup a partir das transações."
+
+	def add_arguments(self, parser):
+		parser.add_argument("--user", type=int, action="append", help="Limita ao usuário com este id (pode repetir).")
+		parser.add_argument("--check", action="store_true", help="Apenas verifica; falha se houver divergências.")
+
+	def handle(self, *args, **options):
+		user_ids = options.get("user") or None
+
+		if options.get("check"):
+			mismatches = find_rollup_mismatches(user_ids)
+			for row in mismatches:
+				self.stdout.write(f"{row['key']}: armazenado={row['stored']} esperado={row['expected']}")
+			if mismatches:
+				raise CommandError(f"{len(mismatches)} linha(s) de rollup divergente(s).")
+			self.stdout.write(self.style.SUCCESS("Rollups consistentes."))
+			return
+
+		created = rebuild_monthly_rollups(user_ids)
+		self.stdout.write(self.style.SUCCESS(f"{created} linha(s) de rollup recriada(s)."))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+from finance.models import Wallet
+from finance.services.balances import find_balance_mismatches, rebuild_wallet_balances
+
+class Command(BaseCommand):
+	help = "Recalcula e verifica o saldo armazenado (transactions_balance) das carteiras."
+
+	def add_arguments(self, parser):
+		parser.add_argument("--user", type=int, help="Limita ao usuário com este id.")
+		parser.add_argument("--check", action="store_true", help="Apenas verifica; falha se houver divergências.")
+
+	def handle(self, *args, **options):
+		qs = Wallet.objects.all()
+		if options.get("user"):
+			qs = qs.filter(user_id=options["user"])
+
+		mismatches = find_balance_mismatches(qs)
+		for row in mismatches:
+			self.stdout.write(
+				f"carteira {row['id']} ({row['name']}): armazenado={row['transactions_balance']} esperado={row['expected']}"
+			)
+
+		if options.get("check"):
+			if mismatches:
+				raise CommandError(f"{len(mismatches)} carteira(s) com saldo divergente.")
+			self.stdout.write(self.style.SUCCESS("Saldos consistentes."))
+			return
+
+		updated = rebuild_wallet_balances(qs)
+		self.stdout.write(self.style.SUCCESS(f"{updated} carteira(s) recalculada(s), {len(mismatches)} corrigida(s)."))
@@ -0,0 +1,79 @@
+import random
+import time
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils.dateparse import parse_date
+from finance.services.seed import SEED_BATCH_SIZE, SEED_END_DATE, seed_user
+
+User = get_user_model()
+
+class Command(BaseCommand):
+	help = "Gera usuários sintéticos com carteiras, categorias, transferências e muitas transações (determinístico por --seed)."
+
+	def add_arguments(self, parser):
+		parser.add_argument("--users", type=int, default=1)
+		parser.add_argument("--transactions", type=int, default=100000, help="Transações por usuário.")
+		parser.add_argument("--wallets", type=int, default=4, help="Carteiras por usuário.")
+		parser.add_argument("--categories", type=int, default=12, help="Categorias por usuário.")
+		parser.add_argument("--years", type=int, default=3, help="Anos de histórico até --end-date.")
+		parser.add_argument(
+			"--end-date", default=SEED_END_DATE.isoformat(),
+			help="Último dia do histórico (AAAA-MM-DD). Fixo por padrão para que --seed seja reproduzível; "
+			"use a data de hoje para popular o mês corrente do dashboard.",
+		)
+		parser.add_argument("--transfer-ratio", type=float, default=0.05)
+		parser.add_argument("--archived-ratio", type=float, default=0.02)
+		parser.add_argument("--seed", type=int, default=42)
+		parser.add_argument("--batch-size", type=int, default=SEED_BATCH_SIZE)
+		parser.add_argument("--copy", action="store_true", help="Grava via COPY do Postgres (mais rápido; recalcula saldos no fim).")
+		parser.add_argument("--email-prefix", default="seed", help="Usuários: <prefixo><n>@seed.local")
+		parser.add_argument("--reset", action="store_true", help="Apaga antes os usuários sintéticos com os mesmos e-mails.")
+
+	def handle(self, *args, **options):
+		if options["copy"] and connection.vendor != "postgresql":
+			raise CommandError("--copy exige Postgres.")
+		if options["transactions"] < 0 or options["users"] < 1:
+			raise CommandError("--users deve ser >= 1 e --transactions >= 0.")
+		try:
+			end_date = parse_date(options["end_date"])
+		except ValueError:
+			end_date = None
+		if end_date is None:
+			raise CommandError("--end-date inválida (use AAAA-MM-DD).")
+
+		emails = [f"{options['email_prefix']}{i}@seed.local" for i in range(options["users"])]
+		existing = User.objects.filter(email__in=emails)
+		if existing.exists():
+			if not options["reset"]:
+				raise CommandError("Usuários sintéticos já existem; use --reset para recriá-los.")
+			existing.delete()
+
+		total = 0
+		started = time.monotonic()
+		for index, email in enumerate(emails):
+			user = User.objects.create_user(email=email, password="seed", name=f"Seed {index}")
+			# um rng por usuário: o mesmo --seed gera os mesmos dados, em qualquer --users
+			rng = random.Random(f"{options['seed']}:{index}")
+			created = seed_user(
+				user,
+				rng,
+				wallets=options["wallets"],
+				categories=options["categories"],
+				transactions=options["transactions"],
+				years=options["years"],
+				end_date=end_date,
+				transfer_ratio=options["transfer_ratio"],
+				archived_ratio=options["archived_ratio"],
+				batch_size=options["batch_size"],
+				use_copy=options["copy"],
+				progress=lambda n, email=email: self.stdout.write(f"{email}: {n} transação(ões)..."),
+			)
+			total += created
+			self.stdout.write(self.style.SUCCESS(f"{email} (id {user.pk}): {created} transação(ões)."))
+
+		elapsed = time.monotonic() - started
+		rate = total / elapsed if elapsed else total
+		self.stdout.write(self.style.SUCCESS(
+			f"{total} transação(ões) em {elapsed:.1f}s ({rate:,.0f}/s) para {len(emails)} usuário(s)."
+		))
@@ -0,0 +1,75 @@
+import json
+import os
+import tempfile
+import tracemalloc
+from decimal import Decimal
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from finance.models.transaction import Transaction
+from finance.models.wallet import Wallet
+from finance.services.benchmark import _measure, compare_reports, read_endpoints
+
+User = get_user_model()
+
+class BenchEndpointsCommandTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="bench@example.com", password="123", name="B")
+        wallet = Wallet.objects.create(user=self.user, name="Main")
+        Transaction.objects.create(user=self.user, wallet=wallet, type=Transaction.Type.INCOME, amount=Decimal("10.00"))
+        fd, self.path = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        self.addCleanup(os.remove, self.path)
+
+    def _run(self, *args):
+        call_command(
+            "bench_endpoints", "--user", "bench@example.com", "--iterations", "2", "--warmup", "0",
+            "--output", self.path, *args, stdout=StringIO(), stderr=StringIO(),
+        )
+        with open(self.path, encoding="utf-8") as handle:
+            return json.load(handle)
+
+    def test_writes_report_for_every_read_endpoint(self):
+        report = self._run()
+        self.assertEqual(report["meta"]["transactions"], 1)
+        expected = {name for name, _, _ in read_endpoints()} | {"llm.context"}
+        self.assertEqual(set(report["results"]), expected)
+        for name, result in report["results"].items():
+            # com uma transação só as páginas profundas não existem
+            self.assertEqual(result["status"], 404 if name in ("transactions.page_10", "transactions.page_100") else 200, name)
+            self.assertGreater(result["queries"], 0, name)
+            self.assertLessEqual(result["p50_ms"], result["p95_ms"])
+
+    def test_compare_fails_on_regression(self):
+        report = self._run("--only", "wallets.")
+        self.assertEqual(set(report["results"]), {"wallets.list", "wallets.total_balance"})
+        baseline = json.loads(json.dumps(report))
+        baseline["results"]["wallets.list"]["queries"] -= 1
+        self.assertEqual(compare_reports(report, report), [])
+        self.assertEqual(len(compare_reports(baseline, report)), 1)
+
+        with open(self.path, "w", encoding="utf-8") as out:
+            json.dump(baseline, out)
+        with self.assertRaises(CommandError):
+            call_command(
+                "bench_endpoints", "--user", str(self.user.pk), "--iterations", "1", "--only", "wallets.",
+                "--compare", self.path, stdout=StringIO(), stderr=StringIO(),
+            )
+
+    def test_latency_is_measured_without_tracemalloc(self):
+        tracing = []
+
+        def fn():
+            tracing.append(tracemalloc.is_tracing())
+            return 200, 0
+
+        result = _measure(fn, iterations=3, warmup=1, cold_cache=False)
+        # aquecimento + 3 medições sem tracemalloc, depois uma passada só para o pico
+        self.assertEqual(tracing, [False, False, False, False, True])
+        self.assertEqual((result["status"], result["queries"]), (200, 0))
+
+    def test_unknown_user(self):
+        with self.assertRaises(CommandError):
+            call_command("bench_endpoints", "--user", "nobody@example.com", stdout=StringIO())
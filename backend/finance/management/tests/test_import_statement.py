@@ -0,0 +1,63 @@
+import os
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from finance.models.importjob import ImportJob
+from finance.models.transaction import Transaction
+from finance.models.wallet import Wallet
+from finance.services.importer import RowError, parse_amount
+
+User = get_user_model()
+
+class ImportStatementCommandTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="cmd@example.com", password="123", name="Cmd")
+        self.wallet = Wallet.objects.create(user=self.user, name="Main")
+        fd, self.path = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(fd, "w", encoding="utf-8") as out:
+            out.write("date,description,amount\n")
+            for i in range(7):
+                out.write(f"2025-01-{i + 1:02d},item {i},-{i + 1}.00\n")
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_imports_in_batches_with_progress(self):
+        out = StringIO()
+        call_command("import_statement", self.path, "--wallet", str(self.wallet.id), "--batch-size", "3", stdout=out)
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 7)
+        self.assertEqual(out.getvalue().count("linha(s) lida(s)"), 3)
+        self.assertIn("7 importada(s)", out.getvalue())
+        self.assertEqual(ImportJob.objects.get(user=self.user).status, ImportJob.Status.DONE)
+
+    def test_identical_rows_across_batches_are_all_imported(self):
+        with open(self.path, "w", encoding="utf-8") as out:
+            out.write("date,description,amount\n")
+            out.write("2025-01-01,cafe,-5.00\n" * 4)
+        call_command("import_statement", self.path, "--wallet", str(self.wallet.id), "--batch-size", "2", stdout=StringIO())
+        self.assertEqual(Transaction.objects.filter(user=self.user, description="cafe").count(), 4)
+
+        # reimportar continua pulando tudo
+        call_command("import_statement", self.path, "--wallet", str(self.wallet.id), "--batch-size", "2", stdout=StringIO())
+        self.assertEqual(Transaction.objects.filter(user=self.user, description="cafe").count(), 4)
+        self.assertEqual(ImportJob.objects.filter(user=self.user).latest("id").skipped, 4)
+
+    def test_parse_amount_thousands_and_decimals(self):
+        cases = {
+            "1.234": Decimal("1234.00"), "1.234.567": Decimal("1234567.00"), "-1.234,56": Decimal("-1234.56"),
+            "1,234.56": Decimal("1234.56"), "1,234,567": Decimal("1234567.00"), "12,5": Decimal("12.50"),
+            "-45.90": Decimal("-45.90"), "R$ 10": Decimal("10.00"),
+        }
+        for raw, expected in cases.items():
+            self.assertEqual(parse_amount(raw), expected, raw)
+        for raw in ("1,234", "1.2345", "12.345,678", "abc", "NaN"):
+            with self.assertRaises(RowError, msg=raw):
+                parse_amount(raw)
+
+    def test_unknown_wallet(self):
+        with self.assertRaises(CommandError):
+            call_command("import_statement", self.path, "--wallet", "999999", stdout=StringIO())
@@ -0,0 +1,32 @@
+from decimal import Decimal
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from finance.models.rollup import MonthlyRollup
+from finance.models.transaction import Transaction
+from finance.models.wallet import Wallet
+
+User = get_user_model()
+
+class RebuildMonthlyRollupsCommandTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="r@example.com", password="123", name="R")
+        self.wallet = Wallet.objects.create(user=self.user, name="Main")
+        Transaction.objects.create(user=self.user, wallet=self.wallet, type=Transaction.Type.INCOME, amount=Decimal("80.00"))
+        Transaction.objects.create(user=self.user, wallet=self.wallet, type=Transaction.Type.INCOME, amount=Decimal("20.00"))
+        MonthlyRollup.objects.filter(user=self.user).update(total=Decimal("1.00"))
+
+    def test_check_fails_on_drift(self):
+        with self.assertRaises(CommandError):
+            call_command("rebuild_monthly_rollups", "--check", stdout=StringIO())
+
+    def test_rebuild_fixes_drift(self):
+        call_command("rebuild_monthly_rollups", "--user", str(self.user.id), stdout=StringIO())
+        row = MonthlyRollup.objects.get(user=self.user)
+        self.assertEqual((row.total, row.count), (Decimal("100.00"), 2))
+
+        out = StringIO()
+        call_command("rebuild_monthly_rollups", "--check", stdout=out)
+        self.assertIn("consistentes", out.getvalue())
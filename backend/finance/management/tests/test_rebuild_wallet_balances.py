@@ -0,0 +1,31 @@
+from decimal import Decimal
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from finance.models.wallet import Wallet
+from finance.models.transaction import Transaction
+
+User = get_user_model()
+
+class RebuildWalletBalancesCommandTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="r@example.com", password="123", name="R")
+        self.wallet = Wallet.objects.create(user=self.user, name="Main")
+        Transaction.objects.create(user=self.user, wallet=self.wallet, type=Transaction.Type.INCOME, amount=Decimal("80.00"))
+        Transaction.objects.create(user=self.user, wallet=self.wallet, type=Transaction.Type.EXPENSE, amount=Decimal("30.00"))
+        Wallet.objects.filter(pk=self.wallet.pk).update(transactions_balance=Decimal("999.00"))
+
+    def test_check_fails_on_drift(self):
+        with self.assertRaises(CommandError):
+            call_command("rebuild_wallet_balances", "--check", stdout=StringIO())
+
+    def test_rebuild_fixes_drift(self):
+        call_command("rebuild_wallet_balances", stdout=StringIO())
+        self.wallet.refresh_from_db()
+        self.assertEqual(self.wallet.transactions_balance, Decimal("50.00"))
+
+        out = StringIO()
+        call_command("rebuild_wallet_balances", "--check", "--user", str(self.user.id), stdout=out)
+        self.assertIn("consistentes", out.getvalue())
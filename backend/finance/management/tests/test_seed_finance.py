@@ -0,0 +1,71 @@
+from datetime import date
+from io import StringIO
+from unittest.mock import patch
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Count, Max, Min, Sum
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from finance.models.transaction import Transaction
+from finance.models.wallet import Wallet
+from finance.services.balances import find_balance_mismatches
+from finance.services.rollups import find_rollup_mismatches
+
+User = get_user_model()
+
+class SeedFinanceCommandTests(TestCase):
+    def _seed(self, *args):
+        call_command(
+            "seed_finance", "--transactions", "400", "--wallets", "3", "--batch-size", "150",
+            "--transfer-ratio", "0.2", "--archived-ratio", "0.1", *args, stdout=StringIO(),
+        )
+
+    def _fingerprint(self):
+        qs = Transaction.objects.filter(user__email="seed0@seed.local")
+        return (
+            qs.count(),
+            qs.aggregate(total=Sum("amount"))["total"],
+            list(qs.order_by("date", "amount", "type").values_list("date", "amount", "type", "is_transfer")[:20]),
+        )
+
+    def test_generates_transfers_archived_rows_and_consistent_ledger(self):
+        self._seed("--users", "2")
+        self.assertEqual(User.objects.filter(email__endswith="@seed.local").count(), 2)
+        user = User.objects.get(email="seed0@seed.local")
+        qs = Transaction.objects.filter(user=user)
+        self.assertEqual(qs.count(), 400)
+        self.assertTrue(qs.filter(is_archived=True).exists())
+        groups = qs.filter(is_transfer=True).values("transfer_group").annotate(n=Count("id"))
+        self.assertTrue(groups)
+        self.assertTrue(all(g["n"] == 2 for g in groups))
+        self.assertEqual(Wallet.objects.filter(user=user).count(), 3)
+        self.assertEqual(find_balance_mismatches(), [])
+        self.assertEqual(find_rollup_mismatches(), [])
+
+    def test_same_seed_is_deterministic_and_copy_matches_bulk_create(self):
+        self._seed()
+        first = self._fingerprint()
+        self._seed("--reset", "--copy")
+        self.assertEqual(self._fingerprint(), first)
+        self.assertEqual(find_balance_mismatches(), [])
+        self.assertEqual(find_rollup_mismatches(), [])
+
+    def test_dates_end_at_end_date_whatever_the_current_day(self):
+        self._seed("--years", "1")
+        first = self._fingerprint()
+        with patch("django.utils.timezone.localdate", return_value=date(2031, 5, 17)):
+            self._seed("--reset", "--years", "1")
+        self.assertEqual(self._fingerprint(), first)
+
+        self._seed("--reset", "--years", "1", "--end-date", "2024-06-30")
+        bounds = Transaction.objects.aggregate(first=Min("date"), last=Max("date"))
+        self.assertLessEqual(bounds["last"], date(2024, 6, 30))
+        self.assertGreaterEqual(bounds["first"], date(2023, 7, 1))
+
+        with self.assertRaises(CommandError):
+            self._seed("--reset", "--end-date", "30/06/2024")
+
+    def test_existing_users_require_reset(self):
+        self._seed()
+        with self.assertRaises(CommandError):
+            self._seed()
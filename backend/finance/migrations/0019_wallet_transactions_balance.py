@@ -0,0 +1,53 @@
+# Generated by Django 5.2.4 on 2026-10-18 02:29
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Case, DecimalField, F, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+
+
+def backfill_balances(apps, schema_editor):
+    Wallet = apps.get_model("finance", "Wallet")
+    Transaction = apps.get_model("finance", "Transaction")
+    db = schema_editor.connection.alias
+
+    totals = (
+        Transaction.objects.using(db)
+        .filter(wallet=OuterRef("pk"), is_archived=False)
+        .order_by()
+        .values("wallet")
+        .annotate(
+            total=Sum(
+                Case(
+                    When(type="income", then=F("amount")),
+                    When(type="expense", then=-F("amount")),
+                    default=Value(Decimal("0.00")),
+                    output_field=DecimalField(max_digits=14, decimal_places=2),
+                )
+            )
+        )
+        .values("total")
+    )
+    Wallet.objects.using(db).update(
+        transactions_balance=Coalesce(
+            Subquery(totals),
+            Value(Decimal("0.00")),
+            output_field=DecimalField(max_digits=14, decimal_places=2),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0018_remove_category_uniq_user_category_name_insensitive_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='wallet',
+            name='transactions_balance',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), editable=False, max_digits=14),
+        ),
+        migrations.RunPython(backfill_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.2.4 on 2026-10-18 02:33
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import BooleanField, Case, Count, Q, Sum, Value, When
+from django.db.models.functions import TruncMonth
+
+
+def backfill_rollups(apps, schema_editor):
+    Transaction = apps.get_model("finance", "Transaction")
+    MonthlyRollup = apps.get_model("finance", "MonthlyRollup")
+    db = schema_editor.connection.alias
+
+    transfer_q = Q(category__is_system=True, category__name__iexact="Transferência")
+    rows = (
+        Transaction.objects.using(db)
+        .filter(is_archived=False)
+        .order_by()
+        .annotate(
+            rollup_month=TruncMonth("date"),
+            rollup_is_transfer=Case(When(transfer_q, then=Value(True)), default=Value(False), output_field=BooleanField()),
+        )
+        .values("user_id", "wallet_id", "rollup_month", "category_id", "type", "rollup_is_transfer")
+        .annotate(total=Sum("amount"), count=Count("id"))
+    )
+    MonthlyRollup.objects.using(db).bulk_create(
+        (
+            MonthlyRollup(
+                user_id=r["user_id"],
+                wallet_id=r["wallet_id"],
+                month=r["rollup_month"],
+                category_id=r["category_id"],
+                type=r["type"],
+                is_transfer=r["rollup_is_transfer"],
+                total=r["total"],
+                count=r["count"],
+            )
+            for r in rows.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0019_wallet_transactions_balance'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('type', models.CharField(max_length=10)),
+                ('is_transfer', models.BooleanField(default=False)),
+                ('total', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('count', models.IntegerField(default=0)),
+                ('category', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='finance.category')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_rollups', to=settings.AUTH_USER_MODEL)),
+                ('wallet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_rollups', to='finance.wallet')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'month'], name='finance_mon_user_id_dff36c_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'wallet', 'month', 'category', 'type', 'is_transfer'), name='uniq_monthly_rollup_key', nulls_distinct=False)],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+from django.db import migrations
+
+UNACCENT_FROM = "áàâãäåéèêëíìîïóòôõöúùûüçñý"
+UNACCENT_TO = "aaaaaaeeeeiiiiooooouuuucny"
+
+
+def create_search_support(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    # translate() é IMMUTABLE, então f_unaccent pode ser usada em índice de expressão
+    schema_editor.execute(
+        "CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text AS "
+        f"$$ SELECT translate($1, '{UNACCENT_FROM}', '{UNACCENT_TO}') $$ "
+        "LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT"
+    )
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        has_trgm = cursor.fetchone() is not None
+
+    # pg_trgm faz parte do contrib (presente na imagem oficial); sem ele a busca funciona sem índice
+    if has_trgm:
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS finance_tx_desc_trgm_idx ON finance_transaction "
+            "USING gin (f_unaccent(lower(description)) gin_trgm_ops)"
+        )
+
+
+def drop_search_support(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    schema_editor.execute("DROP INDEX IF EXISTS finance_tx_desc_trgm_idx")
+    schema_editor.execute("DROP FUNCTION IF EXISTS f_unaccent(text)")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0020_monthlyrollup'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_support, drop_search_support),
+    ]
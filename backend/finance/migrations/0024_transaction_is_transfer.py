@@ -0,0 +1,61 @@
+# Generated by Django 5.2.4 on 2026-10-18 02:52
+
+import uuid
+from collections import defaultdict
+from django.conf import settings
+from django.db import migrations, models
+
+
+def mark_existing_transfers(apps, schema_editor):
+    """
+    Marca as transações da categoria de sistema "Transferência" e reconstrói os pares:
+    uma despesa e uma receita com mesmo usuário, data, valor e descrição formam
+    um transfer_group (na ordem de criação).
+    """
+    Transaction = apps.get_model("finance", "Transaction")
+    db = schema_editor.connection.alias
+
+    transfers = Transaction.objects.using(db).filter(
+        category__is_system=True, category__name__iexact="Transferência"
+    )
+    transfers.update(is_transfer=True)
+
+    legs = defaultdict(lambda: {"expense": [], "income": []})
+    rows = transfers.order_by("id").values_list("id", "user_id", "date", "amount", "description", "type")
+    for pk, user_id, date, amount, description, type_ in rows.iterator():
+        legs[(user_id, date, amount, description)][type_].append(pk)
+
+    pending = []
+    for sides in legs.values():
+        for expense_id, income_id in zip(sides["expense"], sides["income"]):
+            group = uuid.uuid4()
+            pending.append(Transaction(id=expense_id, transfer_group=group))
+            pending.append(Transaction(id=income_id, transfer_group=group))
+    Transaction.objects.using(db).bulk_update(pending, ["transfer_group"], batch_size=1000)
+
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0023_importjob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaction',
+            name='is_transfer',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='transfer_group',
+            field=models.UUIDField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'is_transfer', 'date'], name='finance_tra_user_id_a80c55_idx'),
+        ),
+        migrations.RunPython(mark_existing_transfers, migrations.RunPython.noop),
+    ]
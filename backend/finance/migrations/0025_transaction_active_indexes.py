@@ -0,0 +1,27 @@
+# Generated by Django 5.2.4 on 2026-10-18 03:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0024_transaction_is_transfer'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(condition=models.Q(('is_archived', False)), fields=['user', 'date', 'id'], include=('amount', 'type', 'category', 'wallet'), name='tx_active_user_date'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(condition=models.Q(('is_archived', False)), fields=['user', 'type', 'date'], include=('amount', 'category', 'wallet'), name='tx_active_user_type_date'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(condition=models.Q(('is_archived', False)), fields=['wallet', 'date', 'id'], include=('amount', 'type', 'category'), name='tx_active_wallet_date'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.4 on 2026-10-18 03:18
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0025_transaction_active_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AIPlanJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Na fila'), ('running', 'Gerando'), ('done', 'Concluído'), ('failed', 'Falhou')], default='pending', max_length=10)),
+                ('template', models.CharField(blank=True, default='', max_length=60)),
+                ('objective', models.CharField(blank=True, default='', max_length=300)),
+                ('params', models.JSONField(blank=True, default=dict)),
+                ('meta', models.JSONField(blank=True, default=dict)),
+                ('temperature', models.FloatField(default=0.5)),
+                ('model', models.CharField(blank=True, default='', max_length=60)),
+                ('tokens', models.IntegerField(default=0)),
+                ('detail', models.CharField(blank=True, default='', max_length=300)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('plan', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='jobs', to='finance.aiplan')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ai_plan_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['user', '-created_at'], name='finance_aip_user_id_6a05dc_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-18 03:37
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0026_aiplanjob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='transaction',
+            name='finance_tra_user_id_3294c0_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='transaction',
+            name='finance_tra_user_id_381259_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='transaction',
+            name='finance_tra_wallet__3aa168_idx',
+        ),
+        migrations.AlterField(
+            model_name='transaction',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='transactions', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -0,0 +1,27 @@
+from django.db import migrations
+
+
+def create_transfer_category(apps, schema_editor):
+    """
+    Cria a categoria de sistema "Transferência" com o schema: o conjunto de ids
+    que define Transaction.is_transfer fica fixo em vez de depender de qual
+    processo a criou primeiro.
+    """
+    Category = apps.get_model("finance", "Category")
+    db = schema_editor.connection.alias
+    existing = Category.objects.using(db).filter(user=None, is_archived=False, name__iexact="Transferência")
+    if existing.exists():
+        existing.update(is_system=True)
+    else:
+        Category.objects.using(db).create(user=None, name="Transferência", is_system=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0027_drop_superseded_transaction_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_transfer_category, migrations.RunPython.noop),
+    ]
@@ -2,10 +2,18 @@ from .category import Category
 from .wallet import Wallet
 from .transaction import Transaction
 from .aiplan import AIPlan
+from .rollup import MonthlyRollup
+from .version import DataVersion
+from .importjob import ImportJob
+from .aiplanjob import AIPlanJob
 
 __all__ = [
     "Category",
     "Wallet",
     "Transaction",
-    "AIPlan"
+    "AIPlan",
+    "MonthlyRollup",
+    "DataVersion",
+    "ImportJob",
+    "AIPlanJob",
 ]
@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.db import models
+
+User = settings.AUTH_USER_MODEL
+
+class AIPlanJob(models.Model):
+	"""Geração de um plano pela IA fora da requisição; o resultado é gravado como AIPlan."""
+
+	class Status(models.TextChoices):
+		PENDING = "pending", "Na fila"
+		RUNNING = "running", "Gerando"
+		DONE = "done", "Concluído"
+		FAILED = "failed", "Falhou"
+
+	user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="ai_plan_jobs")
+	status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+	template = models.CharField(max_length=60, blank=True, default="")
+	objective = models.CharField(max_length=300, blank=True, default="")
+	# demais campos do prompt (prompt custom, persona) e a classificação do validador
+	params = models.JSONField(default=dict, blank=True)
+	meta = models.JSONField(default=dict, blank=True)
+	temperature = models.FloatField(default=0.5)
+	plan = models.ForeignKey("finance.AIPlan", null=True, blank=True, on_delete=models.SET_NULL, related_name="jobs")
+	model = models.CharField(max_length=60, blank=True, default="")
+	tokens = models.IntegerField(default=0)
+	detail = models.CharField(max_length=300, blank=True, default="")
+	created_at = models.DateTimeField(auto_now_add=True)
+	# sinal de vida do job: os updates do runner gravam explicitamente (update() ignora auto_now)
+	updated_at = models.DateTimeField(auto_now=True)
+	finished_at = models.DateTimeField(null=True, blank=True)
+
+	class Meta:
+		indexes = [
+			models.Index(fields=["user", "-created_at"]),
+		]
+		ordering = ["-created_at"]
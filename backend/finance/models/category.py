@@ -1,10 +1,18 @@
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction as db_transaction
 from django.db.models import Q
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
 from django.db.models.functions import Lower
+from .version import DataVersion
 
 User = settings.AUTH_USER_MODEL
 
+TRANSFER_CATEGORY_NAME = "Transferência"
+
+# categoria de sistema de transferências, resolvida uma vez por processo
+_transfer_category_cache = {}
+
 class Category(models.Model):
 	user = models.ForeignKey(
 		User, null=True, blank=True,
@@ -33,3 +41,45 @@ class Category(models.Model):
 			models.Index(fields=["user", "is_archived"]),
 		]
 		ordering = ["name"]
+
+	@classmethod
+	def get_transfer_category(cls):
+		category = _transfer_category_cache.get("transfer")
+		if category is None:
+			category, _ = cls.objects.get_or_create(user=None, is_system=True, name=TRANSFER_CATEGORY_NAME)
+			# só entra no cache após o commit: um rollback não deixa um id inexistente guardado
+			db_transaction.on_commit(lambda: _transfer_category_cache.setdefault("transfer", category))
+		return category
+
+	@classmethod
+	def transfer_category_ids(cls):
+		"""Ids das categorias de sistema "Transferência" (define Transaction.is_transfer)."""
+		ids = _transfer_category_cache.get("ids")
+		if ids is None:
+			ids = frozenset(
+				cls.objects.filter(user=None, is_system=True, name__iexact=TRANSFER_CATEGORY_NAME)
+				.order_by().values_list("id", flat=True)
+			)
+			# vazio não entra no cache: outro processo pode criar a categoria depois
+			if ids:
+				db_transaction.on_commit(lambda: _transfer_category_cache.setdefault("ids", ids))
+		return ids
+
+	def save(self, *args, **kwargs):
+		if self.is_system:
+			_transfer_category_cache.clear()
+		with db_transaction.atomic():
+			super().save(*args, **kwargs)
+			DataVersion.bump({self.user_id})
+
+	def delete(self, *args, **kwargs):
+		with db_transaction.atomic():
+			result = super().delete(*args, **kwargs)
+			DataVersion.bump({self.user_id})
+		return result
+
+@receiver(post_delete, sender=Category)
+def forget_transfer_category(sender, instance, **kwargs):
+	# também cobre exclusões em lote (admin, queryset.delete())
+	if instance.is_system:
+		_transfer_category_cache.clear()
@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.db import models
+
+User = settings.AUTH_USER_MODEL
+
+class ImportJob(models.Model):
+	"""Importação de um extrato (CSV/OFX) e o resumo do que foi gravado."""
+
+	class Format(models.TextChoices):
+		CSV = "csv", "CSV"
+		OFX = "ofx", "OFX"
+
+	class Status(models.TextChoices):
+		PENDING = "pending", "Na fila"
+		RUNNING = "running", "Processando"
+		DONE = "done", "Concluída"
+		FAILED = "failed", "Falhou"
+
+	user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="import_jobs")
+	wallet = models.ForeignKey("finance.Wallet", on_delete=models.CASCADE, related_name="import_jobs")
+	filename = models.CharField(max_length=255, blank=True, default="")
+	format = models.CharField(max_length=10, choices=Format.choices)
+	status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+	processed = models.IntegerField(default=0)
+	imported = models.IntegerField(default=0)
+	skipped = models.IntegerField(default=0)
+	failed = models.IntegerField(default=0)
+	errors = models.JSONField(default=list, blank=True)
+	detail = models.CharField(max_length=300, blank=True, default="")
+	created_at = models.DateTimeField(auto_now_add=True)
+	# sinal de vida do job: os updates do runner gravam explicitamente (update() ignora auto_now)
+	updated_at = models.DateTimeField(auto_now=True)
+	finished_at = models.DateTimeField(null=True, blank=True)
+
+	class Meta:
+		indexes = [
+			models.Index(fields=["user", "-created_at"]),
+		]
+		ordering = ["-created_at"]
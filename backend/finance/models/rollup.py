@@ -0,0 +1,106 @@
+import logging
+from decimal import Decimal
+from django.conf import settings
+from django.db import connection, models
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+
+User = settings.AUTH_USER_MODEL
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_KEY = ("user_id", "wallet_id", "month", "category_id", "type", "is_transfer")
+
+class MonthlyRollup(models.Model):
+	"""Totais mensais das transações ativas, mantidos incrementalmente por Transaction."""
+
+	user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="monthly_rollups")
+	wallet = models.ForeignKey("finance.Wallet", on_delete=models.CASCADE, related_name="monthly_rollups")
+	month = models.DateField()
+	# categorias excluídas viram NULL nas transações; o rollup mantém o id e o join resolve para NULL
+	category = models.ForeignKey(
+		"finance.Category", null=True, blank=True,
+		on_delete=models.DO_NOTHING, db_constraint=False, related_name="+"
+	)
+	type = models.CharField(max_length=10)
+	is_transfer = models.BooleanField(default=False)
+	total = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"))
+	count = models.IntegerField(default=0)
+
+	class Meta:
+		constraints = [
+			models.UniqueConstraint(
+				fields=["user", "wallet", "month", "category", "type", "is_transfer"],
+				nulls_distinct=False,
+				name="uniq_monthly_rollup_key",
+			),
+		]
+		indexes = [
+			models.Index(fields=["user", "month"]),
+		]
+
+	@classmethod
+	def apply_deltas(cls, deltas):
+		"""
+		Soma (total, count) a cada chave de ROLLUP_KEY numa única consulta
+		(INSERT ... ON CONFLICT DO UPDATE), criando as linhas que não existirem.
+		Linhas que ficam sem transações (count=0) são apagadas, para que os leitores
+		não devolvam categorias e meses zerados. Count negativo significa que o
+		ledger divergiu: a linha fica e o erro é registrado (rebuild_monthly_rollups corrige).
+		"""
+		ordered = sorted(
+			(key for key, (total, count) in deltas.items() if total or count),
+			key=lambda k: (k[0], k[1], k[2], k[3] or 0, k[4], k[5]),
+		)
+		if not ordered:
+			return
+
+		columns = ", ".join(ROLLUP_KEY)
+		values = ", ".join(["(%s, %s, %s::date, %s, %s, %s, %s::numeric, %s)"] * len(ordered))
+		params = []
+		for key in ordered:
+			params.extend(key)
+			params.extend(deltas[key])
+		table = cls._meta.db_table
+		with connection.cursor() as cursor:
+			cursor.execute(
+				f"INSERT INTO {table} ({columns}, total, count) VALUES {values} "
+				"ON CONFLICT ON CONSTRAINT uniq_monthly_rollup_key DO UPDATE SET "
+				f"total = {table}.total + EXCLUDED.total, count = {table}.count + EXCLUDED.count "
+				"RETURNING id, count",
+				params,
+			)
+			counts = cursor.fetchall()
+		drifted = [row_id for row_id, count in counts if count < 0]
+		if drifted:
+			logger.error("Rollups com count negativo (ledger divergente): %s", drifted)
+		emptied = [row_id for row_id, count in counts if count == 0]
+		if emptied:
+			cls.objects.filter(id__in=emptied).delete()
+
+	@classmethod
+	def merge_into_uncategorized(cls, category_ids):
+		"""
+		Move as linhas das categorias para a chave category=NULL, somando com as que
+		já existirem; é o que o SET_NULL faz nas transações quando a categoria é excluída.
+		"""
+		keep = ", ".join(col for col in ROLLUP_KEY if col != "category_id")
+		table = cls._meta.db_table
+		with connection.cursor() as cursor:
+			cursor.execute(
+				f"INSERT INTO {table} ({keep}, category_id, total, count) "
+				f"SELECT {keep}, NULL, SUM(total), SUM(count) FROM {table} "
+				f"WHERE category_id = ANY(%s) GROUP BY {keep} "
+				"ON CONFLICT ON CONSTRAINT uniq_monthly_rollup_key DO UPDATE SET "
+				f"total = {table}.total + EXCLUDED.total, count = {table}.count + EXCLUDED.count",
+				[list(category_ids)],
+			)
+			cursor.execute(f"DELETE FROM {table} WHERE category_id = ANY(%s)", [list(category_ids)])
+
+@receiver(pre_delete, sender="finance.Category")
+def uncategorize_rollups(sender, instance, origin=None, **kwargs):
+	# as transações da categoria viram category=NULL pelo SET_NULL, fora de apply_ledger_changes;
+	# na exclusão do próprio usuário os rollups saem junto, em cascata
+	if isinstance(origin, models.Model) and origin._meta.label == settings.AUTH_USER_MODEL:
+		return
+	MonthlyRollup.merge_into_uncategorized([instance.pk])
@@ -1,7 +1,7 @@
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.db import IntegrityError, transaction
-from finance.models.category import Category
+from finance.models.category import TRANSFER_CATEGORY_NAME, Category, _transfer_category_cache
 
 User = get_user_model()
 
@@ -58,3 +58,23 @@ class CategoryModelTests(TestCase):
         u = Category.objects.create(user=self.u1, name="transport", is_archived=False)
         self.assertIsNotNone(g.id)
         self.assertIsNotNone(u.id)
+
+class TransferCategoryTests(TestCase):
+    def setUp(self):
+        self.addCleanup(_transfer_category_cache.clear)
+
+    def test_transfer_category_comes_from_migration(self):
+        transfer = Category.objects.get(user=None, is_system=True, name=TRANSFER_CATEGORY_NAME)
+        self.assertEqual(Category.get_transfer_category(), transfer)
+        self.assertEqual(Category.transfer_category_ids(), frozenset({transfer.pk}))
+
+    def test_empty_transfer_ids_are_not_cached(self):
+        Category.get_transfer_category().delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(Category.transfer_category_ids(), frozenset())
+        self.assertNotIn("ids", _transfer_category_cache)
+
+        transfer = Category.objects.create(user=None, is_system=True, name=TRANSFER_CATEGORY_NAME)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(Category.transfer_category_ids(), frozenset({transfer.pk}))
+        self.assertEqual(_transfer_category_cache["ids"], frozenset({transfer.pk}))
@@ -0,0 +1,78 @@
+from datetime import date
+from decimal import Decimal
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from finance.models.category import Category
+from finance.models.rollup import MonthlyRollup
+from finance.models.transaction import Transaction
+from finance.models.wallet import Wallet
+
+User = get_user_model()
+
+class MonthlyRollupMaintenanceTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="m@example.com", password="123", name="M")
+        self.wallet = Wallet.objects.create(user=self.user, name="Main")
+        self.food = Category.objects.create(user=self.user, name="Food")
+        self.transfer = Category.get_transfer_category()
+
+    def _tx(self, amount, day=date(2025, 3, 10), **extra):
+        extra.setdefault("type", Transaction.Type.EXPENSE)
+        extra.setdefault("category", self.food)
+        return Transaction.objects.create(
+            user=self.user, wallet=self.wallet, amount=Decimal(amount), date=day, **extra
+        )
+
+    def _rollup(self, month=date(2025, 3, 1), **lookup):
+        lookup.setdefault("category", self.food)
+        lookup.setdefault("type", Transaction.Type.EXPENSE)
+        lookup.setdefault("is_transfer", False)
+        row = MonthlyRollup.objects.filter(user=self.user, wallet=self.wallet, month=month, **lookup).first()
+        return (row.total, row.count) if row else (Decimal("0.00"), 0)
+
+    def test_create_accumulates_per_month_and_flags_transfers(self):
+        self._tx("10.00")
+        self._tx("5.50", day=date(2025, 3, 31))
+        self._tx("7.00", category=self.transfer, is_transfer=True)
+        self.assertEqual(self._rollup(), (Decimal("15.50"), 2))
+        self.assertEqual(self._rollup(category=self.transfer, is_transfer=True), (Decimal("7.00"), 1))
+
+    def test_update_moves_between_months_and_archive_removes(self):
+        tx = self._tx("10.00")
+        tx.date = date(2025, 4, 2)
+        tx.save()
+        self.assertEqual(self._rollup(), (Decimal("0.00"), 0))
+        self.assertEqual(self._rollup(month=date(2025, 4, 1)), (Decimal("10.00"), 1))
+
+        tx.is_archived = True
+        tx.save()
+        self.assertEqual(self._rollup(month=date(2025, 4, 1)), (Decimal("0.00"), 0))
+
+    def test_queryset_update_and_delete(self):
+        self._tx("10.00")
+        self._tx("20.00")
+        Transaction.objects.filter(user=self.user).update(category=None)
+        self.assertEqual(self._rollup(), (Decimal("0.00"), 0))
+        self.assertEqual(self._rollup(category=None), (Decimal("30.00"), 2))
+
+        Transaction.objects.filter(user=self.user).delete()
+        self.assertEqual(self._rollup(category=None), (Decimal("0.00"), 0))
+        # linhas zeradas são apagadas, não ficam com total=0/count=0
+        self.assertFalse(MonthlyRollup.objects.filter(user=self.user).exists())
+
+    def test_deleting_category_moves_rollups_to_uncategorized(self):
+        tx = self._tx("10.00")
+        self._tx("4.00", category=None)
+        food_id = self.food.pk
+        self.food.delete()
+        self.assertEqual(self._rollup(category=None), (Decimal("14.00"), 2))
+        self.assertFalse(MonthlyRollup.objects.filter(category_id=food_id).exists())
+
+        Transaction.objects.get(pk=tx.pk).delete()
+        self.assertEqual(self._rollup(category=None), (Decimal("4.00"), 1))
+
+    def test_negative_count_is_logged_and_kept(self):
+        key = (self.user.pk, self.wallet.pk, date(2025, 3, 1), self.food.pk, Transaction.Type.EXPENSE, False)
+        with self.assertLogs("finance.models.rollup", level="ERROR"):
+            MonthlyRollup.apply_deltas({key: (Decimal("-3.00"), -1)})
+        self.assertEqual(self._rollup(), (Decimal("-3.00"), -1))
@@ -1,3 +1,4 @@
+import uuid
 from decimal import Decimal
 from django.test import TestCase
 from django.contrib.auth import get_user_model
@@ -28,3 +29,97 @@ class TransactionSignedAmountTests(TestCase):
             amount=Decimal("50.00"),
         )
         self.assertEqual(tx.signed_amount, Decimal("-50.00"))
+
+class TransactionWalletBalanceTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="b@example.com", password="123", name="Balance")
+        self.wallet = Wallet.objects.create(user=self.user, name="Main", initial_balance=Decimal("100.00"))
+        self.other_wallet = Wallet.objects.create(user=self.user, name="Other")
+
+    def _tx(self, typ, amount, wallet=None, **extra):
+        return Transaction.objects.create(
+            user=self.user, wallet=wallet or self.wallet, type=typ, amount=Decimal(amount), **extra
+        )
+
+    def _stored(self, wallet):
+        wallet.refresh_from_db()
+        return wallet.transactions_balance
+
+    def test_create_updates_stored_balance(self):
+        self._tx(Transaction.Type.INCOME, "50.00")
+        self._tx(Transaction.Type.EXPENSE, "20.00")
+        self._tx(Transaction.Type.INCOME, "999.00", is_archived=True)
+        self.assertEqual(self._stored(self.wallet), Decimal("30.00"))
+        self.assertEqual(self.wallet.current_balance, Decimal("130.00"))
+
+    def test_update_amount_type_and_wallet(self):
+        tx = self._tx(Transaction.Type.EXPENSE, "20.00")
+        tx = Transaction.objects.get(pk=tx.pk)
+        tx.amount = Decimal("25.00")
+        tx.type = Transaction.Type.INCOME
+        tx.save()
+        self.assertEqual(self._stored(self.wallet), Decimal("25.00"))
+
+        tx.wallet = self.other_wallet
+        tx.save()
+        self.assertEqual(self._stored(self.wallet), Decimal("0.00"))
+        self.assertEqual(self._stored(self.other_wallet), Decimal("25.00"))
+
+    def test_archive_and_delete(self):
+        tx = self._tx(Transaction.Type.EXPENSE, "20.00")
+        tx.is_archived = True
+        tx.save()
+        self.assertEqual(self._stored(self.wallet), Decimal("0.00"))
+
+        tx2 = self._tx(Transaction.Type.EXPENSE, "5.00")
+        tx2.delete()
+        tx.delete()
+        self.assertEqual(self._stored(self.wallet), Decimal("0.00"))
+
+    def test_queryset_delete_update_and_bulk_create(self):
+        Transaction.objects.bulk_create([
+            Transaction(user=self.user, wallet=self.wallet, type=Transaction.Type.INCOME, amount=Decimal("10.00")),
+            Transaction(user=self.user, wallet=self.other_wallet, type=Transaction.Type.EXPENSE, amount=Decimal("4.00")),
+        ])
+        self.assertEqual(self._stored(self.wallet), Decimal("10.00"))
+        self.assertEqual(self._stored(self.other_wallet), Decimal("-4.00"))
+
+        Transaction.objects.filter(wallet=self.other_wallet).update(wallet=self.wallet)
+        self.assertEqual(self._stored(self.wallet), Decimal("6.00"))
+        self.assertEqual(self._stored(self.other_wallet), Decimal("0.00"))
+
+        Transaction.objects.filter(type=Transaction.Type.EXPENSE).update(is_archived=True)
+        self.assertEqual(self._stored(self.wallet), Decimal("10.00"))
+
+        Transaction.objects.filter(user=self.user).delete()
+        self.assertEqual(self._stored(self.wallet), Decimal("0.00"))
+
+    def test_stale_wallet_save_does_not_overwrite_balance(self):
+        stale = Wallet.objects.get(pk=self.wallet.pk)
+        self._tx(Transaction.Type.INCOME, "40.00")
+        stale.name = "Renamed"
+        stale.save()
+        self.assertEqual(self._stored(self.wallet), Decimal("40.00"))
+
+class TransactionTransferFlagTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="tf@example.com", password="123", name="Transfer")
+        self.wallet = Wallet.objects.create(user=self.user, name="Main")
+
+    def test_new_transfer_leg_keeps_flag_without_transfer_ids(self):
+        # ids vazios simulam um processo que ainda não vê a categoria de transferência
+        group = uuid.uuid4()
+        leg = Transaction(
+            user=self.user, wallet=self.wallet, type=Transaction.Type.EXPENSE,
+            amount=Decimal("10.00"), is_transfer=True, transfer_group=group,
+        )
+        leg.sync_transfer_flag(frozenset())
+        self.assertEqual((leg.is_transfer, leg.transfer_group), (True, group))
+
+        Transaction.objects.bulk_create([leg])
+        leg.refresh_from_db()
+        self.assertEqual((leg.is_transfer, leg.transfer_group), (True, group))
+
+        # uma perna já gravada segue a categoria
+        leg.sync_transfer_flag(frozenset())
+        self.assertEqual((leg.is_transfer, leg.transfer_group), (False, None))
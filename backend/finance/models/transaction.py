@@ -1,17 +1,207 @@
+from datetime import date, datetime
 from django.conf import settings
-from django.db import models
+from django.db import connection, models, transaction as db_transaction
+from django.db.models import Q, Sum, Count, Case, When, F, Func, Value, DecimalField, CharField, FloatField
+from django.db.models.functions import Cast, Lower, TruncMonth
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
 from django.utils import timezone
 from django.core.validators import MinValueValidator
 from decimal import Decimal
+from .category import Category
+from .wallet import Wallet
+from .rollup import MonthlyRollup
+from .version import DataVersion
 
 User = settings.AUTH_USER_MODEL
 
+TRANSFER_Q = Q(is_transfer=True)
+
+LEDGER_FIELDS = ("user_id", "wallet_id", "date", "category_id", "type", "amount", "is_archived", "is_transfer")
+LEDGER_FIELD_NAMES = set(LEDGER_FIELDS) | {"user", "wallet", "category"}
+
+def signed_amount_expression(field="amount"):
+	return Case(
+		When(type="income", then=F(field)),
+		When(type="expense", then=-F(field)),
+		default=Value(Decimal("0.00")),
+		output_field=DecimalField(max_digits=14, decimal_places=2),
+	)
+
+# mesma tabela usada pela função SQL f_unaccent() (migração 0021)
+UNACCENT_FROM = "áàâãäåéèêëíìîïóòôõöúùûüçñý"
+UNACCENT_TO = "aaaaaaeeeeiiiiooooouuuucny"
+_UNACCENT_TABLE = str.maketrans(UNACCENT_FROM, UNACCENT_TO)
+
+class Unaccent(Func):
+	"""f_unaccent(): remoção de acentos IMMUTABLE criada na migração 0021 (indexável)."""
+	function = "f_unaccent"
+	output_field = CharField()
+
+def normalize_search_text(text):
+	return (text or "").lower().translate(_UNACCENT_TABLE).strip()
+
+def _search_words(text):
+	return ["".join(c for c in w if c.isalnum()) for w in normalize_search_text(text).split()]
+
+def _month_of(value):
+	if isinstance(value, str):
+		value = date.fromisoformat(value)
+	if isinstance(value, datetime):
+		value = value.date()
+	return value.replace(day=1)
+
+def ledger_rows_from_states(states):
+	"""Agrupa estados de transações (dicts de LEDGER_FIELDS) nas chaves do MonthlyRollup."""
+	rows = {}
+	for s in states:
+		if s is None or s["is_archived"]:
+			continue
+		key = (
+			s["user_id"], s["wallet_id"], _month_of(s["date"]),
+			s["category_id"], s["type"], bool(s["is_transfer"]),
+		)
+		total, count = rows.get(key, (Decimal("0.00"), 0))
+		rows[key] = (total + Decimal(str(s["amount"])), count + 1)
+	return rows
+
+def is_transfer_category(category_id, transfer_ids=None):
+	"""Transações na categoria de sistema "Transferência" ficam fora das análises."""
+	if category_id is None:
+		return False
+	if transfer_ids is None:
+		transfer_ids = Category.transfer_category_ids()
+	return category_id in transfer_ids
+
+def apply_ledger_changes(before, after):
+	"""
+	Aplica a diferença entre dois conjuntos de linhas do ledger:
+	- saldo armazenado das carteiras
+	- MonthlyRollup
+	Retorna os deltas de saldo por carteira.
+	"""
+	deltas = {}
+	for sign, rows in ((-1, before), (1, after)):
+		for key, (total, count) in rows.items():
+			prev_total, prev_count = deltas.get(key, (Decimal("0.00"), 0))
+			deltas[key] = (prev_total + sign * total, prev_count + sign * count)
+
+	wallet_deltas = {}
+	for key, (total, _) in deltas.items():
+		wallet_id, type_ = key[1], key[4]
+		signed = total if type_ == Transaction.Type.INCOME else -total
+		wallet_deltas[wallet_id] = wallet_deltas.get(wallet_id, Decimal("0.00")) + signed
+
+	Wallet.apply_balance_deltas(wallet_deltas)
+	MonthlyRollup.apply_deltas(deltas)
+	return wallet_deltas
+
+class TransactionQuerySet(models.QuerySet):
+	"""Mantém saldos das carteiras, MonthlyRollup e DataVersion em dia nas operações em lote."""
+
+	def _user_ids(self):
+		return set(self.order_by().values_list("user_id", flat=True).distinct())
+
+	def ledger_rows(self):
+		rows = (
+			self.filter(is_archived=False)
+			.order_by()
+			.annotate(rollup_month=TruncMonth("date"))
+			.values("user_id", "wallet_id", "rollup_month", "category_id", "type", "is_transfer")
+			.annotate(total=Sum("amount"), count=Count("id"))
+		)
+		return {
+			(r["user_id"], r["wallet_id"], r["rollup_month"], r["category_id"], r["type"], r["is_transfer"]): (r["total"], r["count"])
+			for r in rows
+		}
+
+	def search(self, term):
+		"""
+		Busca por trecho na descrição ignorando acentos e caixa, anotando search_rank.
+		No Postgres filtra f_unaccent(lower(description)) LIKE '%termo%' (servido pelo
+		índice trigram) e ordena por ts_rank; em outros bancos cai para icontains.
+		"""
+		words = [w for w in _search_words(term) if w]
+		if connection.vendor != "postgresql" or not words:
+			qs = self
+			for word in (term or "").split():
+				qs = qs.filter(description__icontains=word)
+			return qs.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+		qs = self.annotate(search_text=Unaccent(Lower("description")))
+		for word in words:
+			qs = qs.filter(search_text__contains=word)
+		query = SearchQuery(" & ".join(f"{w}:*" for w in words), search_type="raw", config="simple")
+		return qs.annotate(
+			search_rank=Cast(SearchRank(SearchVector("search_text", config="simple"), query), FloatField())
+		)
+
+	def delete(self):
+		with db_transaction.atomic():
+			user_ids = self._user_ids()
+			before = self.ledger_rows()
+			result = super().delete()
+			apply_ledger_changes(before, {})
+			DataVersion.bump(user_ids)
+		return result
+
+	def update(self, **kwargs):
+		for name in ("category", "category_id"):
+			if name in kwargs:
+				category = kwargs[name]
+				kwargs["is_transfer"] = is_transfer_category(getattr(category, "pk", category))
+				if not kwargs["is_transfer"]:
+					# perna tirada da categoria de transferência deixa de ser transferência
+					kwargs["transfer_group"] = None
+
+		if not LEDGER_FIELD_NAMES.intersection(kwargs):
+			with db_transaction.atomic():
+				user_ids = self._user_ids()
+				rows = super().update(**kwargs)
+				DataVersion.bump(user_ids)
+			return rows
+
+		with db_transaction.atomic():
+			pairs = list(self.values_list("pk", "user_id"))
+			pks = [pk for pk, _ in pairs]
+			before = self.ledger_rows()
+			rows = super().update(**kwargs)
+			after = self.model.objects.filter(pk__in=pks).ledger_rows()
+			apply_ledger_changes(before, after)
+			DataVersion.bump({user_id for _, user_id in pairs} | {key[0] for key in after})
+		return rows
+
+	def bulk_create(self, objs, *args, **kwargs):
+		objs = list(objs)
+		transfer_ids = Category.transfer_category_ids() if any(obj.category_id for obj in objs) else frozenset()
+		for obj in objs:
+			obj.sync_transfer_flag(transfer_ids)
+
+		with db_transaction.atomic():
+			created = super().bulk_create(objs, *args, **kwargs)
+			states = []
+			for obj in created:
+				obj._ledger_state = obj._ledger_snapshot()
+				states.append(obj._ledger_state)
+			wallet_deltas = apply_ledger_changes({}, ledger_rows_from_states(states))
+			DataVersion.bump({obj.user_id for obj in created})
+
+		# carteiras já carregadas nas instâncias refletem o novo saldo (uma vez por instância)
+		cached_wallets = {
+			id(obj.wallet): obj.wallet
+			for obj in created
+			if Transaction.wallet.is_cached(obj) and obj.wallet is not None
+		}
+		for wallet in cached_wallets.values():
+			wallet.transactions_balance += wallet_deltas.get(wallet.pk, Decimal("0.00"))
+		return created
+
 class Transaction(models.Model):
 	class Type(models.TextChoices):
 		EXPENSE = "expense", "Despesa"
 		INCOME  = "income",  "Receita"
 
-	user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="transactions")
+	# sem índice próprio: os índices compostos abaixo começam por user
+	user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="transactions", db_index=False)
 	wallet = models.ForeignKey("finance.Wallet", on_delete=models.CASCADE, related_name="transactions")
 	type = models.CharField(max_length=10, choices=Type.choices)
 	category = models.ForeignKey("finance.Category", null=True, blank=True, on_delete=models.SET_NULL, related_name="transactions")
@@ -21,16 +211,104 @@ class Transaction(models.Model):
 	created_at = models.DateTimeField(auto_now_add=True)
 	updated_at = models.DateTimeField(auto_now=True)
 	is_archived = models.BooleanField(default=False)
+	# pernas de transferência entre carteiras: ficam fora das análises de receita/despesa
+	is_transfer = models.BooleanField(default=False)
+	transfer_group = models.UUIDField(null=True, blank=True, db_index=True)
+
+	objects = TransactionQuerySet.as_manager()
 
 	class Meta:
 		indexes = [
-			models.Index(fields=["user", "date"]),
-			models.Index(fields=["user", "type", "date"]),
 			models.Index(fields=["user", "category"]),
-			models.Index(fields=["wallet", "date"]),
+			models.Index(fields=["user", "is_transfer", "date"]),
+			# caminho quente: só transações ativas, cobrindo o que listagem, recentes
+			# e agregações leem (index-only scan quando o visibility map ajuda).
+			# Substituem (user, date), (user, type, date) e (wallet, date): completos
+			# e mais estreitos, o planner os preferia e os parciais ficavam sem uso.
+			models.Index(
+				fields=["user", "date", "id"],
+				include=["amount", "type", "category", "wallet"],
+				condition=Q(is_archived=False),
+				name="tx_active_user_date",
+			),
+			models.Index(
+				fields=["user", "type", "date"],
+				include=["amount", "category", "wallet"],
+				condition=Q(is_archived=False),
+				name="tx_active_user_type_date",
+			),
+			models.Index(
+				fields=["wallet", "date", "id"],
+				include=["amount", "type", "category"],
+				condition=Q(is_archived=False),
+				name="tx_active_wallet_date",
+			),
 		]
 		ordering = ["-date", "-created_at"]
 
 	@property
 	def signed_amount(self):
 		return self.amount if self.type == self.Type.INCOME else -self.amount
+
+	@classmethod
+	def from_db(cls, db, field_names, values):
+		instance = super().from_db(db, field_names, values)
+		if not instance.get_deferred_fields().intersection(LEDGER_FIELDS):
+			instance._ledger_state = instance._ledger_snapshot()
+		return instance
+
+	def _ledger_snapshot(self):
+		return {f: getattr(self, f) for f in LEDGER_FIELDS}
+
+	def _stored_ledger_state(self):
+		state = getattr(self, "_ledger_state", None)
+		if state is not None or self._state.adding or self.pk is None:
+			return state
+		return type(self)._base_manager.filter(pk=self.pk).values(*LEDGER_FIELDS).first()
+
+	def _apply_ledger_change(self, previous, current):
+		if previous == current:
+			return
+		wallet_deltas = apply_ledger_changes(
+			ledger_rows_from_states([previous]),
+			ledger_rows_from_states([current]),
+		)
+
+		# mantém a carteira já carregada em memória coerente com o banco
+		if Transaction.wallet.is_cached(self) and self.wallet is not None:
+			delta = wallet_deltas.get(self.wallet.pk)
+			if delta:
+				self.wallet.transactions_balance += delta
+
+	def sync_transfer_flag(self, transfer_ids=None):
+		"""
+		is_transfer vem da categoria; fora dela a perna perde o transfer_group.
+		Uma perna nova já montada como transferência (is_transfer + transfer_group) é mantida.
+		"""
+		if self._state.adding and self.is_transfer and self.transfer_group is not None:
+			return
+		self.is_transfer = is_transfer_category(self.category_id, transfer_ids)
+		if not self.is_transfer:
+			self.transfer_group = None
+
+	def save(self, *args, **kwargs):
+		self.sync_transfer_flag()
+		update_fields = kwargs.get("update_fields")
+		if update_fields is not None and {"category", "category_id"}.intersection(update_fields):
+			kwargs["update_fields"] = set(update_fields) | {"is_transfer", "transfer_group"}
+		with db_transaction.atomic():
+			previous = self._stored_ledger_state()
+			super().save(*args, **kwargs)
+			current = self._ledger_snapshot()
+			self._apply_ledger_change(previous, current)
+			self._ledger_state = current
+			DataVersion.bump({self.user_id} | ({previous["user_id"]} if previous else set()))
+
+	def delete(self, *args, **kwargs):
+		with db_transaction.atomic():
+			previous = self._stored_ledger_state()
+			result = super().delete(*args, **kwargs)
+			self._apply_ledger_change(previous, None)
+			self._ledger_state = None
+			DataVersion.bump({previous["user_id"] if previous else self.user_id})
+		return result
@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.db import models, IntegrityError, transaction as db_transaction
+from django.db.models import F, Q
+
+User = settings.AUTH_USER_MODEL
+
+class DataVersion(models.Model):
+	"""
+	Contador de alterações dos dados financeiros de um usuário (user=NULL: dados globais,
+	como categorias do sistema). Incrementado a cada escrita em Transaction, Wallet ou
+	Category; chaves de cache e ETags derivadas dele nunca ficam desatualizadas.
+	"""
+
+	user = models.ForeignKey(User, null=True, blank=True, on_delete=models.CASCADE, related_name="+")
+	version = models.BigIntegerField(default=0)
+	updated_at = models.DateTimeField(auto_now=True)
+
+	class Meta:
+		constraints = [
+			models.UniqueConstraint(fields=["user"], nulls_distinct=False, name="uniq_data_version_user"),
+		]
+
+	@classmethod
+	def bump(cls, user_ids):
+		for user_id in sorted(user_ids, key=lambda u: -1 if u is None else u):
+			if cls.objects.filter(user_id=user_id).update(version=F("version") + 1):
+				continue
+			try:
+				with db_transaction.atomic():
+					cls.objects.create(user_id=user_id, version=1)
+			except IntegrityError:
+				cls.objects.filter(user_id=user_id).update(version=F("version") + 1)
+
+	@classmethod
+	def current(cls, user_id):
+		"""Versão combinada (usuário, global) em uma única consulta."""
+		rows = dict(
+			cls.objects.filter(Q(user_id=user_id) | Q(user__isnull=True)).values_list("user_id", "version")
+		)
+		return f"{rows.get(user_id, 0)}.{rows.get(None, 0)}"
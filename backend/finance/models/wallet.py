@@ -1,11 +1,30 @@
 from django.conf import settings
-from django.db import models
-from django.db.models import Q
+from django.db import connection, models, transaction as db_transaction
+from django.db.models import Case, DecimalField, F, Q, Sum, When, Window
 from django.db.models.functions import Lower
 from decimal import Decimal
+from .version import DataVersion
 
 User = settings.AUTH_USER_MODEL
 
+class WalletQuerySet(models.QuerySet):
+    def with_balance(self, total=False):
+        """
+        Anota balance (o mesmo cálculo de Wallet.current_balance, com o sinal
+        invertido do cartão de crédito) e, com total=True, balance_total: a soma
+        de todas as linhas via SUM() OVER (), na mesma consulta.
+        """
+        qs = self.annotate(
+            balance=Case(
+                When(kind=Wallet.Kind.CREDIT, then=F("transactions_balance") - F("initial_balance")),
+                default=F("initial_balance") + F("transactions_balance"),
+                output_field=DecimalField(max_digits=14, decimal_places=2),
+            )
+        )
+        if total:
+            qs = qs.annotate(balance_total=Window(Sum("balance")))
+        return qs
+
 class Wallet(models.Model):
     class Kind(models.TextChoices):
         CHECKING = "checking", "Conta corrente"
@@ -19,11 +38,15 @@ class Wallet(models.Model):
     name = models.CharField(max_length=60)
     kind = models.CharField(max_length=20, choices=Kind.choices, default=Kind.CHECKING)
     initial_balance = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal("0.00"))
+    # soma (receitas - despesas) das transações ativas, mantida por Transaction
+    transactions_balance = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"), editable=False)
     color = models.CharField(max_length=7, default="#3B82F6")
     is_archived = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = WalletQuerySet.as_manager()
+
     class Meta:
         ordering = ["name"]
         constraints = [
@@ -34,3 +57,49 @@ class Wallet(models.Model):
             ),
         ]
 
+    @property
+    def current_balance(self):
+        if self.kind == self.Kind.CREDIT:
+            return self.transactions_balance - self.initial_balance
+        return self.initial_balance + self.transactions_balance
+
+    def save(self, *args, **kwargs):
+        # o saldo armazenado só é alterado via apply_balance_deltas; uma instância
+        # desatualizada não pode sobrescrever o valor do banco
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name != "transactions_balance"
+            ]
+        with db_transaction.atomic():
+            super().save(*args, **kwargs)
+            DataVersion.bump({self.user_id})
+
+    def delete(self, *args, **kwargs):
+        with db_transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            DataVersion.bump({self.user_id})
+        return result
+
+    @classmethod
+    def apply_balance_deltas(cls, deltas):
+        """
+        Soma cada delta ao saldo armazenado numa única consulta. As carteiras são
+        travadas em ordem de id (FOR UPDATE no CTE) para evitar deadlocks.
+        """
+        ids = sorted(wallet_id for wallet_id, delta in deltas.items() if delta)
+        if not ids:
+            return
+        table = cls._meta.db_table
+        values = ", ".join(["(%s, %s::numeric)"] * len(ids))
+        params = [ids]
+        for wallet_id in ids:
+            params.extend((wallet_id, deltas[wallet_id]))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"WITH locked AS (SELECT id FROM {table} WHERE id = ANY(%s) ORDER BY id FOR UPDATE) "
+                f"UPDATE {table} AS w SET transactions_balance = w.transactions_balance + d.delta "
+                f"FROM (VALUES {values}) AS d(id, delta) "
+                "WHERE w.id = d.id AND w.id IN (SELECT id FROM locked)",
+                params,
+            )
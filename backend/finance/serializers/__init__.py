@@ -1,6 +1,8 @@
 from .category import CategorySerializer
-from .wallet import WalletSerializer
-from .transaction import TransactionSerializer
+from .wallet import WalletSerializer, WalletSummarySerializer
+from .transaction import TransactionSerializer, TransactionBulkItemSerializer
 from .aiplan import AIPlanSerializer
+from .importjob import ImportJobSerializer
+from .aiplanjob import AIPlanJobSerializer
 
-__all__ = ["CategorySerializer", "WalletSerializer", "TransactionSerializer", "AIPlanSerializer"]
+__all__ = ["CategorySerializer", "WalletSerializer", "WalletSummarySerializer", "TransactionSerializer", "TransactionBulkItemSerializer", "AIPlanSerializer", "ImportJobSerializer", "AIPlanJobSerializer"]
@@ -0,0 +1,15 @@
+from rest_framework import serializers
+from finance.models import AIPlanJob
+from .aiplan import AIPlanSerializer
+
+class AIPlanJobSerializer(serializers.ModelSerializer):
+    plan = AIPlanSerializer(read_only=True)
+
+    class Meta:
+        model = AIPlanJob
+        fields = [
+            "id", "status", "template", "objective", "temperature",
+            "plan", "model", "tokens", "detail",
+            "created_at", "finished_at",
+        ]
+        read_only_fields = fields
@@ -0,0 +1,12 @@
+from rest_framework import serializers
+from finance.models import ImportJob
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ImportJob
+        fields = [
+            "id", "wallet", "filename", "format", "status",
+            "processed", "imported", "skipped", "failed", "errors", "detail",
+            "created_at", "finished_at",
+        ]
+        read_only_fields = fields
@@ -90,3 +90,53 @@ class TransactionSerializerTests(TestCase):
         with self.assertRaises(serializers.ValidationError) as exc:
             ser.validate({"amount": Decimal("10.00"), "wallet": self.w2})
         self.assertIn("wallet", exc.exception.detail)
+
+    def test_transfer_category_sets_is_transfer(self):
+        transfer = Category.get_transfer_category()
+        data = {
+            "type": Transaction.Type.EXPENSE,
+            "wallet": self.w1.id,
+            "category": transfer.id,
+            "amount": Decimal("10.00"),
+        }
+        ser = TransactionSerializer(data=data, context={"request": self.req_u1})
+        self.assertTrue(ser.is_valid(), ser.errors)
+        self.assertTrue(ser.save().is_transfer)
+
+        data["category"] = self.cat.id
+        ser = TransactionSerializer(data=data, context={"request": self.req_u1})
+        self.assertTrue(ser.is_valid(), ser.errors)
+        self.assertFalse(ser.save().is_transfer)
+
+
+class TransactionBulkItemFastPathTests(TestCase):
+    """O caminho rápido do bulk create nunca diverge do serializer."""
+
+    def test_fast_path_matches_serializer(self):
+        from finance.serializers import TransactionBulkItemSerializer
+        from finance.services.bulk import _parse_row
+
+        base = {"type": "expense", "wallet": 1, "amount": "10.50"}
+        variants = [
+            {},
+            {"category": 3, "date": "2024-02-29", "description": "  Café  ", "is_archived": True},
+            {"amount": 12}, {"amount": 12.5}, {"amount": " 7.1 "}, {"amount": "1e2"},
+            {"amount": "0"}, {"amount": "-1"}, {"amount": "1.005"}, {"amount": "NaN"},
+            {"amount": "9999999999.99"}, {"amount": "10000000000"}, {"amount": "x"}, {"amount": None},
+            {"type": "nope"}, {"wallet": "1"}, {"wallet": True}, {"category": "2"},
+            {"date": "2024-02-30"}, {"date": None}, {"date": "2024-2-3"},
+            {"description": "x" * 141}, {"description": " " + "x" * 140}, {"description": None},
+            {"description": "a\x00b"}, {"is_archived": "true"}, {"is_archived": None},
+        ]
+        for extra in variants:
+            row = {**base, **extra}
+            fast = _parse_row(row)
+            if fast is None:
+                continue
+            with self.subTest(row=row):
+                expected = TransactionBulkItemSerializer().run_validation(row)
+                expected.setdefault("date", None)
+                self.assertEqual(fast, dict(expected))
+        self.assertIsNone(_parse_row({**base, "amount": "-1"}))
+        self.assertIsNone(_parse_row({**base, "type": "nope"}))
+        self.assertIsNone(_parse_row({**base, "description": "x" * 141}))
@@ -1,19 +1,56 @@
 from rest_framework import serializers
 from finance.models import Transaction
 from .category import CategorySerializer
-from .wallet import WalletSerializer
+from .wallet import WalletSummarySerializer
+
+# ?expand=<relação> -> campo aninhado correspondente
+EXPANDABLE_FIELDS = {"wallet": "wallet_detail", "category": "category_detail"}
+
+def _csv_param(params, name):
+    raw = params.get(name)
+    if raw is None:
+        return None
+    return {part.strip() for part in raw.split(",") if part.strip()}
 
 class TransactionSerializer(serializers.ModelSerializer):
     category_detail = CategorySerializer(source="category", read_only=True)
-    wallet_detail = WalletSerializer(source="wallet", read_only=True)
+    wallet_detail = WalletSummarySerializer(source="wallet", read_only=True)
 
     class Meta:
         model = Transaction
         fields = [
             "id", "type", "wallet", "wallet_detail", "category", "category_detail",
             "amount", "date", "description", "created_at", "updated_at", "is_archived",
+            "is_transfer", "transfer_group",
         ]
-        read_only_fields = ["id", "created_at", "updated_at"]
+        read_only_fields = ["id", "created_at", "updated_at", "is_transfer", "transfer_group"]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        selected = self.selected_fields(self.context.get("request"))
+        if selected is not None:
+            for name in set(self.fields) - selected:
+                self.fields.pop(name)
+
+    @classmethod
+    def selected_fields(cls, request):
+        """
+        Campos pedidos em leituras via ?fields=id,date,amount e ?expand=wallet,category.
+        Com ?expand sem ?fields saem todos os campos simples mais os aninhados pedidos.
+        Retorna None (representação completa) quando nenhum dos dois é informado.
+        """
+        if request is None or request.method not in ("GET", "HEAD"):
+            return None
+        fields = _csv_param(request.query_params, "fields")
+        expand = _csv_param(request.query_params, "expand")
+        if fields is None and expand is None:
+            return None
+
+        names = set(cls.Meta.fields)
+        selected = fields & names if fields else names - set(EXPANDABLE_FIELDS.values())
+        selected |= {EXPANDABLE_FIELDS[name] for name in expand or () if name in EXPANDABLE_FIELDS}
+        selected.add("id")
+        return selected
 
     def validate(self, attrs):
         amount = attrs.get("amount")
@@ -26,11 +63,29 @@ class TransactionSerializer(serializers.ModelSerializer):
         if not wallet:
             raise serializers.ValidationError({"wallet": "Carteira é obrigatória"})
 
-        if wallet.user != self.context["request"].user:
+        if wallet.user_id != self.context["request"].user.id:
             raise serializers.ValidationError({"wallet": "Carteira não pertence ao usuário"})
 
         return attrs
 
     def create(self, validated_data):
         validated_data["user"] = self.context["request"].user
-        return super().create(validated_data)
\ No newline at end of file
+        return super().create(validated_data)
+
+class TransactionBulkItemSerializer(serializers.Serializer):
+    """
+    Uma linha de POST /transactions/bulk/. Carteira e categoria chegam como ids
+    e são validadas em lote (uma consulta para todas as linhas).
+    """
+    type = serializers.ChoiceField(choices=Transaction.Type.choices)
+    wallet = serializers.IntegerField()
+    category = serializers.IntegerField(allow_null=True, default=None)
+    amount = serializers.DecimalField(max_digits=12, decimal_places=2)
+    date = serializers.DateField(required=False)
+    description = serializers.CharField(max_length=140, allow_blank=True, default="")
+    is_archived = serializers.BooleanField(default=False)
+
+    def validate_amount(self, value):
+        if value <= 0:
+            raise serializers.ValidationError("O valor deve ser positivo")
+        return value
@@ -1,8 +1,23 @@
-from decimal import Decimal
 from rest_framework import serializers
-from django.db.models import Sum, Case, When, F, DecimalField, Value
 from finance.models import Wallet
 
+def wallet_balance(wallet):
+    """Saldo anotado por Wallet.objects.with_balance(), se houver; senão o calculado na instância."""
+    balance = getattr(wallet, "balance", None)
+    return wallet.current_balance if balance is None else balance
+
+class WalletSummarySerializer(serializers.ModelSerializer):
+    """Carteira aninhada em transações: só campos da própria linha, sem consultas extras."""
+    current_balance = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Wallet
+        fields = ["id", "name", "kind", "color", "current_balance"]
+        read_only_fields = fields
+
+    def get_current_balance(self, obj):
+        return str(wallet_balance(obj))
+
 class WalletSerializer(serializers.ModelSerializer):
     current_balance = serializers.SerializerMethodField()
 
@@ -15,20 +30,7 @@ class WalletSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "current_balance", "created_at", "updated_at"]
 
     def get_current_balance(self, obj):
-        total_transactions = obj.transactions.filter(is_archived=False).aggregate(
-            total=Sum(
-                Case(
-                    When(type="income", then=F("amount")),
-                    When(type="expense", then=-F("amount")),
-                    default=Value(0),
-                    output_field=DecimalField(max_digits=14, decimal_places=2),
-                )
-            )
-        )["total"] or Decimal("0.00")
-
-        if obj.kind == Wallet.Kind.CREDIT:
-            return str(total_transactions - obj.initial_balance)
-        return str(obj.initial_balance + total_transactions)
+        return str(wallet_balance(obj))
 
     def validate_name(self, value):
         name = value.strip()
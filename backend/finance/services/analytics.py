@@ -0,0 +1,344 @@
+from datetime import date
+from calendar import monthrange
+from decimal import Decimal
+from functools import cached_property
+from django.db import connection
+from django.db.models import Q, Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from finance.models import Wallet, MonthlyRollup
+from finance.models.transaction import signed_amount_expression
+
+BALANCE_GRANULARITIES = {"day": "1 day", "week": "1 week", "month": "1 month"}
+BALANCE_SERIES_MAX_POINTS = 4000
+
+MONTH_LABELS = ["Jan", "Fev", "Mar", "Abr", "Mai", "Jun", "Jul", "Ago", "Set", "Out", "Nov", "Dez"]
+
+def month_bounds(y, m):
+	return date(y, m, 1), date(y, m, monthrange(y, m)[1])
+
+def _shift_month(y, m, delta):
+	idx = y * 12 + (m - 1) + delta
+	return idx // 12, idx % 12 + 1
+
+def _pct_change(curr, prev):
+	if prev and prev != Decimal("0"):
+		return float((curr - prev) / prev)
+	return None
+
+class AnalyticsParamError(ValueError):
+	pass
+
+class AnalyticsScope:
+	"""
+	Parâmetros e peças compartilhadas pelas ações analíticas:
+	- rollups do usuário (com e sem transferências)
+	- saldo de abertura das carteiras
+	- limites de mês
+	Cada peça é calculada uma única vez por requisição.
+	"""
+
+	def __init__(self, user, params):
+		self.user = user
+		self.params = params
+		self.wallet_id = params.get("wallet_id")
+		self.today = timezone.localdate()
+
+	@cached_property
+	def rollups(self):
+		return self.rollups_with_transfers.filter(is_transfer=False)
+
+	@cached_property
+	def rollups_with_transfers(self):
+		qs = MonthlyRollup.objects.filter(user=self.user)
+		if self.wallet_id:
+			qs = qs.filter(wallet_id=self.wallet_id)
+		return qs
+
+	@cached_property
+	def balance_rollups(self):
+		# séries de saldo: só carteiras ativas, como opening_balance e o SQL de balance_history_data
+		return self.rollups_with_transfers.filter(wallet__is_archived=False)
+
+	@cached_property
+	def opening_balance(self):
+		"""Saldo inicial consolidado: ativos - crédito."""
+		wallets_qs = Wallet.objects.filter(user=self.user, is_archived=False)
+		if self.wallet_id:
+			wallets_qs = wallets_qs.filter(id=self.wallet_id)
+		agg = wallets_qs.aggregate(
+			assets=Sum("initial_balance", filter=~Q(kind=Wallet.Kind.CREDIT)),
+			credit=Sum("initial_balance", filter=Q(kind=Wallet.Kind.CREDIT)),
+		)
+		return (agg["assets"] or Decimal("0.00")) - (agg["credit"] or Decimal("0.00"))
+
+	@cached_property
+	def current_month(self):
+		return month_bounds(self.today.year, self.today.month)
+
+	@cached_property
+	def months(self):
+		try:
+			return max(1, min(24, int(self.params.get("months", "6"))))
+		except ValueError:
+			return 6
+
+	@cached_property
+	def months_window(self):
+		y, m = _shift_month(self.today.year, self.today.month, -(self.months - 1))
+		return date(y, m, 1), self.current_month[1]
+
+	@cached_property
+	def granularity(self):
+		granularity = self.params.get("granularity") or "month"
+		if granularity not in BALANCE_GRANULARITIES:
+			raise AnalyticsParamError(f"granularity deve ser uma de: {', '.join(BALANCE_GRANULARITIES)}")
+		return granularity
+
+	@cached_property
+	def date_range(self):
+		"""date_start/date_end livres; sem eles, a janela de ?months até hoje."""
+		bounds = []
+		for name, default in (("date_start", self.months_window[0]), ("date_end", self.today)):
+			raw = self.params.get(name)
+			try:
+				value = parse_date(raw) if raw else default
+			except ValueError:
+				value = None
+			if value is None:
+				raise AnalyticsParamError(f"{name} inválida (use AAAA-MM-DD).")
+			bounds.append(value)
+		if bounds[0] > bounds[1]:
+			raise AnalyticsParamError("date_start deve ser anterior a date_end.")
+		return tuple(bounds)
+
+	@cached_property
+	def selected_month(self):
+		y = self.params.get("year")
+		m = self.params.get("month")
+		if y and m:
+			return month_bounds(int(y), int(m))
+		return self.current_month
+
+def _month_keys(start, months):
+	y, m = start.year, start.month
+	for _ in range(months):
+		yield y, m
+		y, m = _shift_month(y, m, 1)
+
+def stats_data(scope):
+	start, end = scope.current_month
+	prev_y, prev_m = _shift_month(start.year, start.month, -1)
+	pstart = date(prev_y, prev_m, 1)
+
+	totals = scope.rollups.aggregate(
+		balance=Sum(signed_amount_expression("total")),
+		income_curr=Sum("total", filter=Q(type="income", month=start)),
+		expense_curr=Sum("total", filter=Q(type="expense", month=start)),
+		income_prev=Sum("total", filter=Q(type="income", month=pstart)),
+		expense_prev=Sum("total", filter=Q(type="expense", month=pstart)),
+	)
+	balance_total = totals["balance"] or Decimal("0.00")
+	income_curr = totals["income_curr"] or Decimal("0.00")
+	expense_curr = totals["expense_curr"] or Decimal("0.00")
+	income_prev = totals["income_prev"] or Decimal("0.00")
+	expense_prev = totals["expense_prev"] or Decimal("0.00")
+
+	net_worth = scope.opening_balance + balance_total
+
+	return {
+		"as_of": scope.today.isoformat(),
+		"period": {"start": start.isoformat(), "end": end.isoformat()},
+		"balance": str(balance_total),
+		"net_worth": str(net_worth),
+		"income": {
+			"current": str(income_curr),
+			"previous": str(income_prev),
+			"change_pct": _pct_change(income_curr, income_prev),
+		},
+		"expenses": {
+			"current": str(expense_curr),
+			"previous": str(expense_prev),
+			"change_pct": _pct_change(expense_curr, expense_prev),
+		},
+	}
+
+def monthly_data(scope):
+	start, end = scope.months_window
+	grouped = (
+		scope.rollups.filter(month__gte=start, month__lte=end)
+		.values("month")
+		.annotate(
+			income=Sum("total", filter=Q(type="income")),
+			expenses=Sum("total", filter=Q(type="expense")),
+		)
+		.order_by("month")
+	)
+	by_period = {(g["month"].year, g["month"].month): g for g in grouped}
+
+	out = []
+	for y, m in _month_keys(start, scope.months):
+		g = by_period.get((y, m))
+		inc = g["income"] or Decimal("0.00") if g else Decimal("0.00")
+		exp = g["expenses"] or Decimal("0.00") if g else Decimal("0.00")
+		if inc != Decimal("0.00") or exp != Decimal("0.00"):
+			out.append({
+				"year": y,
+				"month_num": m,
+				"month": MONTH_LABELS[m - 1],
+				"income": str(inc),
+				"expenses": str(exp)
+			})
+	return {"months": out}
+
+def _by_category(scope, type_):
+	start, end = scope.selected_month
+	agg = (
+		scope.rollups.filter(type=type_, month=start)
+		.values("category__name")
+		.annotate(value=Sum("total"))
+		.order_by("-value")
+	)
+	rows = [(row["category__name"] or "Sem categoria", row["value"] or Decimal("0.00")) for row in agg]
+	return rows, {"start": start.isoformat(), "end": end.isoformat()}
+
+def expenses_by_category_data(scope):
+	rows, period = _by_category(scope, "expense")
+	items = [{"name": name, "value": str(val)} for name, val in rows]
+	return {"items": items, "period": period}
+
+def income_by_source_data(scope):
+	rows, period = _by_category(scope, "income")
+	total_sum = sum(val for _, val in rows) or Decimal("0")
+	items = []
+	for name, val in rows:
+		pct = float((val / total_sum) if total_sum else 0) * 100
+		items.append({"name": name, "value": str(val), "percent": round(pct)})
+	return {"items": items, "period": period}
+
+def balance_series_data(scope):
+	start, end = scope.months_window
+	rollups = scope.balance_rollups
+
+	# transações anteriores ao início
+	prior_tx = rollups.filter(month__lt=start).aggregate(
+		delta=Sum(signed_amount_expression("total"))
+	)["delta"] or Decimal("0.00")
+	prior = scope.opening_balance + prior_tx
+
+	grouped = (
+		rollups.filter(month__gte=start, month__lte=end)
+		.values("month")
+		.annotate(delta=Sum(signed_amount_expression("total")))
+		.order_by("month")
+	)
+	by_period = {(g["month"].year, g["month"].month): g["delta"] or Decimal("0.00") for g in grouped}
+
+	out = []
+	running = prior
+	for y, m in _month_keys(start, scope.months):
+		running += by_period.get((y, m), Decimal("0.00"))
+		if running != Decimal("0.00"):
+			out.append({"year": y, "month_num": m, "month": MONTH_LABELS[m - 1], "balance": str(running)})
+	return {"months": out, "opening_balance": str(prior)}
+
+# Saldo ao fim de cada período, em uma consulta: generate_series cria todos os
+# períodos (inclusive os sem movimento), os deltas anteriores ao início caem no
+# primeiro período e SUM(...) OVER (ORDER BY bucket) acumula sobre o saldo inicial.
+BALANCE_HISTORY_SQL = """
+WITH wallets AS (
+	SELECT id, name,
+		CASE WHEN kind = %(credit)s THEN -initial_balance ELSE initial_balance END AS opening
+	FROM finance_wallet
+	WHERE user_id = %(user)s AND NOT is_archived {wallet_filter}
+),
+buckets AS (
+	SELECT generate_series(
+		date_trunc(%(unit)s, %(start)s::timestamp),
+		%(end)s::timestamp,
+		%(step)s::interval
+	)::date AS bucket
+),
+deltas AS (
+	SELECT t.wallet_id,
+		GREATEST(date_trunc(%(unit)s, t.date::timestamp), date_trunc(%(unit)s, %(start)s::timestamp))::date AS bucket,
+		SUM(CASE WHEN t.type = %(income)s THEN t.amount ELSE -t.amount END) AS delta
+	FROM finance_transaction t
+	JOIN wallets w ON w.id = t.wallet_id
+	WHERE t.user_id = %(user)s AND NOT t.is_archived AND t.date <= %(end)s
+	GROUP BY 1, 2
+)
+{select}
+"""
+
+BALANCE_HISTORY_CONSOLIDATED = """
+SELECT NULL, NULL, b.bucket,
+	(SELECT COALESCE(SUM(opening), 0) FROM wallets)
+	+ SUM(COALESCE(d.delta, 0)) OVER (ORDER BY b.bucket)
+FROM buckets b
+LEFT JOIN (SELECT bucket, SUM(delta) AS delta FROM deltas GROUP BY bucket) d ON d.bucket = b.bucket
+ORDER BY b.bucket
+"""
+
+BALANCE_HISTORY_PER_WALLET = """
+SELECT w.id, w.name, b.bucket,
+	w.opening + SUM(COALESCE(d.delta, 0)) OVER (PARTITION BY w.id ORDER BY b.bucket)
+FROM wallets w
+CROSS JOIN buckets b
+LEFT JOIN deltas d ON d.wallet_id = w.id AND d.bucket = b.bucket
+ORDER BY w.name, w.id, b.bucket
+"""
+
+def _bucket_count(start, end, granularity):
+	if granularity == "day":
+		return (end - start).days + 1
+	if granularity == "week":
+		return (end - start).days // 7 + 2
+	return (end.year - start.year) * 12 + end.month - start.month + 1
+
+def balance_history_data(scope):
+	"""
+	Série de saldos por dia, semana ou mês num intervalo arbitrário
+	(?granularity=, ?date_start=, ?date_end=), consolidada ou, com
+	?per_wallet=1, uma série por carteira. Usa SQL do Postgres.
+	"""
+	granularity = scope.granularity
+	start, end = scope.date_range
+	per_wallet = scope.params.get("per_wallet") in ("1", "true")
+	if _bucket_count(start, end, granularity) > BALANCE_SERIES_MAX_POINTS:
+		raise AnalyticsParamError(
+			f"Intervalo grande demais: máximo de {BALANCE_SERIES_MAX_POINTS} pontos por série."
+		)
+
+	params = {
+		"user": scope.user.pk,
+		"credit": Wallet.Kind.CREDIT,
+		"income": "income",
+		"unit": granularity,
+		"step": BALANCE_GRANULARITIES[granularity],
+		"start": start,
+		"end": end,
+	}
+	wallet_filter = ""
+	if scope.wallet_id:
+		wallet_filter = "AND id = %(wallet)s"
+		params["wallet"] = scope.wallet_id
+	sql = BALANCE_HISTORY_SQL.format(
+		wallet_filter=wallet_filter,
+		select=BALANCE_HISTORY_PER_WALLET if per_wallet else BALANCE_HISTORY_CONSOLIDATED,
+	)
+	with connection.cursor() as cursor:
+		cursor.execute(sql, params)
+		rows = cursor.fetchall()
+
+	series = {}
+	for wallet_id, name, bucket, balance in rows:
+		entry = series.setdefault(wallet_id, {"id": wallet_id, "name": name, "points": []})
+		entry["points"].append({"date": bucket.isoformat(), "balance": str(balance)})
+
+	data = {"granularity": granularity, "start": start.isoformat(), "end": end.isoformat()}
+	if per_wallet:
+		data["wallets"] = list(series.values())
+	else:
+		data["points"] = series[None]["points"] if series else []
+	return data
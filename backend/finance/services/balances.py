@@ -0,0 +1,38 @@
+from decimal import Decimal
+from django.db import transaction as db_transaction
+from django.db.models import OuterRef, Subquery, Sum, F, Value, DecimalField
+from django.db.models.functions import Coalesce
+from finance.models import Wallet, Transaction
+from finance.models.transaction import signed_amount_expression
+
+def expected_transactions_balance():
+	totals = (
+		Transaction.objects.filter(wallet=OuterRef("pk"), is_archived=False)
+		.order_by()
+		.values("wallet")
+		.annotate(total=Sum(signed_amount_expression()))
+		.values("total")
+	)
+	return Coalesce(
+		Subquery(totals),
+		Value(Decimal("0.00")),
+		output_field=DecimalField(max_digits=14, decimal_places=2),
+	)
+
+def find_balance_mismatches(wallets_qs=None):
+	qs = wallets_qs if wallets_qs is not None else Wallet.objects.all()
+	return list(
+		qs.annotate(expected=expected_transactions_balance())
+		.exclude(transactions_balance=F("expected"))
+		.order_by("id")
+		.values("id", "user_id", "name", "transactions_balance", "expected")
+	)
+
+def rebuild_wallet_balances(wallets_qs=None):
+	qs = wallets_qs if wallets_qs is not None else Wallet.objects.all()
+	with db_transaction.atomic():
+		# trava as carteiras: escritas concorrentes aplicam o delta depois do rebuild
+		ids = list(qs.select_for_update().order_by("id").values_list("id", flat=True))
+		return Wallet.objects.filter(id__in=ids).update(
+			transactions_balance=expected_transactions_balance()
+		)
@@ -0,0 +1,155 @@
+import json
+import math
+import subprocess
+import time
+import tracemalloc
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+from finance.models import Transaction
+from finance.services.llm_context import build_user_finance_context
+
+API_PREFIX = "/api/finance"
+
+def read_endpoints(today=None):
+	"""(nome, caminho, parâmetros) das leituras medidas."""
+	today = today or timezone.localdate()
+	year_ago = (today - timedelta(days=365)).isoformat()
+	return [
+		("transactions.page_1", "/transactions/", {}),
+		("transactions.page_10", "/transactions/", {"page": "10"}),
+		("transactions.page_100", "/transactions/", {"page": "100"}),
+		("transactions.cursor", "/transactions/", {"pagination": "cursor"}),
+		("transactions.search", "/transactions/", {"q": "pix"}),
+		("transactions.fields", "/transactions/", {"fields": "id,date,amount,type", "expand": "category"}),
+		("transactions.stats", "/transactions/stats/", {}),
+		("transactions.monthly", "/transactions/monthly/", {"months": "12"}),
+		("transactions.expenses_by_category", "/transactions/expenses-by-category/", {}),
+		("transactions.income_by_source", "/transactions/income-by-source/", {}),
+		("transactions.balance_series", "/transactions/balance-series/", {"months": "12"}),
+		("transactions.balance_series_daily", "/transactions/balance-series/", {"granularity": "day", "date_start": year_ago}),
+		("transactions.recent", "/transactions/recent/", {}),
+		("transactions.dashboard", "/transactions/dashboard/", {}),
+		("wallets.list", "/wallets/", {}),
+		("wallets.total_balance", "/wallets/total-balance/", {}),
+		("categories.list", "/categories/", {}),
+		("ai_plans.list", "/ai/plans/", {}),
+	]
+
+def _percentile(values, pct):
+	ordered = sorted(values)
+	index = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+	return ordered[index]
+
+def _measure(fn, iterations, warmup, cold_cache):
+	"""
+	Latência sem tracemalloc nem captura de SQL (ambos pesam no perf_counter);
+	consultas e pico de memória saem de uma passada extra, separada.
+	"""
+	for _ in range(warmup):
+		fn()
+	timings = []
+	for _ in range(iterations):
+		if cold_cache:
+			cache.clear()
+		started = time.perf_counter()
+		fn()
+		timings.append((time.perf_counter() - started) * 1000)
+
+	if cold_cache:
+		cache.clear()
+	tracemalloc.start()
+	try:
+		with CaptureQueriesContext(connection) as ctx:
+			status, size = fn()
+		_, peak = tracemalloc.get_traced_memory()
+	finally:
+		tracemalloc.stop()
+	queries = len(ctx.captured_queries)
+	return {
+		"p50_ms": round(_percentile(timings, 50), 2),
+		"p95_ms": round(_percentile(timings, 95), 2),
+		"mean_ms": round(sum(timings) / len(timings), 2),
+		"queries": queries,
+		"peak_kb": round(peak / 1024, 1),
+		"bytes": size,
+		"status": status,
+	}
+
+def _git_commit():
+	try:
+		return subprocess.run(
+			["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5,
+		).stdout.strip() or None
+	except (OSError, subprocess.SubprocessError):
+		return None
+
+def run_benchmarks(user, iterations=20, warmup=2, cold_cache=True, only=None, progress=None):
+	"""
+	Mede cada leitura chamando a view resolvida pela URL (sem middleware nem rede):
+	latência p50/p95, consultas SQL, pico de memória (tracemalloc) e tamanho da resposta.
+	cold_cache=True limpa o cache a cada iteração, medindo o cálculo e não o cache.
+	"""
+	# "testserver" só é aceito sob o test runner; usa um host permitido de verdade
+	host = next((h.lstrip(".") for h in settings.ALLOWED_HOSTS if h != "*"), "localhost")
+	factory = APIRequestFactory(HTTP_HOST=host)
+
+	def call(path, params):
+		view = resolve(API_PREFIX + path).func
+
+		def run():
+			request = factory.get(API_PREFIX + path, params)
+			force_authenticate(request, user=user)
+			response = view(request)
+			response.render()
+			return response.status_code, len(response.content)
+		return run
+
+	def context():
+		data = build_user_finance_context(user)
+		return 200, len(json.dumps(data, default=str))
+
+	cases = [(name, call(path, params)) for name, path, params in read_endpoints()]
+	cases.append(("llm.context", context))
+
+	results = {}
+	for name, fn in cases:
+		if only and not any(name.startswith(prefix) for prefix in only):
+			continue
+		results[name] = _measure(fn, iterations, warmup, cold_cache)
+		if progress:
+			progress(name, results[name])
+
+	return {
+		"meta": {
+			"commit": _git_commit(),
+			"created_at": timezone.now().isoformat(),
+			"user_id": user.pk,
+			"transactions": Transaction.objects.filter(user=user).count(),
+			"iterations": iterations,
+			"cold_cache": cold_cache,
+		},
+		"results": results,
+	}
+
+def compare_reports(baseline, current, threshold_pct=20.0, min_delta_ms=2.0):
+	"""
+	Regressões do relatório atual contra o baseline: p95 mais de threshold_pct%
+	(e min_delta_ms) mais lento, ou mais consultas SQL. Retorna a lista de mensagens.
+	"""
+	regressions = []
+	for name, now in current["results"].items():
+		before = baseline.get("results", {}).get(name)
+		if not before:
+			continue
+		delta = now["p95_ms"] - before["p95_ms"]
+		if delta > min_delta_ms and delta > before["p95_ms"] * threshold_pct / 100:
+			regressions.append(f"{name}: p95 {before['p95_ms']}ms -> {now['p95_ms']}ms")
+		if now["queries"] > before["queries"]:
+			regressions.append(f"{name}: consultas {before['queries']} -> {now['queries']}")
+	return regressions
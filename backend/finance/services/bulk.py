@@ -0,0 +1,133 @@
+from decimal import Decimal, InvalidOperation
+from django.db import transaction as db_transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
+from finance.models import Category, Wallet, Transaction
+from finance.serializers import TransactionBulkItemSerializer
+
+BULK_CREATE_BATCH_SIZE = 1000
+BULK_CREATE_MAX_ROWS = 10000
+
+_TYPES = frozenset(Transaction.Type.values)
+_CENTS = Decimal("0.01")
+_MAX_AMOUNT = Decimal("1e10")
+
+def _parse_row(row):
+	"""
+	Caminho rápido para a linha no formato canônico (ids int, valor string/número,
+	data ISO, booleano JSON). Retorna None para qualquer outra coisa, e a linha
+	passa pelo serializer, que decide e monta as mensagens de erro.
+	Nunca aceita algo que o TransactionBulkItemSerializer recusaria.
+	"""
+	if not isinstance(row, dict):
+		return None
+	kind = row.get("type")
+	wallet = row.get("wallet")
+	category = row.get("category")
+	amount = row.get("amount")
+	day = row.get("date")
+	description = row.get("description", "")
+	archived = row.get("is_archived", False)
+	if kind.__class__ is not str or kind not in _TYPES:
+		return None
+	if wallet.__class__ is not int or (category is not None and category.__class__ is not int):
+		return None
+	if archived is not True and archived is not False:
+		return None
+	if amount.__class__ not in (str, int, float):
+		return None
+	amount = str(amount).strip()
+	if len(amount) > 32:
+		return None
+	try:
+		amount = Decimal(amount)
+	except InvalidOperation:
+		return None
+	if not amount.is_finite() or amount <= 0 or amount >= _MAX_AMOUNT or amount.as_tuple().exponent < -2:
+		return None
+	if "date" in row:
+		if day.__class__ is not str:
+			return None
+		try:
+			day = parse_date(day)
+		except ValueError:
+			return None
+		if day is None:
+			return None
+	if description.__class__ is not str or "\x00" in description:
+		return None
+	description = description.strip()
+	if len(description) > 140:
+		return None
+	try:
+		description.encode("utf-8")
+	except UnicodeEncodeError:
+		return None
+	return {
+		"type": kind,
+		"wallet": wallet,
+		"category": category,
+		"amount": amount.quantize(_CENTS),
+		"date": day,
+		"description": description,
+		"is_archived": archived,
+	}
+
+def build_transactions(user, rows):
+	"""
+	Valida as linhas e monta as instâncias (sem salvar).
+	Linhas canônicas são convertidas direto por _parse_row; só as demais passam
+	pelo serializer, que mantém o formato de erro do DRF.
+	Carteiras e categorias de todas as linhas são checadas com uma consulta cada.
+	Retorna (lista de (índice, Transaction), {índice: erros}).
+	"""
+	child = TransactionBulkItemSerializer()
+	valid = []
+	errors = {}
+	for index, row in enumerate(rows):
+		attrs = _parse_row(row)
+		if attrs is not None:
+			valid.append((index, attrs))
+			continue
+		try:
+			valid.append((index, child.run_validation(row)))
+		except ValidationError as exc:
+			errors[index] = exc.detail
+
+	wallet_ids = {attrs["wallet"] for _, attrs in valid}
+	category_ids = {attrs["category"] for _, attrs in valid if attrs["category"] is not None}
+	wallets = set(Wallet.objects.filter(user=user, id__in=wallet_ids).order_by().values_list("id", flat=True))
+	categories = set(
+		Category.objects.filter(Q(user=user) | Q(user__isnull=True), id__in=category_ids)
+		.order_by().values_list("id", flat=True)
+	)
+
+	today = timezone.localdate()
+	built = []
+	for index, attrs in valid:
+		row_errors = {}
+		if attrs["wallet"] not in wallets:
+			row_errors["wallet"] = ["Carteira não pertence ao usuário"]
+		if attrs["category"] is not None and attrs["category"] not in categories:
+			row_errors["category"] = ["Categoria não encontrada"]
+		if row_errors:
+			errors[index] = row_errors
+			continue
+		built.append((index, Transaction(
+			user=user,
+			wallet_id=attrs["wallet"],
+			category_id=attrs["category"],
+			type=attrs["type"],
+			amount=attrs["amount"],
+			date=attrs.get("date") or today,
+			description=attrs["description"],
+			is_archived=attrs["is_archived"],
+		)))
+	return built, errors
+
+def insert_transactions(objs, batch_size=BULK_CREATE_BATCH_SIZE):
+	"""bulk_create em lotes; saldos e rollups são ajustados uma única vez ao final."""
+	with db_transaction.atomic():
+		return Transaction.objects.bulk_create(objs, batch_size=batch_size)
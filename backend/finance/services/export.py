@@ -0,0 +1,65 @@
+import csv
+import io
+import json
+import zlib
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FIELDS = (
+	"id", "date", "type", "amount", "description",
+	"wallet_id", "wallet__name", "category_id", "category__name",
+	"is_archived", "created_at",
+)
+EXPORT_HEADER = (
+	"id", "date", "type", "amount", "description",
+	"wallet_id", "wallet", "category_id", "category",
+	"is_archived", "created_at",
+)
+EXPORT_FORMATS = ("csv", "jsonl")
+
+def _export_rows(queryset, chunk_size):
+	# values_list + iterator: cursor do lado do servidor no Postgres, sem instanciar modelos
+	return queryset.values_list(*EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+
+def _value(value):
+	if hasattr(value, "isoformat"):
+		return value.isoformat()
+	if value is None or isinstance(value, (bool, int, str)):
+		return value
+	return str(value)
+
+def iter_csv(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+	buffer = io.StringIO()
+	writer = csv.writer(buffer)
+	writer.writerow(EXPORT_HEADER)
+	for count, row in enumerate(_export_rows(queryset, chunk_size), start=1):
+		writer.writerow([_value(v) for v in row])
+		if count % chunk_size == 0:
+			yield buffer.getvalue()
+			buffer.seek(0)
+			buffer.truncate()
+	yield buffer.getvalue()
+
+def iter_jsonl(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+	lines = []
+	for row in _export_rows(queryset, chunk_size):
+		lines.append(json.dumps(dict(zip(EXPORT_HEADER, map(_value, row))), ensure_ascii=False))
+		if len(lines) >= chunk_size:
+			yield "\n".join(lines) + "\n"
+			lines = []
+	if lines:
+		yield "\n".join(lines) + "\n"
+
+def gzip_stream(chunks):
+	"""Comprime um fluxo de texto em gzip sem montar o arquivo inteiro em memória."""
+	compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+	for chunk in chunks:
+		data = compressor.compress(chunk.encode("utf-8"))
+		if data:
+			yield data
+	yield compressor.flush()
+
+def export_stream(queryset, fmt, gzip=False, chunk_size=EXPORT_CHUNK_SIZE):
+	chunks = iter_csv(queryset, chunk_size) if fmt == "csv" else iter_jsonl(queryset, chunk_size)
+	if gzip:
+		return gzip_stream(chunks)
+	return (chunk.encode("utf-8") for chunk in chunks)
@@ -0,0 +1,317 @@
+import csv
+import io
+import os
+import re
+import unicodedata
+from collections import Counter
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from django.db import DatabaseError, transaction as db_transaction
+from django.db.models import Q
+from django.utils import timezone
+from finance.models import Category, Wallet, Transaction, ImportJob
+
+IMPORT_BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 50
+
+CSV_COLUMNS = {
+	"date": ("date", "data", "dt"),
+	"description": ("description", "descricao", "historico", "memo", "lancamento"),
+	"amount": ("amount", "valor", "value"),
+	"type": ("type", "tipo"),
+	"category": ("category", "categoria"),
+	"wallet": ("wallet", "carteira", "conta"),
+}
+INCOME_WORDS = {"income", "receita", "entrada", "credito", "credit", "c"}
+EXPENSE_WORDS = {"expense", "despesa", "saida", "debito", "debit", "d"}
+
+OFX_TRANSACTION = re.compile(r"<STMTTRN>(.*?)</STMTTRN>", re.IGNORECASE | re.DOTALL)
+OFX_FIELD = re.compile(r"<(\w+)>([^<\r\n]*)")
+DOT_THOUSANDS = re.compile(r"[-+]?\d{1,3}(\.\d{3})+")
+COMMA_THOUSANDS = re.compile(r"[-+]?\d{1,3}(,\d{3}){2,}")
+
+class RowError(ValueError):
+	pass
+
+def _plain(text):
+	text = unicodedata.normalize("NFKD", (text or "").strip().lower())
+	return "".join(ch for ch in text if not unicodedata.combining(ch))
+
+def parse_amount(raw):
+	"""
+	Aceita 1.234,56 / 1,234.56 / 1234.56 / 12,34. Só pontos em grupos de três
+	(1.234, 1.234.567) é milhar, como no pt-BR. Mais de duas casas decimais é
+	recusado em vez de arredondado.
+	"""
+	text = re.sub(r"[^\d,.\-+]", "", str(raw or ""))
+	if "," in text and "." in text:
+		# o último separador é o decimal: 1.234,56 ou 1,234.56
+		if text.rfind(",") > text.rfind("."):
+			text = text.replace(".", "").replace(",", ".")
+		else:
+			text = text.replace(",", "")
+	elif DOT_THOUSANDS.fullmatch(text):
+		text = text.replace(".", "")
+	elif COMMA_THOUSANDS.fullmatch(text):
+		text = text.replace(",", "")
+	elif "," in text:
+		text = text.replace(",", ".")
+	try:
+		value = Decimal(text)
+	except InvalidOperation:
+		raise RowError(f"Valor inválido: {raw!r}")
+	if not value.is_finite() or value.as_tuple().exponent < -2:
+		raise RowError(f"Valor inválido: {raw!r}")
+	return value.quantize(Decimal("0.01"))
+
+def parse_date(raw):
+	text = (raw or "").strip()
+	for fmt, size in (("%Y-%m-%d", 10), ("%d/%m/%Y", 10), ("%Y%m%d", 8), ("%d/%m/%y", 8)):
+		try:
+			return datetime.strptime(text[:size], fmt).date()
+		except ValueError:
+			continue
+	raise RowError(f"Data inválida: {raw!r}")
+
+def parse_csv(lines):
+	"""Gera (linha, registro) a partir de um CSV; detecta ';' ou ',' pelo cabeçalho."""
+	lines = iter(lines)
+	header = next(lines, "")
+	delimiter = ";" if header.count(";") > header.count(",") else ","
+	names = [_plain(name) for name in next(csv.reader([header], delimiter=delimiter))]
+	columns = {}
+	for key, aliases in CSV_COLUMNS.items():
+		for index, name in enumerate(names):
+			if name in aliases:
+				columns[key] = index
+				break
+	if "date" not in columns or "amount" not in columns:
+		raise ValueError("Cabeçalho do CSV precisa das colunas de data e valor.")
+
+	for line_no, values in enumerate(csv.reader(lines, delimiter=delimiter), start=2):
+		if not any(v.strip() for v in values):
+			continue
+		yield line_no, {
+			key: values[index].strip() if index < len(values) else ""
+			for key, index in columns.items()
+		}
+
+def parse_ofx(chunks):
+	"""Gera (n, registro) para cada <STMTTRN>, lendo o arquivo aos pedaços."""
+	buffer = ""
+	count = 0
+	for chunk in chunks:
+		buffer += chunk
+		end = 0
+		for match in OFX_TRANSACTION.finditer(buffer):
+			end = match.end()
+			fields = {tag.upper(): value.strip() for tag, value in OFX_FIELD.findall(match.group(1))}
+			count += 1
+			yield count, {
+				"date": fields.get("DTPOSTED", ""),
+				"amount": fields.get("TRNAMT", ""),
+				"description": fields.get("MEMO") or fields.get("NAME", ""),
+				"type": fields.get("TRNTYPE", ""),
+			}
+		if end:
+			buffer = buffer[end:]
+		else:
+			# mantém só o trecho a partir do último bloco aberto
+			start = buffer.upper().rfind("<STMTTRN>")
+			buffer = buffer[start:] if start != -1 else buffer[-len("<STMTTRN>"):]
+
+PARSERS = {
+	ImportJob.Format.CSV: parse_csv,
+	ImportJob.Format.OFX: parse_ofx,
+}
+
+class RowMapper:
+	"""Converte registros brutos em Transaction, resolvendo carteira e categoria pelo nome."""
+
+	def __init__(self, user, wallet):
+		self.user = user
+		self.wallet = wallet
+		self.wallets = {
+			_plain(name): pk
+			for pk, name in Wallet.objects.filter(user=user, is_archived=False).values_list("id", "name")
+		}
+		self.categories = {}
+		categories = (
+			Category.objects.filter(Q(user=user) | Q(user__isnull=True), is_archived=False)
+			.order_by("user_id")
+			.values_list("id", "name")
+		)
+		for pk, name in categories:
+			# categorias do usuário têm prioridade sobre as globais de mesmo nome
+			self.categories.setdefault(_plain(name), pk)
+
+	def to_transaction(self, record):
+		amount = parse_amount(record.get("amount"))
+		kind = _plain(record.get("type"))
+		if kind in INCOME_WORDS:
+			type_ = Transaction.Type.INCOME
+		elif kind in EXPENSE_WORDS:
+			type_ = Transaction.Type.EXPENSE
+		else:
+			type_ = Transaction.Type.EXPENSE if amount < 0 else Transaction.Type.INCOME
+		amount = abs(amount)
+		if amount == 0:
+			return None
+
+		wallet_id = self.wallet.pk
+		wallet_name = _plain(record.get("wallet"))
+		if wallet_name:
+			wallet_id = self.wallets.get(wallet_name)
+			if wallet_id is None:
+				raise RowError(f"Carteira não encontrada: {record.get('wallet')!r}")
+
+		return Transaction(
+			user=self.user,
+			wallet_id=wallet_id,
+			category_id=self.categories.get(_plain(record.get("category"))),
+			type=type_,
+			amount=amount,
+			date=parse_date(record.get("date")),
+			description=(record.get("description") or "")[:140],
+		)
+
+def _batched(iterable, size):
+	iterator = iter(iterable)
+	while batch := list(islice(iterator, size)):
+		yield batch
+
+def _existing_counts(user, objs, before):
+	"""
+	Multiconjunto das transações que coincidem com o lote (reimportação).
+	Só conta o que existia antes da importação começar: linhas iguais gravadas
+	por lotes anteriores desta mesma importação são legítimas.
+	"""
+	dates = [obj.date for obj in objs]
+	rows = (
+		Transaction.objects.filter(
+			user=user,
+			wallet_id__in={obj.wallet_id for obj in objs},
+			date__gte=min(dates),
+			date__lte=max(dates),
+			created_at__lt=before,
+		)
+		.order_by()
+		.values_list("wallet_id", "date", "type", "amount", "description")
+	)
+	return Counter(rows)
+
+def _key(obj):
+	return (obj.wallet_id, obj.date, obj.type, obj.amount, obj.description)
+
+def import_statement(user, wallet, source, fmt, batch_size=IMPORT_BATCH_SIZE, progress=None):
+	"""
+	Pipeline de importação: parse (gerador) -> mapeamento -> lotes -> bulk_create.
+	Cada lote é gravado em um savepoint próprio; um lote que falha não desfaz os
+	anteriores. Linhas já existentes (mesma carteira, data, tipo, valor e
+	descrição) e linhas de valor zero são puladas.
+	Retorna o resumo {processed, imported, skipped, failed, errors}.
+	"""
+	mapper = RowMapper(user, wallet)
+	started = timezone.now()
+	summary = {"processed": 0, "imported": 0, "skipped": 0, "failed": 0, "errors": []}
+
+	def report(line, message):
+		summary["failed"] += 1
+		if len(summary["errors"]) < MAX_REPORTED_ERRORS:
+			summary["errors"].append({"line": line, "error": message})
+
+	def mapped():
+		for line, record in PARSERS[fmt](source):
+			summary["processed"] += 1
+			try:
+				obj = mapper.to_transaction(record)
+			except RowError as exc:
+				report(line, str(exc))
+				continue
+			if obj is None:
+				summary["skipped"] += 1
+				continue
+			yield line, obj
+
+	for batch in _batched(mapped(), batch_size):
+		existing = _existing_counts(user, [obj for _, obj in batch], started)
+		pending = []
+		for line, obj in batch:
+			key = _key(obj)
+			if existing[key]:
+				existing[key] -= 1
+				summary["skipped"] += 1
+			else:
+				pending.append((line, obj))
+		try:
+			with db_transaction.atomic():
+				Transaction.objects.bulk_create([obj for _, obj in pending])
+			summary["imported"] += len(pending)
+		except DatabaseError as exc:
+			for line, _ in pending:
+				report(line, f"Falha ao gravar o lote: {exc}")
+		if progress:
+			progress(summary)
+	return summary
+
+def open_text(fileobj, encoding="utf-8-sig"):
+	return io.TextIOWrapper(fileobj, encoding=encoding, errors="replace", newline="")
+
+def run_import_job(job_id, path=None, fileobj=None, encoding="utf-8-sig", batch_size=IMPORT_BATCH_SIZE, progress=None):
+	"""
+	Processa um ImportJob a partir de um arquivo em disco (path, removido ao final)
+	ou de um arquivo já aberto em modo binário. Atualiza o progresso a cada lote.
+	"""
+	job = ImportJob.objects.select_related("wallet", "user").get(pk=job_id)
+	started = ImportJob.objects.filter(pk=job.pk, status=ImportJob.Status.PENDING).update(
+		status=ImportJob.Status.RUNNING, updated_at=timezone.now(),
+	)
+	if not started:
+		# já dado como perdido por fail_stale_jobs (ou executado por outro worker)
+		if path and os.path.exists(path):
+			os.remove(path)
+		return job
+
+	def save_progress(summary):
+		# cada lote também renova o sinal de vida do job
+		ImportJob.objects.filter(pk=job.pk).update(
+			updated_at=timezone.now(),
+			processed=summary["processed"],
+			imported=summary["imported"],
+			skipped=summary["skipped"],
+			failed=summary["failed"],
+		)
+		if progress:
+			progress(summary)
+
+	fields = {}
+	try:
+		handle = open(path, "rb") if path else fileobj
+		try:
+			text = open_text(handle, encoding)
+			source = iter(lambda: text.read(64 * 1024), "") if job.format == ImportJob.Format.OFX else text
+			summary = import_statement(job.user, job.wallet, source, job.format, batch_size, save_progress)
+		finally:
+			if path:
+				handle.close()
+		fields = {
+			"status": ImportJob.Status.DONE,
+			"processed": summary["processed"],
+			"imported": summary["imported"],
+			"skipped": summary["skipped"],
+			"failed": summary["failed"],
+			"errors": summary["errors"],
+		}
+	except (ValueError, UnicodeError) as exc:
+		fields = {"status": ImportJob.Status.FAILED, "detail": str(exc)[:300]}
+	except Exception:
+		fields = {"status": ImportJob.Status.FAILED, "detail": "Erro inesperado ao importar o arquivo."}
+		raise
+	finally:
+		now = timezone.now()
+		ImportJob.objects.filter(pk=job.pk).update(finished_at=now, updated_at=now, **fields)
+		if path and os.path.exists(path):
+			os.remove(path)
+	job.refresh_from_db()
+	return job
@@ -0,0 +1,72 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.conf import settings
+from django.db import connections, transaction as db_transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+STALE_JOB_DETAIL = "Job interrompido (processo reiniciado ou encerrado); envie de novo."
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def get_executor():
+	global _executor
+	with _executor_lock:
+		if _executor is None:
+			_executor = ThreadPoolExecutor(
+				max_workers=settings.FINANCE_JOB_WORKERS,
+				thread_name_prefix="finance-job",
+			)
+	return _executor
+
+def _run(fn, args, kwargs):
+	try:
+		return fn(*args, **kwargs)
+	except Exception:
+		logger.exception("Falha no job em segundo plano %s", getattr(fn, "__name__", fn))
+		raise
+	finally:
+		# conexões são por thread; sem isso ficariam abertas até o processo morrer
+		connections.close_all()
+
+def run_in_background(fn, *args, **kwargs):
+	"""
+	Executa fn fora da thread da requisição, no pool local do processo.
+	O envio espera o commit da transação atual: o job só roda depois que a
+	linha que ele lê existe para outras conexões (e não roda após um rollback).
+	Com FINANCE_JOBS_EAGER=True (testes) roda na hora, na mesma thread.
+	"""
+	if settings.FINANCE_JOBS_EAGER:
+		fn(*args, **kwargs)
+		return
+	db_transaction.on_commit(lambda: get_executor().submit(_run, fn, args, kwargs))
+
+def fail_stale_jobs(jobs):
+	"""
+	Marca como FAILED os jobs PENDING/RUNNING sem sinal de vida (updated_at) há
+	mais de FINANCE_JOB_STALE_MINUTES: o pool é do processo, então um restart ou
+	crash perde a execução e o cliente ficaria consultando para sempre.
+	Recebe os jobs já carregados; só vai ao banco se algum estiver parado.
+	"""
+	cutoff = timezone.now() - timedelta(minutes=settings.FINANCE_JOB_STALE_MINUTES)
+	stale = [
+		job for job in jobs
+		if job.status in (job.Status.PENDING, job.Status.RUNNING) and job.updated_at < cutoff
+	]
+	if not stale:
+		return
+	model = type(stale[0])
+	now = timezone.now()
+	fields = {"status": model.Status.FAILED, "detail": STALE_JOB_DETAIL, "finished_at": now, "updated_at": now}
+	model.objects.filter(
+		pk__in=[job.pk for job in stale],
+		status__in=[model.Status.PENDING, model.Status.RUNNING],
+		updated_at__lt=cutoff,
+	).update(**fields)
+	for job in stale:
+		for name, value in fields.items():
+			setattr(job, name, value)
@@ -1,25 +1,28 @@
 from datetime import date
 from calendar import monthrange
 from decimal import Decimal
-from django.db.models import Q, Sum, Case, When, F, DecimalField
+from django.db.models import Q, Sum, Case, When, F, DecimalField, Value
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from finance.models import Wallet, Transaction, Category
 
-TRANSFER_Q = Q(category__is_system=True, category__name__iexact="Transferência")
-
 def _exclude_transfers(qs):
-	return qs.exclude(TRANSFER_Q)
+	return qs.filter(is_transfer=False)
 
-def _sum_signed(qs):
-	return qs.aggregate(
-		total=Sum(
-			Case(
-				When(type=Transaction.Type.INCOME, then=F("amount")),
-				When(type=Transaction.Type.EXPENSE, then=-F("amount")),
-				output_field=DecimalField(max_digits=14, decimal_places=2),
-			)
-		)
-	)["total"] or Decimal("0.00")
+# saldo do contexto da IA: inicial + (receitas - despesas) sem transferências e
+# sem inverter o sinal do cartão de crédito
+_SIGNED_NO_TRANSFERS = Coalesce(
+	Sum(
+		Case(
+			When(transactions__type=Transaction.Type.INCOME, then=F("transactions__amount")),
+			When(transactions__type=Transaction.Type.EXPENSE, then=-F("transactions__amount")),
+			output_field=DecimalField(max_digits=14, decimal_places=2),
+		),
+		filter=Q(transactions__is_archived=False, transactions__is_transfer=False),
+	),
+	Value(Decimal("0.00")),
+	output_field=DecimalField(max_digits=14, decimal_places=2),
+)
 
 def _month_bounds(d: date):
 	return date(d.year, d.month, 1), date(d.year, d.month, monthrange(d.year, d.month)[1])
@@ -31,14 +34,12 @@ def build_user_finance_context(user, *, top_categories=8, months_back=0):
 	today = timezone.localdate()
 	start, end = _month_bounds(today)
 
-	wallets_qs = Wallet.objects.filter(user=user, is_archived=False)
+	wallets_qs = Wallet.objects.filter(user=user, is_archived=False).annotate(tx_sum=_SIGNED_NO_TRANSFERS)
 	wallets = []
+	net_worth = Decimal("0.00")
 	for w in wallets_qs:
-		tx_qs = _exclude_transfers(w.transactions.filter(is_archived=False))
-		w_balance = _sum_signed(tx_qs)
-		if w.kind == Wallet.Kind.CREDIT:
-			pass
-		current = (w.initial_balance or Decimal("0.00")) + (w_balance or Decimal("0.00"))
+		current = (w.initial_balance or Decimal("0.00")) + w.tx_sum
+		net_worth += current
 		wallets.append({
 			"id": w.id,
 			"name": w.name,
@@ -53,8 +54,6 @@ def build_user_finance_context(user, *, top_categories=8, months_back=0):
 	income_curr = period_qs.filter(type=Transaction.Type.INCOME).aggregate(s=Sum("amount"))["s"] or Decimal("0.00")
 	expense_curr = period_qs.filter(type=Transaction.Type.EXPENSE).aggregate(s=Sum("amount"))["s"] or Decimal("0.00")
 
-	net_worth = sum(Decimal(w["current_balance"]) for w in wallets) if wallets else Decimal("0.00")
-
 	cat_qs = period_qs.filter(type=Transaction.Type.EXPENSE)
 	cat_agg = (
 		cat_qs.values("category__id", "category__name")
@@ -0,0 +1,144 @@
+import logging
+from django.utils import timezone
+from core.timing import track_external
+from finance.llm.client import get_groq_client, get_groq_model
+from finance.llm.parsing import PlanSectionParser, extract_json
+from finance.llm.prompts import build_messages
+from finance.models import AIPlan, AIPlanJob
+from finance.services.llm_context import build_user_finance_context
+
+logger = logging.getLogger(__name__)
+
+PLAN_MAX_TOKENS = 4096
+
+class PlanGenerationError(Exception):
+	"""Resposta do modelo inutilizável; status e extra vão para a resposta HTTP."""
+
+	def __init__(self, detail, status=500, **extra):
+		super().__init__(detail)
+		self.detail = detail
+		self.status = status
+		self.extra = extra
+
+def validate_plan(content):
+	"""Plano (dict com title e spec) a partir do texto do modelo, ou PlanGenerationError."""
+	if not content:
+		raise PlanGenerationError("Resposta vazia do modelo")
+
+	data = extract_json(content)
+	if not data or not isinstance(data, dict):
+		raise PlanGenerationError("JSON inválido na resposta", status=422, preview=content[:200])
+	if not data.get("title") or not data.get("spec"):
+		raise PlanGenerationError("Resposta incompleta: faltam 'title' ou 'spec'", status=422)
+	return data
+
+def request_plan(messages, temperature):
+	"""Chama o modelo e devolve (modelo, plano, tokens usados)."""
+	client = get_groq_client()
+	model = get_groq_model()
+
+	with track_external("llm"):
+		resp = client.chat.completions.create(
+			model=model,
+			messages=messages,
+			temperature=temperature,
+			max_completion_tokens=PLAN_MAX_TOKENS,
+			stream=False,
+		)
+
+	content = (resp.choices[0].message.content if resp.choices else "") or ""
+	data = validate_plan(content)
+	tokens = getattr(resp.usage, "total_tokens", 0) if hasattr(resp, "usage") else 0
+	return model, data, tokens or 0
+
+def _chunk_usage(chunk):
+	# Groq manda o uso no último pedaço, em x_groq.usage (ou usage, no formato OpenAI)
+	usage = getattr(chunk, "usage", None) or getattr(getattr(chunk, "x_groq", None), "usage", None)
+	return getattr(usage, "total_tokens", 0) if usage else 0
+
+def stream_plan(messages, temperature):
+	"""
+	Gera o plano com stream=True. Produz eventos (nome, dados): "token" a cada trecho
+	do modelo, "title" e "section" quando o título e cada seção de spec ficam completos,
+	e por fim "done" com modelo, plano validado e tokens usados.
+	Erros de validação do plano saem como PlanGenerationError no final.
+	"""
+	client = get_groq_client()
+	model = get_groq_model()
+	parser = PlanSectionParser()
+	parts = []
+	tokens = 0
+
+	with track_external("llm"):
+		stream = iter(client.chat.completions.create(
+			model=model,
+			messages=messages,
+			temperature=temperature,
+			max_completion_tokens=PLAN_MAX_TOKENS,
+			stream=True,
+		))
+	while True:
+		# a espera por cada pedaço também é tempo do modelo (mas não outra chamada)
+		with track_external("llm", calls=0):
+			chunk = next(stream, None)
+		if chunk is None:
+			break
+		tokens = _chunk_usage(chunk) or tokens
+		text = (chunk.choices[0].delta.content if chunk.choices else "") or ""
+		if not text:
+			continue
+		parts.append(text)
+		yield "token", {"text": text}
+		for name, value in parser.feed(text):
+			if name == "title":
+				yield "title", {"title": value}
+			else:
+				yield "section", {"name": name, "data": value}
+
+	data = validate_plan("".join(parts))
+	yield "done", {"model": model, "data": data, "tokens_used": tokens}
+
+def run_plan_job(job_id):
+	"""
+	Gera o plano de um AIPlanJob (contexto financeiro, prompt e chamada ao modelo)
+	e grava o resultado como AIPlan. Falhas do modelo viram status FAILED com detail.
+	"""
+	job = AIPlanJob.objects.select_related("user").get(pk=job_id)
+	started = AIPlanJob.objects.filter(pk=job.pk, status=AIPlanJob.Status.PENDING).update(
+		status=AIPlanJob.Status.RUNNING, updated_at=timezone.now(),
+	)
+	if not started:
+		# já dado como perdido por fail_stale_jobs (ou executado por outro worker)
+		return job
+
+	fields = {}
+	try:
+		context_dict = build_user_finance_context(job.user, top_categories=8)
+		messages = build_messages(
+			{**job.params, "template": job.template, "objective": job.objective},
+			context_dict=context_dict,
+			meta=job.meta,
+		)
+		model, data, tokens = request_plan(messages, job.temperature)
+		plan = AIPlan.objects.create(
+			user=job.user,
+			title=str(data["title"])[:200],
+			template=job.template,
+			objective=job.objective,
+			spec=data["spec"],
+			model=model[:60],
+			temperature=job.temperature,
+			tokens=tokens,
+		)
+		fields = {"status": AIPlanJob.Status.DONE, "plan": plan, "model": plan.model, "tokens": tokens}
+	except (PlanGenerationError, ValueError) as exc:
+		fields = {"status": AIPlanJob.Status.FAILED, "detail": str(exc)[:300]}
+	except Exception as exc:
+		# erros de rede/API do modelo são esperados aqui: registra e marca o job
+		logger.exception("Falha ao gerar plano do job %s", job.pk)
+		fields = {"status": AIPlanJob.Status.FAILED, "detail": f"Erro ao gerar plano: {exc}"[:300]}
+	finally:
+		now = timezone.now()
+		AIPlanJob.objects.filter(pk=job.pk).update(finished_at=now, updated_at=now, **fields)
+	job.refresh_from_db()
+	return job
@@ -0,0 +1,45 @@
+from django.db import transaction as db_transaction
+from finance.models import Wallet, Transaction, MonthlyRollup
+from finance.models.rollup import ROLLUP_KEY
+
+def _stored_rollups(qs):
+	return {
+		tuple(r[f] for f in ROLLUP_KEY): (r["total"], r["count"])
+		for r in qs.exclude(count=0, total=0).values(*ROLLUP_KEY, "total", "count")
+	}
+
+def _scope(user_ids):
+	tx_qs = Transaction.objects.all()
+	rollup_qs = MonthlyRollup.objects.all()
+	wallet_qs = Wallet.objects.all()
+	if user_ids:
+		tx_qs = tx_qs.filter(user_id__in=user_ids)
+		rollup_qs = rollup_qs.filter(user_id__in=user_ids)
+		wallet_qs = wallet_qs.filter(user_id__in=user_ids)
+	return tx_qs, rollup_qs, wallet_qs
+
+def find_rollup_mismatches(user_ids=None):
+	tx_qs, rollup_qs, _ = _scope(user_ids)
+	expected = tx_qs.ledger_rows()
+	stored = _stored_rollups(rollup_qs)
+	keys = set(expected) | set(stored)
+	return [
+		{"key": dict(zip(ROLLUP_KEY, key)), "stored": stored.get(key), "expected": expected.get(key)}
+		for key in keys
+		if stored.get(key) != expected.get(key)
+	]
+
+def rebuild_monthly_rollups(user_ids=None, batch_size=1000):
+	tx_qs, rollup_qs, wallet_qs = _scope(user_ids)
+	with db_transaction.atomic():
+		# escritas concorrentes atualizam o saldo da carteira antes do rollup e esperam este lock
+		list(wallet_qs.select_for_update().order_by("id").values_list("id", flat=True))
+		rollup_qs.delete()
+		created = MonthlyRollup.objects.bulk_create(
+			[
+				MonthlyRollup(**dict(zip(ROLLUP_KEY, key)), total=total, count=count)
+				for key, (total, count) in tx_qs.ledger_rows().items()
+			],
+			batch_size=batch_size,
+		)
+	return len(created)
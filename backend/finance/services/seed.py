@@ -0,0 +1,165 @@
+import csv
+import io
+import uuid
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from itertools import islice
+from django.db import connection, transaction as db_transaction
+from django.utils import timezone
+from finance.models import Category, DataVersion, Transaction, Wallet
+from finance.services.balances import rebuild_wallet_balances
+from finance.services.rollups import rebuild_monthly_rollups
+
+SEED_BATCH_SIZE = 5000
+# último dia do histórico gerado: fixo, para que o mesmo rng gere os mesmos dados em qualquer dia
+SEED_END_DATE = date(2025, 12, 31)
+
+SEED_WALLETS = (
+	("Conta corrente", Wallet.Kind.CHECKING),
+	("Cartão de crédito", Wallet.Kind.CREDIT),
+	("Poupança", Wallet.Kind.SAVINGS),
+	("Carteira", Wallet.Kind.CASH),
+	("Investimentos", Wallet.Kind.INVESTMENT),
+)
+SEED_EXPENSE_CATEGORIES = (
+	"Mercado", "Moradia", "Transporte", "Restaurantes", "Saúde", "Lazer",
+	"Educação", "Assinaturas", "Vestuário", "Viagens", "Pets", "Presentes",
+)
+SEED_INCOME_CATEGORIES = ("Salário", "Freelance", "Rendimentos", "Reembolsos")
+SEED_DESCRIPTIONS = (
+	"Compra", "Pagamento", "Pix", "Boleto", "Débito automático", "Assinatura",
+	"Mensalidade", "Parcela", "Cashback", "Depósito",
+)
+
+COPY_COLUMNS = (
+	"user_id", "wallet_id", "category_id", "type", "amount", "date", "description",
+	"is_archived", "is_transfer", "transfer_group", "created_at", "updated_at",
+)
+
+def _amount(rng, mu, sigma):
+	value = min(max(rng.lognormvariate(mu, sigma), 1), 50000)
+	return Decimal(value).quantize(Decimal("0.01"))
+
+def generate_rows(rng, *, user_id, wallet_ids, expense_ids, income_ids, transfer_category_id,
+		count, start, end, transfer_ratio=0.05, archived_ratio=0.02):
+	"""
+	Gera count linhas (dicts com as colunas de COPY_COLUMNS) de forma determinística
+	para um mesmo rng. Transferências contam como duas linhas (uma por carteira).
+	"""
+	days = (end - start).days + 1
+	produced = 0
+	while produced < count:
+		day = start + timedelta(days=rng.randrange(days))
+		stamp = timezone.make_aware(datetime.combine(day, time(12)))
+		common = {
+			"user_id": user_id,
+			"date": day,
+			"is_archived": rng.random() < archived_ratio,
+			"created_at": stamp,
+			"updated_at": stamp,
+		}
+		if len(wallet_ids) > 1 and count - produced >= 2 and rng.random() < transfer_ratio:
+			source, target = rng.sample(wallet_ids, 2)
+			leg = {
+				**common,
+				"category_id": transfer_category_id,
+				"amount": _amount(rng, 5.5, 1.0),
+				"description": "Transferência entre contas",
+				"is_transfer": True,
+				"transfer_group": uuid.UUID(int=rng.getrandbits(128), version=4),
+			}
+			yield {**leg, "wallet_id": source, "type": Transaction.Type.EXPENSE}
+			yield {**leg, "wallet_id": target, "type": Transaction.Type.INCOME}
+			produced += 2
+			continue
+
+		income = rng.random() < 0.12
+		yield {
+			**common,
+			"wallet_id": rng.choice(wallet_ids),
+			"category_id": rng.choice(income_ids if income else expense_ids),
+			"type": Transaction.Type.INCOME if income else Transaction.Type.EXPENSE,
+			"amount": _amount(rng, 7.5, 0.6) if income else _amount(rng, 4.0, 1.1),
+			"description": f"{rng.choice(SEED_DESCRIPTIONS)} {rng.randrange(1, 10000)}",
+			"is_transfer": False,
+			"transfer_group": None,
+		}
+		produced += 1
+
+def _batched(iterable, size):
+	iterator = iter(iterable)
+	while batch := list(islice(iterator, size)):
+		yield batch
+
+def _copy_batch(rows):
+	buffer = io.StringIO()
+	writer = csv.writer(buffer)
+	for row in rows:
+		writer.writerow(["" if row[c] is None else row[c] for c in COPY_COLUMNS])
+	buffer.seek(0)
+	columns = ", ".join(COPY_COLUMNS)
+	with connection.cursor() as cursor:
+		# psycopg2: COPY ... FROM STDIN pelo cursor nativo
+		cursor.cursor.copy_expert(
+			f"COPY {Transaction._meta.db_table} ({columns}) FROM STDIN WITH (FORMAT csv, NULL '')",
+			buffer,
+		)
+
+def seed_user(user, rng, *, wallets=4, categories=12, transactions=10000, years=3, end_date=SEED_END_DATE,
+		transfer_ratio=0.05, archived_ratio=0.02, batch_size=SEED_BATCH_SIZE, use_copy=False, progress=None):
+	"""
+	Cria carteiras, categorias e transactions lançamentos para o usuário, com
+	datas nos years anos que terminam em end_date.
+	Com use_copy=True as linhas vão por COPY (sem passar pelo ledger) e saldos,
+	rollups e DataVersion são reconstruídos no final; senão bulk_create em lotes,
+	que mantém o ledger a cada lote. Retorna o número de transações criadas.
+	"""
+	wallet_objs = Wallet.objects.bulk_create([
+		Wallet(
+			user=user,
+			name=SEED_WALLETS[i % len(SEED_WALLETS)][0] + (f" {i // len(SEED_WALLETS) + 1}" if i >= len(SEED_WALLETS) else ""),
+			kind=SEED_WALLETS[i % len(SEED_WALLETS)][1],
+			initial_balance=_amount(rng, 7.0, 1.0),
+		)
+		for i in range(max(1, wallets))
+	])
+	names = [(name, False) for name in SEED_EXPENSE_CATEGORIES] + [(name, True) for name in SEED_INCOME_CATEGORIES]
+	names += [(f"Categoria {i}", False) for i in range(max(0, categories - len(names)))]
+	category_objs = Category.objects.bulk_create([
+		Category(user=user, name=name) for name, _ in names[:max(2, categories)]
+	])
+	income_names = {name for name, income in names if income}
+	income_ids = [c.pk for c in category_objs if c.name in income_names] or [category_objs[-1].pk]
+	expense_ids = [c.pk for c in category_objs if c.name not in income_names] or [category_objs[0].pk]
+
+	end = end_date
+	rows = generate_rows(
+		rng,
+		user_id=user.pk,
+		wallet_ids=[w.pk for w in wallet_objs],
+		expense_ids=expense_ids,
+		income_ids=income_ids,
+		transfer_category_id=Category.get_transfer_category().pk,
+		count=transactions,
+		start=end - timedelta(days=365 * max(1, years)),
+		end=end,
+		transfer_ratio=transfer_ratio,
+		archived_ratio=archived_ratio,
+	)
+
+	created = 0
+	for batch in _batched(rows, batch_size):
+		with db_transaction.atomic():
+			if use_copy:
+				_copy_batch(batch)
+			else:
+				Transaction.objects.bulk_create([Transaction(**row) for row in batch], batch_size=batch_size)
+		created += len(batch)
+		if progress:
+			progress(created)
+
+	if use_copy:
+		rebuild_wallet_balances(Wallet.objects.filter(user=user))
+		rebuild_monthly_rollups([user.pk])
+		DataVersion.bump({user.pk})
+	return created
@@ -0,0 +1,97 @@
+import uuid
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from django.utils import timezone
+from finance.models import Category, Wallet, Transaction
+
+TRANSFER_BATCH_MAX = 500
+
+class TransferError(ValueError):
+	pass
+
+def parse_transfer(data):
+	"""Valida o payload de uma transferência; levanta TransferError com a mensagem para o usuário."""
+	if not isinstance(data, dict):
+		raise TransferError("Transferência inválida.")
+	from_wallet_id = data.get("from_wallet_id")
+	to_wallet_id = data.get("to_wallet_id")
+	date_str = data.get("date")
+
+	try:
+		amount = Decimal(str(data.get("amount")))
+	except InvalidOperation:
+		raise TransferError("Valor inválido.")
+	if not amount.is_finite():
+		raise TransferError("Valor inválido.")
+	if amount <= Decimal("0"):
+		raise TransferError("Valor deve ser maior que zero.")
+
+	if not (from_wallet_id and to_wallet_id):
+		raise TransferError("Informe carteiras de origem e destino.")
+	if str(from_wallet_id) == str(to_wallet_id):
+		raise TransferError("Carteiras de origem e destino devem ser diferentes.")
+	try:
+		from_wallet_id, to_wallet_id = int(from_wallet_id), int(to_wallet_id)
+	except (TypeError, ValueError):
+		raise TransferError("Carteira não encontrada ou arquivada.")
+
+	try:
+		tx_date = date.fromisoformat(date_str) if date_str else timezone.localdate()
+	except (TypeError, ValueError):
+		raise TransferError("Data inválida.")
+
+	return {
+		"from_wallet_id": from_wallet_id,
+		"to_wallet_id": to_wallet_id,
+		"amount": amount,
+		"date": tx_date,
+		"description": (data.get("description") or "Transferência").strip()[:140],
+	}
+
+def active_wallets(user, transfers):
+	"""Carteiras ativas do usuário envolvidas nas transferências, em uma consulta."""
+	ids = {t["from_wallet_id"] for t in transfers} | {t["to_wallet_id"] for t in transfers}
+	return Wallet.objects.filter(user=user, is_archived=False).in_bulk(ids)
+
+def transfer_legs(user, transfer, wallets, category):
+	"""Despesa na origem + receita no destino, ligadas pelo mesmo transfer_group."""
+	group = uuid.uuid4()
+	common = {
+		"user": user,
+		"category": category,
+		"amount": transfer["amount"],
+		"date": transfer["date"],
+		"description": transfer["description"],
+		"is_transfer": True,
+		"transfer_group": group,
+	}
+	return [
+		Transaction(wallet=wallets[transfer["from_wallet_id"]], type=Transaction.Type.EXPENSE, **common),
+		Transaction(wallet=wallets[transfer["to_wallet_id"]], type=Transaction.Type.INCOME, **common),
+	]
+
+def missing_wallets(transfer, wallets):
+	return transfer["from_wallet_id"] not in wallets or transfer["to_wallet_id"] not in wallets
+
+def build_transfers(user, rows):
+	"""
+	Valida um lote de transferências e monta todas as pernas (sem salvar).
+	Retorna (pernas, {índice: mensagem}).
+	"""
+	parsed = []
+	errors = {}
+	for index, row in enumerate(rows):
+		try:
+			parsed.append((index, parse_transfer(row)))
+		except TransferError as exc:
+			errors[index] = str(exc)
+
+	wallets = active_wallets(user, [t for _, t in parsed])
+	category = Category.get_transfer_category()
+	legs = []
+	for index, transfer in parsed:
+		if missing_wallets(transfer, wallets):
+			errors[index] = "Carteira não encontrada ou arquivada."
+			continue
+		legs.extend(transfer_legs(user, transfer, wallets, category))
+	return legs, errors
@@ -5,7 +5,10 @@ from .views import (
     WalletViewSet,
     TransactionViewSet,
     AIPlanViewSet,
-    AIPlanGenerateView
+    AIPlanGenerateView,
+    AIPlanGenerateStreamView,
+    ImportJobViewSet,
+    AIPlanJobViewSet,
 )
 
 router = DefaultRouter()
@@ -13,10 +16,13 @@ router.register(r"categories", CategoryViewSet, basename="category")
 router.register(r"wallets", WalletViewSet, basename="wallet")
 router.register(r"transactions", TransactionViewSet, basename="transaction")
 router.register(r"ai/plans", AIPlanViewSet, basename="ai-plan")
+router.register(r"imports", ImportJobViewSet, basename="import-job")
+router.register(r"ai/plan/jobs", AIPlanJobViewSet, basename="ai-plan-job")
 
 urlpatterns = [
     path("", include(router.urls)),
     path("ai/plan/generate/", AIPlanGenerateView.as_view(), name="ai-plan-generate"),
+    path("ai/plan/generate/stream/", AIPlanGenerateStreamView.as_view(), name="ai-plan-generate-stream"),
 ]
 
 app_name = "finance"
\ No newline at end of file
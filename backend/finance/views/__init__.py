@@ -2,12 +2,17 @@ from .category import CategoryViewSet
 from .wallet import WalletViewSet
 from .transaction import TransactionViewSet
 from .aiplan import AIPlanViewSet
-from .llm import AIPlanGenerateView
+from .llm import AIPlanGenerateView, AIPlanGenerateStreamView
+from .importjob import ImportJobViewSet
+from .aiplanjob import AIPlanJobViewSet
 
 __all__ = [
     "CategoryViewSet",
     "WalletViewSet",
     "TransactionViewSet",
     "AIPlanViewSet",
-    "AIPlanGenerateView"
+    "AIPlanGenerateView",
+    "AIPlanGenerateStreamView",
+    "ImportJobViewSet",
+    "AIPlanJobViewSet",
 ]
\ No newline at end of file
@@ -1,7 +1,9 @@
+from django.db.models import Count, Max
 from rest_framework import viewsets, permissions, filters
 from rest_framework.pagination import PageNumberPagination
 from finance.models import AIPlan
 from finance.serializers import AIPlanSerializer
+from .cache import ConditionalGetMixin
 
 class IsOwner(permissions.BasePermission):
 	def has_object_permission(self, request, view, obj):
@@ -12,7 +14,7 @@ class DefaultPagination(PageNumberPagination):
 	page_size_query_param = "page_size"
 	max_page_size = 200
 
-class AIPlanViewSet(viewsets.ModelViewSet):
+class AIPlanViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
 	serializer_class = AIPlanSerializer
 	permission_classes = [permissions.IsAuthenticated, IsOwner]
 	pagination_class = DefaultPagination
@@ -24,5 +26,11 @@ class AIPlanViewSet(viewsets.ModelViewSet):
 	def get_queryset(self):
 		return AIPlan.objects.filter(user=self.request.user)
 
+	def get_etag_version(self, request):
+		# planos não passam por DataVersion: max(updated_at) + quantidade
+		agg = AIPlan.objects.filter(user=request.user).aggregate(last=Max("updated_at"), total=Count("id"))
+		last = agg["last"].isoformat() if agg["last"] else ""
+		return f"{last}.{agg['total']}"
+
 	def perform_create(self, serializer):
 		serializer.save(user=self.request.user)
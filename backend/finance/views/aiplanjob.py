@@ -0,0 +1,63 @@
+from rest_framework import mixins, viewsets, permissions, status
+from rest_framework.response import Response
+from finance.models import AIPlanJob
+from finance.serializers import AIPlanJobSerializer
+from finance.services.jobs import fail_stale_jobs, run_in_background
+from finance.services.plans import run_plan_job
+from .category import IsOwner, DefaultPagination
+from .llm import count_plan_generation, parse_plan_request, plan_rate_limited, rate_limit_response
+
+class AIPlanJobViewSet(
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    Geração de planos pela IA em segundo plano.
+    POST (mesmo corpo de /ai/plan/generate/) valida o pedido, enfileira e responde 202
+    com o id do job; acompanhe em GET /ai/plan/jobs/<id>/ até status done (o plano
+    salvo vem em "plan") ou failed (motivo em "detail").
+    """
+    serializer_class = AIPlanJobSerializer
+    permission_classes = [permissions.IsAuthenticated, IsOwner]
+    pagination_class = DefaultPagination
+
+    def get_queryset(self):
+        return AIPlanJob.objects.filter(user=self.request.user).select_related("plan")
+
+    # jobs perdidos num restart viram FAILED quando o cliente consulta
+    def get_object(self):
+        job = super().get_object()
+        fail_stale_jobs([job])
+        return job
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if page is not None:
+            fail_stale_jobs(page)
+        return page
+
+    def create(self, request, *args, **kwargs):
+        body = request.data or {}
+        if plan_rate_limited(request.user):
+            return rate_limit_response()
+
+        plan_request, error = parse_plan_request(body)
+        if error:
+            return error
+
+        params = {key: body[key] for key in ("prompt", "persona") if body.get(key)}
+        job = AIPlanJob.objects.create(
+            user=request.user,
+            template=plan_request["template"][:60],
+            objective=plan_request["objective"][:300],
+            params=params,
+            meta=plan_request["meta"],
+            temperature=plan_request["temperature"],
+        )
+        count_plan_generation(request.user)
+        run_in_background(run_plan_job, job.pk)
+
+        job.refresh_from_db()
+        return Response(self.get_serializer(job).data, status=status.HTTP_202_ACCEPTED)
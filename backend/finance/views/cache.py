@@ -0,0 +1,114 @@
+import hashlib
+from functools import wraps
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from prometheus_client import Counter
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+from finance.models import DataVersion
+
+ANALYTICS_CACHE_HITS = Counter(
+    "finance_analytics_cache_hits_total",
+    "Respostas analíticas servidas do cache.",
+    ["endpoint"],
+)
+ANALYTICS_CACHE_MISSES = Counter(
+    "finance_analytics_cache_misses_total",
+    "Respostas analíticas recalculadas (cache vazio ou versão nova).",
+    ["endpoint"],
+)
+
+def request_data_version(request):
+    """Versão dos dados do usuário, consultada uma vez por requisição."""
+    version = getattr(request, "_finance_data_version", None)
+    if version is None:
+        version = DataVersion.current(request.user.pk)
+        request._finance_data_version = version
+    return version
+
+def analytics_cache_key(request, endpoint):
+    """
+    (usuário, endpoint, parâmetros normalizados, versão dos dados, dia atual).
+    Qualquer escrita do usuário muda a versão, então entradas antigas nunca
+    são lidas de novo; o dia entra porque os builders dependem de "hoje".
+    """
+    params = sorted(
+        (name, sorted(values)) for name, values in request.query_params.lists()
+    )
+    digest = hashlib.sha1(repr(params).encode("utf-8")).hexdigest()
+    version = request_data_version(request)
+    today = timezone.localdate().isoformat()
+    return f"finance:analytics:{request.user.pk}:{endpoint}:{version}:{today}:{digest}"
+
+def cached_analytics(endpoint):
+    """Cacheia o response.data (status 200) de uma ação analítica por usuário."""
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            key = analytics_cache_key(request, endpoint)
+            data = cache.get(key)
+            if data is not None:
+                ANALYTICS_CACHE_HITS.labels(endpoint=endpoint).inc()
+                return Response(data, status=status.HTTP_200_OK)
+
+            ANALYTICS_CACHE_MISSES.labels(endpoint=endpoint).inc()
+            response = view_method(self, request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                cache.set(key, response.data, timeout=settings.FINANCE_ANALYTICS_CACHE_TIMEOUT)
+            return response
+        return wrapper
+    return decorator
+
+class NotModified(APIException):
+    status_code = status.HTTP_304_NOT_MODIFIED
+
+class ConditionalGetMixin:
+    """
+    ETag forte nas leituras (list, retrieve e ações analíticas): derivado da
+    versão dos dados do usuário + URL completa. If-None-Match igual responde 304
+    em initial(), antes de qualquer agregação ou serialização.
+    """
+    etag_actions = ("list", "retrieve")
+
+    def get_etag_version(self, request):
+        return request_data_version(request)
+
+    def get_etag(self, request):
+        raw = "|".join((
+            str(request.user.pk),
+            self.get_etag_version(request),
+            timezone.localdate().isoformat(),
+            request.get_full_path(),
+        ))
+        return f'"{hashlib.sha1(raw.encode("utf-8")).hexdigest()}"'
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.etag = None
+        if request.method not in ("GET", "HEAD") or self.action not in self.etag_actions:
+            return
+        self.etag = self.get_etag(request)
+        if_none_match = request.headers.get("If-None-Match")
+        if if_none_match:
+            candidates = [tag.removeprefix("W/") for tag in parse_etags(if_none_match)]
+            if "*" in candidates or self.etag in candidates:
+                raise NotModified()
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            response["ETag"] = self.etag
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if getattr(self, "etag", None) and response.status_code == status.HTTP_200_OK:
+            response["ETag"] = self.etag
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
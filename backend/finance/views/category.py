@@ -5,6 +5,7 @@ from finance.models import Category
 from finance.serializers import CategorySerializer
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from .cache import ConditionalGetMixin
 
 class IsOwner(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
@@ -15,7 +16,7 @@ class DefaultPagination(PageNumberPagination):
     page_size_query_param = "page_size"
     max_page_size = 200
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = CategorySerializer
     permission_classes = [permissions.IsAuthenticated, IsOwner]
     pagination_class = DefaultPagination
@@ -0,0 +1,85 @@
+import codecs
+import os
+import tempfile
+from django.conf import settings
+from rest_framework import mixins, viewsets, permissions, status
+from rest_framework.parsers import FormParser, MultiPartParser
+from rest_framework.response import Response
+from finance.models import ImportJob, Wallet
+from finance.serializers import ImportJobSerializer
+from finance.services.importer import run_import_job
+from finance.services.jobs import fail_stale_jobs, run_in_background
+from .category import IsOwner, DefaultPagination
+
+class ImportJobViewSet(
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    Importação de extratos CSV/OFX.
+    POST (multipart: file, wallet_id, format opcional, encoding opcional):
+    - arquivos pequenos são importados na hora (201 com o resumo)
+    - arquivos grandes vão para o pool de jobs (202); acompanhe em GET /imports/<id>/
+    """
+    serializer_class = ImportJobSerializer
+    permission_classes = [permissions.IsAuthenticated, IsOwner]
+    pagination_class = DefaultPagination
+    parser_classes = [MultiPartParser, FormParser]
+
+    def get_queryset(self):
+        return ImportJob.objects.filter(user=self.request.user)
+
+    # jobs perdidos num restart viram FAILED quando o cliente consulta
+    def get_object(self):
+        job = super().get_object()
+        fail_stale_jobs([job])
+        return job
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if page is not None:
+            fail_stale_jobs(page)
+        return page
+
+    def create(self, request, *args, **kwargs):
+        upload = request.FILES.get("file")
+        if not upload:
+            return Response({"detail": "Envie o arquivo no campo 'file'."}, status=status.HTTP_400_BAD_REQUEST)
+
+        wallet_id = request.data.get("wallet_id") or request.data.get("wallet")
+        wallet = Wallet.objects.filter(id=wallet_id, user=request.user, is_archived=False).first() if str(wallet_id or "").isdigit() else None
+        if wallet is None:
+            return Response({"detail": "Carteira não encontrada ou arquivada."}, status=status.HTTP_400_BAD_REQUEST)
+
+        fmt = (request.data.get("format") or os.path.splitext(upload.name)[1].lstrip(".")).lower()
+        if fmt not in ImportJob.Format.values:
+            return Response(
+                {"detail": "Formato inválido.", "allowed": list(ImportJob.Format.values)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        encoding = request.data.get("encoding") or "utf-8-sig"
+        try:
+            codecs.lookup(encoding)
+        except LookupError:
+            return Response({"detail": "Encoding inválido."}, status=status.HTTP_400_BAD_REQUEST)
+
+        job = ImportJob.objects.create(
+            user=request.user, wallet=wallet, filename=upload.name[:255], format=fmt,
+        )
+
+        if upload.size <= settings.FINANCE_IMPORT_SYNC_MAX_BYTES:
+            job = run_import_job(job.pk, fileobj=upload.file, encoding=encoding)
+            return Response(self.get_serializer(job).data, status=status.HTTP_201_CREATED)
+
+        # o upload só vive durante a requisição: copia em blocos para um arquivo próprio
+        fd, path = tempfile.mkstemp(prefix="finance-import-", suffix=f".{fmt}")
+        with os.fdopen(fd, "wb") as out:
+            for chunk in upload.chunks():
+                out.write(chunk)
+        run_in_background(run_import_job, job.pk, path=path, encoding=encoding)
+
+        job.refresh_from_db()
+        return Response(self.get_serializer(job).data, status=status.HTTP_202_ACCEPTED)
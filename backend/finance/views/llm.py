@@ -1,113 +1,89 @@
 import json
-import re
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import BaseRenderer, JSONRenderer
 from rest_framework.response import Response
 from django.core.cache import cache
-from finance.llm.client import get_groq_client, get_groq_model
+from django.http import StreamingHttpResponse
 from finance.llm.prompts import build_messages
 from finance.services.llm_context import build_user_finance_context
+from finance.services.plans import PlanGenerationError, request_plan, stream_plan
 from finance.utils.prompt_validator import validate_and_classify_prompt
 
-def _extract_json(content: str):
-    if not content:
-        return None
+PLAN_RATE_LIMIT = 5
 
-    s = content.strip()
-    if s.startswith("```"):
-        s = re.sub(r"^```[a-zA-Z0-9_-]*\s*", "", s)
-        s = s.replace("```", "").strip()
+def _rate_key(user):
+    return f"ai_plan_rate:{user.id}"
 
-    start = s.find("{")
-    end = s.rfind("}")
-    if start == -1 or end == -1:
-        return None
+def plan_rate_limited(user):
+    return cache.get(_rate_key(user), 0) >= PLAN_RATE_LIMIT
 
-    candidate = s[start:end + 1]
+def count_plan_generation(user):
+    key = _rate_key(user)
+    cache.set(key, cache.get(key, 0) + 1, timeout=3600)
 
-    try:
-        return json.loads(candidate)
-    except json.JSONDecodeError:
-        pass
-
-    candidate = re.sub(r",(\s*[}\]])", r"\1", candidate)
+def rate_limit_response():
+    return Response({
+        "detail": f"Limite de {PLAN_RATE_LIMIT} gerações por hora excedido."
+    }, status=429)
 
-    try:
-        return json.loads(candidate)
-    except json.JSONDecodeError:
-        pass
+def parse_plan_request(body):
+    """
+    Valida o pedido de geração (template, objective, prompt, temperature).
+    Retorna (pedido, None) ou (None, Response 400); o pedido traz template,
+    objective (o que vai para o modelo), meta do validador e temperature.
+    """
+    template = (body.get("template") or "generico").strip().lower()
+    objective = (body.get("objective") or "").strip()
+    custom_prompt = (body.get("prompt") or "").strip()
 
-    try:
-        in_string = False
-        escape = False
+    if template == "custom":
+        if not custom_prompt:
+            return None, Response({"detail": "Prompt obrigatório para template custom."}, status=400)
 
-        for char in candidate:
-            if escape:
-                escape = False
-                continue
-            if char == '\\':
-                escape = True
-                continue
-            if char == '"':
-                in_string = not in_string
+        result = validate_and_classify_prompt(custom_prompt)
+        if not result["is_valid"]:
+            return None, Response({"detail": "Prompt inválido", "errors": result["errors"]}, status=400)
 
-        if in_string:
-            candidate += '"'
+        objective_for_llm = objective or "Plano Personalizado"
+    else:
+        if not objective:
+            return None, Response({"detail": "Campo 'objective' obrigatório."}, status=400)
 
-        candidate = re.sub(r'[,:](\s*)$', r'\1', candidate)
+        result = validate_and_classify_prompt(objective)
+        if not result["is_valid"]:
+            return None, Response({"detail": "Objetivo inválido", "errors": result["errors"]}, status=400)
 
-        open_brackets = candidate.count("[") - candidate.count("]")
-        open_braces = candidate.count("{") - candidate.count("}")
+        objective_for_llm = objective
 
-        if open_brackets > 0:
-            candidate += "]" * open_brackets
-        if open_braces > 0:
-            candidate += "}" * open_braces
+    try:
+        temperature = float(body.get("temperature", 0.5))
+    except (TypeError, ValueError):
+        return None, Response({"detail": "Campo 'temperature' inválido."}, status=400)
 
-        return json.loads(candidate)
-    except Exception:
-        return None
+    return {
+        "template": template,
+        "objective": objective_for_llm,
+        "meta": {"intent": result["intent"], "lang": result["lang"], "warnings": result["warnings"]},
+        "temperature": temperature,
+    }, None
 
 
 class AIPlanGenerateView(APIView):
+    """Geração síncrona: segura a requisição até o modelo responder. Prefira POST /ai/plan/jobs/."""
     permission_classes = [IsAuthenticated]
 
-    def post(self, request):
+    def prepare(self, request):
+        """Limite, validação, contexto e prompt; retorna (messages, pedido) ou a Response de erro."""
         user = request.user
         body = request.data or {}
 
-        cache_key = f"ai_plan_rate:{user.id}"
-        attempts = cache.get(cache_key, 0)
-
-        if attempts >= 5:
-            return Response({
-                "detail": "Limite de 5 gerações por hora excedido."
-            }, status=429)
-
-        template = (body.get("template") or "generico").strip().lower()
-        objective = (body.get("objective") or "").strip()
-        custom_prompt = (body.get("prompt") or "").strip()
-
-        if template == "custom":
-            if not custom_prompt:
-                return Response({"detail": "Prompt obrigatório para template custom."}, status=400)
-
-            result = validate_and_classify_prompt(custom_prompt)
-            if not result["is_valid"]:
-                return Response({"detail": "Prompt inválido", "errors": result["errors"]}, status=400)
+        if plan_rate_limited(user):
+            return rate_limit_response()
 
-            meta = {"intent": result["intent"], "lang": result["lang"], "warnings": result["warnings"]}
-            objective_for_llm = objective or "Plano Personalizado"
-        else:
-            if not objective:
-                return Response({"detail": "Campo 'objective' obrigatório."}, status=400)
-
-            result = validate_and_classify_prompt(objective)
-            if not result["is_valid"]:
-                return Response({"detail": "Objetivo inválido", "errors": result["errors"]}, status=400)
-
-            meta = {"intent": result["intent"], "lang": result["lang"], "warnings": result["warnings"]}
-            objective_for_llm = objective
+        plan_request, error = parse_plan_request(body)
+        if error:
+            return error
 
         try:
             context_dict = build_user_finance_context(user, top_categories=8)
@@ -116,54 +92,86 @@ class AIPlanGenerateView(APIView):
 
         try:
             messages = build_messages(
-                {**body, "objective": objective_for_llm},
+                {**body, "objective": plan_request["objective"]},
                 context_dict=context_dict,
-                meta=meta
+                meta=plan_request["meta"]
             )
         except ValueError as e:
             return Response({"detail": str(e)}, status=400)
 
-        try:
-            cache.set(cache_key, attempts + 1, timeout=3600)
-
-            client = get_groq_client()
-            model = get_groq_model()
-
-            resp = client.chat.completions.create(
-                model=model,
-                messages=messages,
-                temperature=body.get("temperature", 0.5),
-                max_completion_tokens=4096,
-                stream=False,
-            )
-
-            content = (resp.choices[0].message.content if resp.choices else "") or ""
-            if not content:
-                return Response({"detail": "Resposta vazia do modelo"}, status=500)
+        count_plan_generation(user)
+        return messages, plan_request
 
-            data = _extract_json(content)
-
-            if not data or not isinstance(data, dict):
-                return Response({
-                    "detail": "JSON inválido na resposta",
-                    "preview": content[:200]
-                }, status=422)
+    def post(self, request):
+        prepared = self.prepare(request)
+        if isinstance(prepared, Response):
+            return prepared
+        messages, plan_request = prepared
 
-            if not data.get("title") or not data.get("spec"):
-                return Response({
-                    "detail": "Resposta incompleta: faltam 'title' ou 'spec'"
-                }, status=422)
+        try:
+            model, data, tokens = request_plan(messages, plan_request["temperature"])
 
             return Response({
                 "model": model,
                 "data": data,
-                "tokens_used": getattr(resp.usage, 'total_tokens', 0) if hasattr(resp, 'usage') else 0,
-                "template": template,
-                "objective": objective_for_llm
+                "tokens_used": tokens,
+                "template": plan_request["template"],
+                "objective": plan_request["objective"]
             }, status=200)
 
+        except PlanGenerationError as e:
+            return Response({"detail": e.detail, **e.extra}, status=e.status)
         except Exception as e:
             return Response({
                 "detail": f"Erro ao gerar plano: {str(e)}",
                 "error_type": type(e).__name__
-            }, status=500)
\ No newline at end of file
+            }, status=500)
+
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+class EventStreamRenderer(BaseRenderer):
+    """Para clientes que pedem text/event-stream, erros de validação (400, 429) saem como evento "error"."""
+    media_type = "text/event-stream"
+    format = "sse"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return sse_event("error", data).encode(self.charset)
+
+class AIPlanGenerateStreamView(AIPlanGenerateView):
+    """
+    Mesma geração de /ai/plan/generate/, em Server-Sent Events:
+    - token: cada trecho de texto do modelo
+    - title / section: título e seções de spec (overview, strategy, goals, risks) assim que fecham
+    - done: plano validado, modelo e tokens usados (mesmo formato da resposta síncrona)
+    - error: falha do modelo ou plano inválido
+    """
+    renderer_classes = [JSONRenderer, EventStreamRenderer]
+
+    def post(self, request):
+        prepared = self.prepare(request)
+        if isinstance(prepared, Response):
+            return prepared
+        messages, plan_request = prepared
+
+        def events():
+            try:
+                for event, data in stream_plan(messages, plan_request["temperature"]):
+                    if event == "done":
+                        data = {**data, "template": plan_request["template"], "objective": plan_request["objective"]}
+                    yield sse_event(event, data)
+            except PlanGenerationError as e:
+                yield sse_event("error", {"detail": e.detail, "status": e.status, **e.extra})
+            except Exception as e:
+                yield sse_event("error", {
+                    "detail": f"Erro ao gerar plano: {str(e)}",
+                    "error_type": type(e).__name__
+                })
+
+        response = StreamingHttpResponse(events(), content_type="text/event-stream; charset=utf-8")
+        response["Cache-Control"] = "no-cache"
+        # sem buffer em proxies (nginx), senão os eventos chegam todos no final
+        response["X-Accel-Buffering"] = "no"
+        return response
@@ -0,0 +1,159 @@
+import base64
+import json
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+class KeysetCursorPagination(BasePagination):
+    """
+    Paginação por keyset sobre a ordenação já aplicada ao queryset
+    (ex.: ["-date", "-id"]): cada página filtra a partir da última linha vista,
+    então páginas profundas custam o mesmo que a primeira.
+    - ?cursor=... vem dos links next/previous
+    - ?count=exact|estimate inclui o total (estimate usa o planner do Postgres)
+    """
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 200
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+    invalid_cursor_message = "Cursor inválido."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = [str(o) for o in queryset.query.order_by]
+        self.fields = [self._ordering_field(queryset, o) for o in self.ordering]
+        self.count = self.get_count(queryset, request)
+
+        cursor = self.decode_cursor(request)
+        reverse = bool(cursor and cursor["r"])
+        ordering = [self._flip(o) for o in self.ordering] if reverse else self.ordering
+
+        qs = queryset.order_by(*ordering)
+        if cursor:
+            qs = qs.filter(self._after(ordering, cursor["p"]))
+
+        rows = list(qs[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        self.page = rows
+        if reverse:
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = cursor is not None
+        return rows
+
+    def get_paginated_response(self, data):
+        payload = {"next": self.get_next_link(), "previous": self.get_previous_link(), "results": data}
+        if self.count is not None:
+            payload = {"count": self.count, **payload}
+        return Response(payload)
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(self.max_page_size, size))
+
+    def get_count(self, queryset, request):
+        mode = request.query_params.get(self.count_query_param)
+        if mode == "estimate" and connection.vendor == "postgresql":
+            return self._estimate_count(queryset)
+        if mode in ("exact", "estimate", "true", "1"):
+            return queryset.count()
+        return None
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self._link(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self._link(self.page[0], reverse=True)
+
+    def decode_cursor(self, request):
+        raw = request.query_params.get(self.cursor_query_param)
+        if not raw:
+            return None
+        try:
+            data = json.loads(base64.urlsafe_b64decode(raw.encode("ascii")).decode("utf-8"))
+            position, reverse = data["p"], bool(data.get("r"))
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        # o cursor vem do cliente: cada valor precisa caber no tipo do campo antes de ir para o filtro
+        try:
+            position = [self._coerce(field, value) for field, value in zip(self.fields, position)]
+        except (ValidationError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        return {"p": position, "r": reverse}
+
+    def encode_cursor(self, position, reverse):
+        raw = json.dumps({"p": position, "r": int(reverse)}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+    def _link(self, obj, reverse):
+        position = [self._position_value(obj, o) for o in self.ordering]
+        url = remove_query_param(self.base_url, self.cursor_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(position, reverse))
+
+    def _position_value(self, obj, ordering):
+        value = getattr(obj, ordering.lstrip("-"))
+        if hasattr(value, "isoformat"):
+            return value.isoformat()
+        return value if isinstance(value, int) else str(value)
+
+    def _ordering_field(self, queryset, ordering):
+        name = ordering.lstrip("-")
+        annotation = queryset.query.annotations.get(name)
+        if annotation is not None:
+            return annotation.output_field
+        if name == "pk":
+            return queryset.model._meta.pk
+        return queryset.model._meta.get_field(name)
+
+    def _coerce(self, field, value):
+        if value is None or isinstance(value, (list, dict, bool)):
+            raise ValueError(value)
+        value = field.to_python(value)
+        if value is None:
+            raise ValueError(value)
+        return value
+
+    def _flip(self, ordering):
+        return ordering[1:] if ordering.startswith("-") else f"-{ordering}"
+
+    def _after(self, ordering, position):
+        # (a, b) depois de (va, vb)  =>  a > va OR (a = va AND b > vb), respeitando a direção de cada campo
+        condition = Q()
+        equal = Q()
+        for field_ordering, value in zip(ordering, position):
+            field = field_ordering.lstrip("-")
+            lookup = "lt" if field_ordering.startswith("-") else "gt"
+            condition |= equal & Q(**{f"{field}__{lookup}": value})
+            equal &= Q(**{field: value})
+        return condition
+
+    def _estimate_count(self, queryset):
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
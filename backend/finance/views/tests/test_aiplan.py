@@ -82,3 +82,18 @@ class AIPlanViewSetTests(TestCase):
         ids = [item["id"] for item in response.data["results"]]
         self.assertIn(self.plan_user2.id, ids)
         self.assertNotIn(self.plan_user1.id, ids)
+
+    def test_etag_changes_when_plans_change(self):
+        view = AIPlanViewSet.as_view({"get": "list"})
+        request = self.factory.get("/aiplans/")
+        force_authenticate(request, user=self.user1)
+        etag = view(request)["ETag"]
+
+        request = self.factory.get("/aiplans/", HTTP_IF_NONE_MATCH=etag)
+        force_authenticate(request, user=self.user1)
+        self.assertEqual(view(request).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        AIPlan.objects.create(user=self.user1, title="Outro")
+        request = self.factory.get("/aiplans/", HTTP_IF_NONE_MATCH=etag)
+        force_authenticate(request, user=self.user1)
+        self.assertEqual(view(request).status_code, status.HTTP_200_OK)
@@ -0,0 +1,122 @@
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
+from finance.models import AIPlan, AIPlanJob
+from finance.services.jobs import STALE_JOB_DETAIL
+from finance.services.plans import run_plan_job
+from finance.views.aiplanjob import AIPlanJobViewSet
+
+User = get_user_model()
+
+VALID = {"is_valid": True, "intent": "plan", "lang": "pt", "warnings": []}
+
+def _fake_client(content='{"title": "Quitar dívidas", "spec": {"overview": {"summary": "ok"}}}'):
+    client = MagicMock()
+    client.chat.completions.create.return_value = MagicMock(
+        choices=[MagicMock(message=MagicMock(content=content))],
+        usage=MagicMock(total_tokens=321),
+    )
+    return client
+
+@override_settings(FINANCE_JOBS_EAGER=True)
+@patch("finance.services.plans.get_groq_model", return_value="model-x")
+@patch("finance.services.plans.build_user_finance_context", return_value={})
+@patch("finance.views.llm.validate_and_classify_prompt", return_value=VALID)
+class AIPlanJobViewSetTests(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.user = User.objects.create_user(email="job@example.com", password="123", name="Job")
+        self.other = User.objects.create_user(email="job2@example.com", password="123", name="Job2")
+        cache.clear()
+
+    def _create(self, data):
+        req = self.factory.post("/ai/plan/jobs/", data, format="json")
+        force_authenticate(req, user=self.user)
+        return AIPlanJobViewSet.as_view({"post": "create"})(req)
+
+    def _retrieve(self, pk, user=None):
+        req = self.factory.get(f"/ai/plan/jobs/{pk}/")
+        force_authenticate(req, user=user or self.user)
+        return AIPlanJobViewSet.as_view({"get": "retrieve"})(req, pk=pk)
+
+    @patch("finance.services.plans.get_groq_client", side_effect=_fake_client)
+    def test_job_generates_and_saves_plan(self, *mocks):
+        resp = self._create({"template": "generico", "objective": "Quitar o cartão", "temperature": 0.3})
+        self.assertEqual(resp.status_code, status.HTTP_202_ACCEPTED)
+
+        resp = self._retrieve(resp.data["id"])
+        self.assertEqual(resp.data["status"], AIPlanJob.Status.DONE)
+        self.assertEqual(resp.data["tokens"], 321)
+        self.assertEqual(resp.data["plan"]["title"], "Quitar dívidas")
+
+        plan = AIPlan.objects.get(user=self.user)
+        self.assertEqual((plan.objective, plan.model, plan.temperature), ("Quitar o cartão", "model-x", 0.3))
+        self.assertEqual(plan.spec, {"overview": {"summary": "ok"}})
+        self.assertIsNotNone(AIPlanJob.objects.get().finished_at)
+
+    @patch("finance.services.plans.get_groq_client", side_effect=lambda: _fake_client("sem json"))
+    def test_invalid_model_output_fails_job_without_plan(self, *mocks):
+        resp = self._create({"template": "generico", "objective": "Quitar o cartão"})
+        job = AIPlanJob.objects.get(pk=resp.data["id"])
+        self.assertEqual(job.status, AIPlanJob.Status.FAILED)
+        self.assertEqual(job.detail, "JSON inválido na resposta")
+        self.assertFalse(AIPlan.objects.exists())
+
+    @patch("finance.services.plans.get_groq_client", side_effect=ConnectionError("timeout"))
+    def test_api_error_fails_job(self, *mocks):
+        resp = self._create({"template": "generico", "objective": "Quitar o cartão"})
+        job = AIPlanJob.objects.get(pk=resp.data["id"])
+        self.assertEqual(job.status, AIPlanJob.Status.FAILED)
+        self.assertIn("timeout", job.detail)
+
+    def test_validation_and_rate_limit_happen_before_enqueue(self, *mocks):
+        self.assertEqual(self._create({"template": "generico"}).status_code, status.HTTP_400_BAD_REQUEST)
+        cache.set(f"ai_plan_rate:{self.user.id}", 5, timeout=3600)
+        self.assertEqual(self._create({"objective": "x"}).status_code, 429)
+        self.assertFalse(AIPlanJob.objects.exists())
+
+    def test_other_users_job_is_not_visible(self, *mocks):
+        job = AIPlanJob.objects.create(user=self.other, objective="Outro")
+        self.assertEqual(self._retrieve(job.pk).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_stale_jobs_fail_on_poll(self, *mocks):
+        old = timezone.now() - timedelta(minutes=31)
+        stale = AIPlanJob.objects.create(user=self.user, objective="Perdido", status=AIPlanJob.Status.RUNNING)
+        fresh = AIPlanJob.objects.create(user=self.user, objective="Na fila")
+        done = AIPlanJob.objects.create(user=self.user, objective="Pronto", status=AIPlanJob.Status.DONE)
+        AIPlanJob.objects.filter(pk__in=[stale.pk, done.pk]).update(updated_at=old)
+
+        resp = self._retrieve(stale.pk)
+        self.assertEqual(resp.data["status"], AIPlanJob.Status.FAILED)
+        self.assertEqual(resp.data["detail"], STALE_JOB_DETAIL)
+
+        AIPlanJob.objects.filter(pk=fresh.pk).update(updated_at=old)
+        req = self.factory.get("/ai/plan/jobs/")
+        force_authenticate(req, user=self.user)
+        resp = AIPlanJobViewSet.as_view({"get": "list"})(req)
+        statuses = {row["id"]: row["status"] for row in resp.data["results"]}
+        self.assertEqual(statuses[fresh.pk], AIPlanJob.Status.FAILED)
+        self.assertEqual(statuses[done.pk], AIPlanJob.Status.DONE)
+        self.assertEqual(AIPlanJob.objects.get(pk=fresh.pk).status, AIPlanJob.Status.FAILED)
+
+        # o runner não ressuscita um job já dado como perdido
+        run_plan_job(fresh.pk)
+        self.assertEqual(AIPlanJob.objects.get(pk=fresh.pk).status, AIPlanJob.Status.FAILED)
+
+    @override_settings(FINANCE_JOBS_EAGER=False)
+    @patch("finance.services.jobs.get_executor")
+    def test_job_is_submitted_after_commit(self, executor, *mocks):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            resp = self._create({"template": "generico", "objective": "Quitar o cartão"})
+            self.assertEqual(resp.status_code, status.HTTP_202_ACCEPTED)
+        executor.return_value.submit.assert_not_called()
+        self.assertEqual(resp.data["status"], AIPlanJob.Status.PENDING)
+
+        for callback in callbacks:
+            callback()
+        executor.return_value.submit.assert_called_once()
@@ -0,0 +1,139 @@
+import os
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
+from finance.models.category import Category
+from finance.models.importjob import ImportJob
+from finance.models.transaction import Transaction
+from finance.models.wallet import Wallet
+from finance.services.importer import run_import_job
+from finance.views.importjob import ImportJobViewSet
+
+User = get_user_model()
+
+CSV_CONTENT = (
+    "Data;Histórico;Valor;Categoria\n"
+    "05/03/2025;Mercado;-1.234,56;Alimentação\n"
+    "06/03/2025;Salário;5.000,00;\n"
+    "07/03/2025;Sem valor;0,00;\n"
+    "xx/03/2025;Data ruim;10,00;\n"
+).encode("utf-8")
+
+OFX_CONTENT = b"""OFXHEADER:100
+DATA:OFXSGML
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>20250310120000[-3:BRT]
+<TRNAMT>-45.90
+<FITID>1
+<MEMO>Farmacia
+</STMTTRN>
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20250311<TRNAMT>100.00<FITID>2<NAME>Pix recebido</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+class ImportJobViewSetTests(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.user = User.objects.create_user(email="imp@example.com", password="123", name="Imp")
+        self.other = User.objects.create_user(email="imp2@example.com", password="123", name="Imp2")
+        self.wallet = Wallet.objects.create(user=self.user, name="Conta")
+        self.wallet_other = Wallet.objects.create(user=self.other, name="Outra")
+        self.category = Category.objects.create(user=self.user, name="Alimentação")
+
+    def _upload(self, name, content, **data):
+        view = ImportJobViewSet.as_view({"post": "create"})
+        payload = {"file": SimpleUploadedFile(name, content), "wallet_id": self.wallet.id, **data}
+        req = self.factory.post("/imports/", payload, format="multipart")
+        force_authenticate(req, user=self.user)
+        return view(req)
+
+    def test_csv_import_maps_rows_and_reports_summary(self):
+        resp = self._upload("extrato.csv", CSV_CONTENT)
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(resp.data["status"], ImportJob.Status.DONE)
+        self.assertEqual(
+            (resp.data["processed"], resp.data["imported"], resp.data["skipped"], resp.data["failed"]),
+            (4, 2, 1, 1),
+        )
+        self.assertEqual(resp.data["errors"][0]["line"], 5)
+
+        market = Transaction.objects.get(user=self.user, description="Mercado")
+        self.assertEqual(
+            (market.type, market.amount, market.date, market.category_id),
+            (Transaction.Type.EXPENSE, Decimal("1234.56"), date(2025, 3, 5), self.category.id),
+        )
+        self.wallet.refresh_from_db()
+        self.assertEqual(self.wallet.current_balance, Decimal("3765.44"))
+
+        # reimportar o mesmo extrato não duplica
+        again = self._upload("extrato.csv", CSV_CONTENT)
+        self.assertEqual((again.data["imported"], again.data["skipped"]), (0, 3))
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 2)
+
+    def test_rows_in_transfer_category_are_transfers(self):
+        content = (
+            "Data;Histórico;Valor;Categoria\n"
+            "05/03/2025;Para poupança;-200,00;Transferência\n"
+            "06/03/2025;Mercado;-50,00;Alimentação\n"
+        ).encode("utf-8")
+        resp = self._upload("extrato.csv", content)
+        self.assertEqual(resp.data["imported"], 2)
+        flags = dict(Transaction.objects.filter(user=self.user).values_list("description", "is_transfer"))
+        self.assertEqual(flags, {"Para poupança": True, "Mercado": False})
+
+    def test_ofx_import(self):
+        resp = self._upload("extrato.ofx", OFX_CONTENT)
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(resp.data["imported"], 2)
+        rows = {t.description: t for t in Transaction.objects.filter(user=self.user)}
+        self.assertEqual((rows["Farmacia"].type, rows["Farmacia"].amount), (Transaction.Type.EXPENSE, Decimal("45.90")))
+        self.assertEqual((rows["Pix recebido"].type, rows["Pix recebido"].date), (Transaction.Type.INCOME, date(2025, 3, 11)))
+
+    @override_settings(FINANCE_IMPORT_SYNC_MAX_BYTES=0, FINANCE_JOBS_EAGER=True)
+    def test_large_file_goes_to_background_job(self):
+        resp = self._upload("extrato.csv", CSV_CONTENT)
+        self.assertEqual(resp.status_code, status.HTTP_202_ACCEPTED)
+        job = ImportJob.objects.get(pk=resp.data["id"])
+        self.assertEqual((job.status, job.imported), (ImportJob.Status.DONE, 2))
+
+        view = ImportJobViewSet.as_view({"get": "retrieve"})
+        req = self.factory.get(f"/imports/{job.id}/")
+        force_authenticate(req, user=self.other)
+        self.assertEqual(view(req, pk=job.id).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_stale_background_job_fails_on_poll(self):
+        job = ImportJob.objects.create(user=self.user, wallet=self.wallet, format=ImportJob.Format.CSV)
+        ImportJob.objects.filter(pk=job.pk).update(updated_at=timezone.now() - timedelta(minutes=31))
+
+        view = ImportJobViewSet.as_view({"get": "retrieve"})
+        req = self.factory.get(f"/imports/{job.id}/")
+        force_authenticate(req, user=self.user)
+        self.assertEqual(view(req, pk=job.id).data["status"], ImportJob.Status.FAILED)
+
+        # o arquivo de um job perdido é descartado sem importar nada
+        fd, path = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(fd, "wb") as out:
+            out.write(CSV_CONTENT)
+        run_import_job(job.pk, path=path)
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(Transaction.objects.filter(user=self.user).exists())
+
+    def test_invalid_header_marks_job_failed(self):
+        resp = self._upload("extrato.csv", b"foo,bar\n1,2\n")
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(resp.data["status"], ImportJob.Status.FAILED)
+        self.assertTrue(resp.data["detail"])
+
+    def test_rejects_foreign_wallet_and_unknown_format(self):
+        resp = self._upload("extrato.csv", CSV_CONTENT, wallet_id=self.wallet_other.id)
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        resp = self._upload("extrato.txt", CSV_CONTENT)
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
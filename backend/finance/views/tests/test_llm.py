@@ -1,24 +1,48 @@
+import json
+from decimal import Decimal
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
 from rest_framework.test import APIRequestFactory, force_authenticate
 from rest_framework import status
 from unittest.mock import patch, MagicMock
-from finance.views.llm import AIPlanGenerateView, _extract_json
+from finance.llm.parsing import PlanSectionParser, extract_json
+from finance.models import Category, Transaction, Wallet
+from finance.services.llm_context import build_user_finance_context
+from finance.views.llm import AIPlanGenerateView, AIPlanGenerateStreamView
+from core.timing import RequestTimings, ServerTimingMiddleware
 
 User = get_user_model()
 
 class ExtractJsonTests(TestCase):
     def test_extract_valid_json(self):
         s = '{"a":1, "b":2}'
-        self.assertEqual(_extract_json(s), {"a": 1, "b": 2})
+        self.assertEqual(extract_json(s), {"a": 1, "b": 2})
 
     def test_extract_json_inside_codeblock(self):
         s = "```json\n{\"x\":10}\n```"
-        self.assertEqual(_extract_json(s), {"x": 10})
+        self.assertEqual(extract_json(s), {"x": 10})
 
     def test_extract_invalid_returns_none(self):
-        self.assertIsNone(_extract_json("nada a ver"))
+        self.assertIsNone(extract_json("nada a ver"))
+
+
+class FinanceContextTests(TestCase):
+    def test_wallet_balance_ignores_transfers_and_credit_sign(self):
+        user = User.objects.create_user(email="ctx@example.com", password="123", name="C")
+        checking = Wallet.objects.create(user=user, name="Conta", initial_balance=Decimal("100.00"))
+        card = Wallet.objects.create(user=user, name="Cartão", kind=Wallet.Kind.CREDIT, initial_balance=Decimal("50.00"))
+        transfer = Category.get_transfer_category()
+        Transaction.objects.create(user=user, wallet=checking, type=Transaction.Type.INCOME, amount=Decimal("30.00"))
+        Transaction.objects.create(user=user, wallet=checking, type=Transaction.Type.EXPENSE, amount=Decimal("40.00"), category=transfer)
+        Transaction.objects.create(user=user, wallet=card, type=Transaction.Type.EXPENSE, amount=Decimal("20.00"))
+        Transaction.objects.create(user=user, wallet=card, type=Transaction.Type.INCOME, amount=Decimal("40.00"), category=transfer)
+
+        ctx = build_user_finance_context(user)
+
+        balances = {w["name"]: w["current_balance"] for w in ctx["wallets"]}
+        self.assertEqual(balances, {"Conta": "130.00", "Cartão": "30.00"})
+        self.assertEqual(ctx["totals"]["net_worth"], "160.00")
 
 
 class AIPlanGenerateTests(TestCase):
@@ -82,8 +106,8 @@ class AIPlanGenerateTests(TestCase):
         resp = view(req)
         self.assertEqual(resp.status_code, 400)
 
-    @patch("finance.views.llm.get_groq_model", return_value="model-x")
-    @patch("finance.views.llm.get_groq_client")
+    @patch("finance.services.plans.get_groq_model", return_value="model-x")
+    @patch("finance.services.plans.get_groq_client")
     @patch("finance.views.llm.build_messages", return_value=[])
     @patch("finance.views.llm.build_user_finance_context", return_value={})
     @patch("finance.views.llm.validate_and_classify_prompt")
@@ -116,8 +140,8 @@ class AIPlanGenerateTests(TestCase):
         self.assertEqual(resp.data["model"], "model-x")
         self.assertEqual(resp.data["tokens_used"], 123)
 
-    @patch("finance.views.llm.get_groq_model", return_value="m")
-    @patch("finance.views.llm.get_groq_client")
+    @patch("finance.services.plans.get_groq_model", return_value="m")
+    @patch("finance.services.plans.get_groq_client")
     @patch("finance.views.llm.build_messages", return_value=[])
     @patch("finance.views.llm.build_user_finance_context", return_value={})
     @patch("finance.views.llm.validate_and_classify_prompt")
@@ -135,3 +159,121 @@ class AIPlanGenerateTests(TestCase):
         resp = view(req)
 
         self.assertEqual(resp.status_code, 422)
+
+
+PLAN_JSON = json.dumps({
+    "title": "Reserva",
+    "spec": {
+        "overview": {"objective": "Reserva", "summary": "Guardar {10%}"},
+        "strategy": {"title": "Poupar", "text": "x", "steps": ["a", "b"]},
+        "goals": {"items": [], "suggested": []},
+        "risks": [{"title": "Gastos", "severity": "Alto", "description": "", "mitigation": ""}],
+    },
+}, ensure_ascii=False)
+
+def _sse(content):
+    events = []
+    for block in content.decode("utf-8").strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+class PlanSectionParserTests(TestCase):
+    def test_sections_are_emitted_as_soon_as_they_close(self):
+        parser = PlanSectionParser()
+        cut = PLAN_JSON.index('"strategy"')
+        first = parser.feed("```json\n" + PLAN_JSON[:cut])
+        self.assertEqual(first, [
+            ("title", "Reserva"),
+            ("overview", {"objective": "Reserva", "summary": "Guardar {10%}"}),
+        ])
+        rest = [name for char in PLAN_JSON[cut:] for name, _ in parser.feed(char)]
+        self.assertEqual(rest, ["strategy", "goals", "risks"])
+
+
+class AIPlanGenerateStreamTests(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.user = User.objects.create_user(email="s@example.com", password="123", name="S")
+        cache.clear()
+
+    def _post(self, data, **extra):
+        req = self.factory.post("/ai/plan/generate/stream/", data, format="json", **extra)
+        force_authenticate(req, user=self.user)
+        resp = AIPlanGenerateStreamView.as_view()(req)
+        if not resp.streaming:
+            resp.render()
+        return resp
+
+    @patch("finance.services.plans.get_groq_model", return_value="model-x")
+    @patch("finance.services.plans.get_groq_client")
+    @patch("finance.views.llm.build_messages", return_value=[])
+    @patch("finance.views.llm.build_user_finance_context", return_value={})
+    @patch("finance.views.llm.validate_and_classify_prompt")
+    def test_streams_tokens_sections_and_final_plan(self, mock_validate, mock_ctx, mock_build, mock_client, mock_model):
+        mock_validate.return_value = {"is_valid": True, "intent": "plan", "lang": "pt", "warnings": []}
+        chunks = [
+            MagicMock(choices=[MagicMock(delta=MagicMock(content=PLAN_JSON[i:i + 40]))], usage=None, x_groq=None)
+            for i in range(0, len(PLAN_JSON), 40)
+        ]
+        chunks.append(MagicMock(choices=[], usage=MagicMock(total_tokens=77)))
+        mock_client.return_value.chat.completions.create.return_value = iter(chunks)
+
+        resp = self._post({"template": "generic", "objective": "Reserva"}, HTTP_ACCEPT="text/event-stream")
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp["Content-Type"], "text/event-stream; charset=utf-8")
+        events = _sse(b"".join(resp.streaming_content))
+        self.assertEqual("".join(data["text"] for name, data in events if name == "token"), PLAN_JSON)
+        sections = [data["name"] for name, data in events if name == "section"]
+        self.assertEqual(sections, ["overview", "strategy", "goals", "risks"])
+        name, done = events[-1]
+        self.assertEqual(name, "done")
+        self.assertEqual((done["model"], done["tokens_used"], done["data"]["title"]), ("model-x", 77, "Reserva"))
+        self.assertEqual(mock_client.return_value.chat.completions.create.call_args.kwargs["stream"], True)
+
+    @patch("finance.services.plans.get_groq_model", return_value="m")
+    @patch("finance.services.plans.get_groq_client")
+    @patch("finance.views.llm.build_messages", return_value=[])
+    @patch("finance.views.llm.build_user_finance_context", return_value={})
+    @patch("finance.views.llm.validate_and_classify_prompt")
+    def test_streamed_model_call_counts_as_one_external_call(self, mock_validate, mock_ctx, mock_build, mock_client, mock_model):
+        mock_validate.return_value = {"is_valid": True, "intent": "plan", "lang": "pt", "warnings": []}
+        chunks = [MagicMock(choices=[MagicMock(delta=MagicMock(content=c))], usage=None, x_groq=None) for c in PLAN_JSON]
+        mock_client.return_value.chat.completions.create.return_value = iter(chunks)
+        finished = []
+        middleware = ServerTimingMiddleware(lambda request: self._post({"template": "generic", "objective": "Reserva"}))
+
+        with patch.object(RequestTimings, "finish", autospec=True, side_effect=finished.append):
+            resp = middleware(self.factory.post("/ai/plan/generate/stream/"))
+            self.assertEqual(finished, [])
+            b"".join(resp.streaming_content)
+
+        self.assertEqual(len(finished), 1)
+        self.assertEqual(finished[0].external["llm"][1], 1)
+
+    @patch("finance.services.plans.get_groq_model", return_value="m")
+    @patch("finance.services.plans.get_groq_client")
+    @patch("finance.views.llm.build_messages", return_value=[])
+    @patch("finance.views.llm.build_user_finance_context", return_value={})
+    @patch("finance.views.llm.validate_and_classify_prompt")
+    def test_invalid_plan_ends_with_error_event(self, mock_validate, mock_ctx, mock_build, mock_client, mock_model):
+        mock_validate.return_value = {"is_valid": True, "intent": "", "lang": "", "warnings": []}
+        mock_client.return_value.chat.completions.create.return_value = iter([
+            MagicMock(choices=[MagicMock(delta=MagicMock(content="notjson"))], usage=None, x_groq=None),
+        ])
+
+        events = _sse(b"".join(self._post({"template": "generic", "objective": "x"}).streaming_content))
+
+        self.assertEqual(events[-1], ("error", {"detail": "JSON inválido na resposta", "status": 422, "preview": "notjson"}))
+
+    def test_validation_errors_before_streaming(self):
+        resp = self._post({"template": "custom", "prompt": ""})
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.data["detail"], "Prompt obrigatório para template custom.")
+
+        cache.set(f"ai_plan_rate:{self.user.id}", 5, timeout=3600)
+        resp = self._post({"objective": "x"}, HTTP_ACCEPT="text/event-stream")
+        self.assertEqual(resp.status_code, 429)
+        self.assertEqual(_sse(resp.content)[0][0], "error")
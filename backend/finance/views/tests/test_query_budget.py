@@ -0,0 +1,403 @@
+import io
+import os
+from datetime import date, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+from django.core.cache import cache
+from django.db import connection, transaction as db_transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.urls import URLResolver
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+import accounts.urls
+import finance.urls
+from finance.models import AIPlan, AIPlanJob, Category, ImportJob, Transaction, Wallet
+
+User = get_user_model()
+
+DATASET_SIZES = (10, 1000)
+
+# linhas por lote de escrita (bulk, transferências em lote, importação)
+PROBE_ROWS = 5
+
+# Blocos que se repetem nas escritas; cada um é uma consulta (ou um par) qualquer
+# que seja o tamanho do lote ou quantas carteiras e chaves de rollup ele toca.
+ATOMIC = 2        # SAVEPOINT + RELEASE de transaction.atomic()
+VERSION = 1       # DataVersion.bump
+LEDGER = 2        # saldos das carteiras + upsert dos rollups (apply_ledger_changes)
+CLEANUP = 1       # rollups que chegaram a zero transações, apagados de uma vez
+TRANSFER_IDS = 1  # ids da categoria de transferências (em cache só após commit; TestCase nunca faz)
+AI_CONTEXT = 5    # build_user_finance_context: carteiras, receitas, despesas, top categorias, categorias
+
+# Orçamento de consultas SQL por (rota, método), com lotes espalhados por
+# PROBE_ROWS chaves de rollup. Leituras: autenticação/objeto + dados (+ COUNT da
+# paginação). Escritas: a soma dos blocos acima, então uma consulta a mais por
+# linha, carteira ou chave aparece como estouro aqui e como diferença entre
+# spreads em test_query_counts_do_not_grow_with_rollup_keys.
+# Ao melhorar um endpoint, baixe o número aqui.
+QUERY_BUDGETS = {
+    ("ai-plan-detail", "delete"): 3,  # objeto, desvincula jobs, DELETE
+    ("ai-plan-detail", "get"): 2,
+    ("ai-plan-detail", "patch"): 2,
+    ("ai-plan-detail", "put"): 2,
+    ("ai-plan-generate", "post"): AI_CONTEXT,
+    ("ai-plan-generate-stream", "post"): AI_CONTEXT,
+    ("ai-plan-job-detail", "get"): 1,
+    ("ai-plan-job-list", "get"): 2,
+    # INSERT, leitura e status do job; contexto; INSERT do plano; fim do job; resposta (job + plano)
+    ("ai-plan-job-list", "post"): 3 + AI_CONTEXT + 1 + 2 + 2,
+    ("ai-plan-list", "get"): 3,
+    ("ai-plan-list", "post"): 1,
+    ("api-root", "get"): 0,
+    ("auth-google", "get"): 0,
+    ("auth-google-callback", "post"): 1 + ATOMIC + 1 + 1,  # busca, cria usuário, registra o refresh token
+    ("auth-logout", "post"): 0,
+    # coletor de cascata do Django: 3 SELECTs + um DELETE/UPDATE por tabela relacionada
+    # (cresce com o schema, não com os dados)
+    ("auth-me", "delete"): 21,
+    ("auth-me", "get"): 0,
+    ("auth-refresh", "post"): 3,
+    ("category-archive", "post"): 1 + ATOMIC + 1 + VERSION,
+    # objeto; rollups passam para "sem categoria" (INSERT...SELECT + DELETE); desvincula transações, DELETE
+    ("category-detail", "delete"): 1 + ATOMIC + 2 + 2 + VERSION,
+    ("category-detail", "get"): 2,
+    ("category-detail", "patch"): 2 + ATOMIC + 1 + VERSION,  # objeto, nome único; UPDATE
+    ("category-detail", "put"): 2 + ATOMIC + 1 + VERSION,
+    ("category-list", "get"): 3,
+    ("category-list", "post"): 1 + ATOMIC + 1 + VERSION,
+    ("import-job-detail", "get"): 1,
+    ("import-job-list", "get"): 2,
+    # carteira; cria, lê e marca o job; carteiras, categorias e duplicatas; lote
+    # (atomic aninhado + INSERT + razão); progresso, fim e resposta
+    ("import-job-list", "post"): 1 + 3 + 3 + ATOMIC + ATOMIC + 1 + LEDGER + VERSION + 3,
+    ("transaction-balance-series", "get"): 4,
+    # COUNT de posse; usuários e snapshot dos afetados, DELETE
+    ("transaction-bulk-create", "delete"): 1 + ATOMIC + 3 + LEDGER + CLEANUP + VERSION,
+    # categoria válida; ids, snapshot antes/depois e UPDATE; só rollups (saldos não mudam)
+    ("transaction-bulk-create", "patch"): 1 + TRANSFER_IDS + ATOMIC + 4 + 1 + CLEANUP + VERSION,
+    # carteiras e categorias do lote validadas de uma vez; atomic externo + o do bulk_create
+    ("transaction-bulk-create", "post"): 2 + ATOMIC + TRANSFER_IDS + ATOMIC + 1 + LEDGER + VERSION,
+    ("transaction-dashboard", "get"): 10,
+    ("transaction-detail", "delete"): 1 + ATOMIC + 1 + LEDGER + CLEANUP + VERSION,
+    ("transaction-detail", "get"): 2,
+    ("transaction-detail", "patch"): 2 + TRANSFER_IDS + ATOMIC + 1 + LEDGER + VERSION,  # objeto, carteira
+    ("transaction-detail", "put"): 3 + TRANSFER_IDS + ATOMIC + 1 + LEDGER + VERSION,  # objeto, carteira, categoria
+    ("transaction-expenses-by-category", "get"): 2,
+    ("transaction-export", "get"): 1,
+    ("transaction-income-by-source", "get"): 2,
+    ("transaction-list", "get"): 3,
+    ("transaction-list", "post"): 2 + TRANSFER_IDS + ATOMIC + 1 + LEDGER + VERSION,  # carteira, categoria
+    ("transaction-monthly", "get"): 2,
+    ("transaction-recent", "get"): 2,
+    ("transaction-stats", "get"): 3,
+    # carteiras e categoria de transferência; atomic externo + o do bulk_create
+    ("transaction-transfer", "post"): 2 + ATOMIC + TRANSFER_IDS + ATOMIC + 1 + LEDGER + VERSION,
+    ("transaction-transfer-batch", "post"): 2 + ATOMIC + TRANSFER_IDS + ATOMIC + 1 + LEDGER + VERSION,
+    ("wallet-archive", "post"): 1 + ATOMIC + 1 + VERSION,
+    ("wallet-detail", "delete"): 1 + ATOMIC + 4 + VERSION,  # objeto; rollups, transações, importações, carteira
+    ("wallet-detail", "get"): 2,
+    ("wallet-detail", "patch"): 1 + ATOMIC + 1 + VERSION,
+    ("wallet-detail", "put"): 2 + ATOMIC + 1 + VERSION,  # objeto, nome único; UPDATE
+    ("wallet-list", "get"): 3,
+    ("wallet-list", "post"): 1 + ATOMIC + 1 + VERSION,
+    ("wallet-total-balance", "get"): 2,
+}
+
+def _today():
+    return date.today()
+
+def _probe_key(f, i):
+    """
+    Carteira, categoria e data da i-ésima linha de um lote de escrita. As linhas
+    se espalham por f.spread chaves de rollup (mês, carteira e categoria variam
+    juntos); a linha 0 fica sempre sozinha na sua chave.
+    """
+    k = min(i, f.spread - 1)
+    return {
+        "wallet": f.wallets[k % len(f.wallets)],
+        "category": f.categories[k % len(f.categories)],
+        "date": _today() - timedelta(days=32 * k),
+    }
+
+def seed_dataset(n, email, spread=PROBE_ROWS):
+    """
+    Usuário com n transações (10% arquivadas, algumas transferências) e
+    carteiras, categorias, planos e importações proporcionais a n.
+    """
+    user = User.objects.create_user(email=email, password="123", name="Budget")
+    wallets = [
+        Wallet.objects.create(user=user, name=f"Carteira {i}", initial_balance=Decimal("100.00"))
+        for i in range(max(2, n // 50))
+    ]
+    wallets.append(Wallet.objects.create(user=user, name="Cartão", kind=Wallet.Kind.CREDIT))
+    categories = [Category.objects.create(user=user, name=f"Categoria {i}") for i in range(max(2, n // 50))]
+    transfer = Category.get_transfer_category()
+    today = _today()
+
+    rows = []
+    for i in range(n):
+        is_transfer = i % 25 == 0
+        rows.append(Transaction(
+            user=user,
+            wallet=wallets[i % len(wallets)],
+            category=transfer if is_transfer else categories[i % len(categories)],
+            type=Transaction.Type.INCOME if i % 3 == 0 else Transaction.Type.EXPENSE,
+            amount=Decimal(i % 300 + 1),
+            date=today - timedelta(days=i % 730),
+            description=f"lançamento {i}",
+            is_archived=i % 10 == 9,
+            is_transfer=is_transfer,
+        ))
+    Transaction.objects.bulk_create(rows, batch_size=1000)
+    # linhas que as chamadas de escrita alteram: iguais para qualquer n, para que
+    # o custo medido dependa só do volume de dados e não do formato do lote
+    fixture = SimpleNamespace(wallets=wallets, categories=categories, spread=spread)
+    probes = Transaction.objects.bulk_create([
+        Transaction(
+            user=user, type=Transaction.Type.EXPENSE, amount=Decimal("5.00"),
+            description=f"sonda {i}", **_probe_key(fixture, i),
+        )
+        for i in range(PROBE_ROWS)
+    ])
+
+    AIPlan.objects.bulk_create([
+        AIPlan(user=user, title=f"Plano {i}", spec={"steps": [i]}) for i in range(max(1, n // 50))
+    ])
+    AIPlanJob.objects.bulk_create([
+        AIPlanJob(user=user, objective=f"Objetivo {i}", status=AIPlanJob.Status.DONE) for i in range(max(1, n // 50))
+    ])
+    ImportJob.objects.bulk_create([
+        ImportJob(user=user, wallet=wallets[0], filename=f"extrato{i}.csv", format=ImportJob.Format.CSV)
+        for i in range(max(1, n // 100))
+    ])
+
+    return SimpleNamespace(
+        user=user,
+        spread=spread,
+        wallets=wallets,
+        categories=categories,
+        wallet=wallets[0],
+        other_wallet=wallets[1],
+        category=categories[0],
+        transaction=probes[0],
+        tx_ids=[obj.pk for obj in probes],
+        plan=AIPlan.objects.filter(user=user).first(),
+        import_job=ImportJob.objects.filter(user=user).first(),
+        plan_job=AIPlanJob.objects.filter(user=user).first(),
+    )
+
+def _tx_payload(f, i=0):
+    key = _probe_key(f, i)
+    return {
+        "type": "expense", "wallet": key["wallet"].id, "category": key["category"].id,
+        "amount": "12.50", "date": key["date"].isoformat(), "description": "orçamento",
+    }
+
+def _transfer(f, i):
+    k = min(i, f.spread - 1)
+    return {
+        "from_wallet_id": f.wallets[k % len(f.wallets)].id,
+        "to_wallet_id": f.wallets[(k + 1) % len(f.wallets)].id,
+        "amount": "1.00",
+        "date": _probe_key(f, i)["date"].isoformat(),
+    }
+
+def _statement(f):
+    content = "data;descricao;valor\n" + "".join(
+        f"{_probe_key(f, i)['date'].strftime('%d/%m/%Y')};item {i};-{i + 1},00\n" for i in range(PROBE_ROWS)
+    )
+    upload = io.BytesIO(content.encode("utf-8"))
+    upload.name = "extrato.csv"
+    return {"file": upload, "wallet_id": f.wallet.id}
+
+# (rota, método) -> f(fixture) -> (url, dados[, formato])
+ENDPOINTS = {
+    ("api-root", "get"): lambda f: ("/api/finance/", None),
+    ("category-list", "get"): lambda f: ("/api/finance/categories/", None),
+    ("category-list", "post"): lambda f: ("/api/finance/categories/", {"name": "Nova categoria"}),
+    ("category-detail", "get"): lambda f: (f"/api/finance/categories/{f.category.id}/", None),
+    ("category-detail", "put"): lambda f: (f"/api/finance/categories/{f.category.id}/", {"name": "Renomeada"}),
+    ("category-detail", "patch"): lambda f: (f"/api/finance/categories/{f.category.id}/", {"name": "Renomeada"}),
+    ("category-detail", "delete"): lambda f: (f"/api/finance/categories/{f.category.id}/", None),
+    ("category-archive", "post"): lambda f: (f"/api/finance/categories/{f.category.id}/archive/", None),
+    ("wallet-list", "get"): lambda f: ("/api/finance/wallets/", None),
+    ("wallet-list", "post"): lambda f: ("/api/finance/wallets/", {"name": "Nova carteira"}),
+    ("wallet-total-balance", "get"): lambda f: ("/api/finance/wallets/total-balance/", None),
+    ("wallet-detail", "get"): lambda f: (f"/api/finance/wallets/{f.wallet.id}/", None),
+    ("wallet-detail", "put"): lambda f: (f"/api/finance/wallets/{f.wallet.id}/", {"name": "Renomeada", "kind": "checking"}),
+    ("wallet-detail", "patch"): lambda f: (f"/api/finance/wallets/{f.wallet.id}/", {"color": "#000000"}),
+    ("wallet-detail", "delete"): lambda f: (f"/api/finance/wallets/{f.wallet.id}/", None),
+    ("wallet-archive", "post"): lambda f: (f"/api/finance/wallets/{f.wallet.id}/archive/", None),
+    ("transaction-list", "get"): lambda f: ("/api/finance/transactions/", None),
+    ("transaction-list", "post"): lambda f: ("/api/finance/transactions/", _tx_payload(f)),
+    ("transaction-detail", "get"): lambda f: (f"/api/finance/transactions/{f.transaction.id}/", None),
+    ("transaction-detail", "put"): lambda f: (f"/api/finance/transactions/{f.transaction.id}/", _tx_payload(f)),
+    ("transaction-detail", "patch"): lambda f: (f"/api/finance/transactions/{f.transaction.id}/", {"amount": "99.00", "wallet": f.wallet.id}),
+    ("transaction-detail", "delete"): lambda f: (f"/api/finance/transactions/{f.transaction.id}/", None),
+    ("transaction-stats", "get"): lambda f: ("/api/finance/transactions/stats/", None),
+    ("transaction-monthly", "get"): lambda f: ("/api/finance/transactions/monthly/", {"months": "12"}),
+    ("transaction-expenses-by-category", "get"): lambda f: ("/api/finance/transactions/expenses-by-category/", None),
+    ("transaction-income-by-source", "get"): lambda f: ("/api/finance/transactions/income-by-source/", None),
+    ("transaction-balance-series", "get"): lambda f: ("/api/finance/transactions/balance-series/", {"months": "12"}),
+    ("transaction-recent", "get"): lambda f: ("/api/finance/transactions/recent/", None),
+    ("transaction-dashboard", "get"): lambda f: ("/api/finance/transactions/dashboard/", None),
+    ("transaction-export", "get"): lambda f: ("/api/finance/transactions/export/", None),
+    ("transaction-bulk-create", "post"): lambda f: (
+        "/api/finance/transactions/bulk/", {"transactions": [_tx_payload(f, i) for i in range(PROBE_ROWS)]},
+    ),
+    ("transaction-bulk-create", "patch"): lambda f: (
+        "/api/finance/transactions/bulk/", {"ids": f.tx_ids, "category": f.category.id},
+    ),
+    ("transaction-bulk-create", "delete"): lambda f: ("/api/finance/transactions/bulk/", {"ids": f.tx_ids}),
+    ("transaction-transfer", "post"): lambda f: (
+        "/api/finance/transactions/transfer/",
+        {"from_wallet_id": f.wallet.id, "to_wallet_id": f.other_wallet.id, "amount": "10.00"},
+    ),
+    ("transaction-transfer-batch", "post"): lambda f: (
+        "/api/finance/transactions/transfer/batch/",
+        {"transfers": [_transfer(f, i) for i in range(PROBE_ROWS)]},
+    ),
+    ("ai-plan-list", "get"): lambda f: ("/api/finance/ai/plans/", None),
+    ("ai-plan-list", "post"): lambda f: ("/api/finance/ai/plans/", {"title": "Plano", "spec": {"a": 1}}),
+    ("ai-plan-detail", "get"): lambda f: (f"/api/finance/ai/plans/{f.plan.id}/", None),
+    ("ai-plan-detail", "put"): lambda f: (f"/api/finance/ai/plans/{f.plan.id}/", {"title": "Outro", "spec": {}}),
+    ("ai-plan-detail", "patch"): lambda f: (f"/api/finance/ai/plans/{f.plan.id}/", {"title": "Outro"}),
+    ("ai-plan-detail", "delete"): lambda f: (f"/api/finance/ai/plans/{f.plan.id}/", None),
+    ("ai-plan-generate", "post"): lambda f: (
+        "/api/finance/ai/plan/generate/", {"template": "generico", "objective": "Quitar o cartão de crédito"},
+    ),
+    ("ai-plan-job-list", "get"): lambda f: ("/api/finance/ai/plan/jobs/", None),
+    ("ai-plan-job-list", "post"): lambda f: (
+        "/api/finance/ai/plan/jobs/", {"template": "generico", "objective": "Quitar o cartão de crédito"},
+    ),
+    ("ai-plan-job-detail", "get"): lambda f: (f"/api/finance/ai/plan/jobs/{f.plan_job.id}/", None),
+    ("ai-plan-generate-stream", "post"): lambda f: (
+        "/api/finance/ai/plan/generate/stream/", {"template": "generico", "objective": "Quitar o cartão de crédito"},
+    ),
+    ("import-job-list", "get"): lambda f: ("/api/finance/imports/", None),
+    ("import-job-list", "post"): lambda f: ("/api/finance/imports/", _statement(f), "multipart"),
+    ("import-job-detail", "get"): lambda f: (f"/api/finance/imports/{f.import_job.id}/", None),
+    ("auth-google", "get"): lambda f: ("/api/accounts/auth/google/", None),
+    ("auth-google-callback", "post"): lambda f: ("/api/accounts/auth/google/callback/", {"code": "abc"}),
+    ("auth-refresh", "post"): lambda f: ("/api/accounts/auth/refresh/", None),
+    ("auth-logout", "post"): lambda f: ("/api/accounts/auth/logout/", None),
+    ("auth-me", "get"): lambda f: ("/api/accounts/auth/me/", None),
+    ("auth-me", "delete"): lambda f: ("/api/accounts/auth/me/", None),
+}
+
+def _url_routes(patterns):
+    """(nome, método) de todas as rotas, ignorando as variantes com sufixo de formato."""
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _url_routes(pattern.url_patterns)
+            continue
+        if "format" in str(pattern.pattern):
+            continue
+        actions = getattr(pattern.callback, "actions", None)
+        if actions:
+            methods = actions
+        else:
+            view_class = pattern.callback.view_class
+            methods = [m for m in view_class.http_method_names if m != "options" and hasattr(view_class, m)]
+        for method in methods:
+            if method != "head":
+                yield pattern.name, method
+
+def _fake_google(*args, **kwargs):
+    response = MagicMock()
+    response.json.return_value = {"access_token": "t", "email": "budget-google@example.com", "name": "G"}
+    return response
+
+def _fake_groq():
+    content = '{"title": "Plano", "spec": {"passos": []}}'
+
+    def create(stream=False, **kwargs):
+        if stream:
+            return iter([MagicMock(choices=[MagicMock(delta=MagicMock(content=content))], usage=None, x_groq=None)])
+        return MagicMock(choices=[MagicMock(message=MagicMock(content=content))], usage=MagicMock(total_tokens=10))
+
+    client = MagicMock()
+    client.chat.completions.create.side_effect = create
+    return client
+
+class QueryBudgetMixin:
+    """
+    Mede quantas consultas SQL cada endpoint faz. Cada chamada roda num savepoint
+    desfeito ao final, então chamadas de escrita não afetam as seguintes.
+    """
+    endpoints = ENDPOINTS
+
+    def count_queries(self, fixture, route, method):
+        spec = self.endpoints[(route, method)](fixture)
+        url, data = spec[0], spec[1]
+        fmt = spec[2] if len(spec) > 2 else "json"
+
+        client = APIClient()
+        client.force_authenticate(fixture.user)
+        if route == "auth-refresh":
+            client.cookies["refresh_token"] = str(RefreshToken.for_user(fixture.user))
+        cache.clear()
+
+        with db_transaction.atomic():
+            with CaptureQueriesContext(connection) as ctx:
+                if method == "get":
+                    response = client.get(url, data)
+                else:
+                    response = getattr(client, method)(url, data, format=fmt)
+                if response.streaming:
+                    b"".join(response.streaming_content)
+            db_transaction.set_rollback(True)
+
+        self.assertLess(response.status_code, 400, f"{method.upper()} {url}: {response.status_code}")
+        return len(ctx.captured_queries)
+
+    def measure(self, n, spread=PROBE_ROWS):
+        with db_transaction.atomic():
+            fixture = seed_dataset(n, f"budget{n}@example.com", spread=spread)
+            counts = {key: self.count_queries(fixture, *key) for key in self.endpoints}
+            db_transaction.set_rollback(True)
+        return counts
+
+def budget_table(results):
+    lines = ["| rota | método | " + " | ".join(f"N={n}" for n in DATASET_SIZES) + " | orçamento |", "|---|---|" + "---|" * (len(DATASET_SIZES) + 1)]
+    for route, method in sorted(ENDPOINTS):
+        counts = " | ".join(str(results[n][(route, method)]) for n in DATASET_SIZES)
+        lines.append(f"| {route} | {method.upper()} | {counts} | {QUERY_BUDGETS.get((route, method), '-')} |")
+    return "\n".join(lines)
+
+# jobs rodam na própria thread, dentro do savepoint medido
+@override_settings(FINANCE_JOBS_EAGER=True)
+@patch("finance.services.plans.get_groq_model", return_value="budget-model")
+@patch("finance.services.plans.get_groq_client", side_effect=_fake_groq)
+@patch("accounts.views.requests.get", side_effect=_fake_google)
+@patch("accounts.views.requests.post", side_effect=_fake_google)
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    def test_every_route_has_a_budget(self, *mocks):
+        routes = set(_url_routes(finance.urls.urlpatterns)) | set(_url_routes(accounts.urls.urlpatterns))
+        self.assertEqual(routes - set(ENDPOINTS), set(), "rotas sem medição de consultas")
+        self.assertEqual(set(ENDPOINTS) - set(QUERY_BUDGETS), set(), "rotas sem orçamento")
+
+    def test_query_counts_do_not_grow_with_data_and_stay_within_budget(self, *mocks):
+        results = {n: self.measure(n) for n in DATASET_SIZES}
+        table = budget_table(results)
+        # QUERY_BUDGET_REPORT=<arquivo> publica a tabela medida (ex.: artefato do CI)
+        report = os.environ.get("QUERY_BUDGET_REPORT")
+        if report:
+            with open(report, "w", encoding="utf-8") as out:
+                out.write(table + "\n")
+
+        small, large = results[DATASET_SIZES[0]], results[DATASET_SIZES[-1]]
+        grew = {key: (small[key], large[key]) for key in ENDPOINTS if large[key] > small[key]}
+        self.assertEqual(grew, {}, f"consultas crescem com N:\n{table}")
+        over = {key: large[key] for key in ENDPOINTS if large[key] > QUERY_BUDGETS.get(key, 0)}
+        self.assertEqual(over, {}, f"orçamento de consultas estourado:\n{table}")
+
+    def test_query_counts_do_not_grow_with_rollup_keys(self, *mocks):
+        # lotes de escrita em 2 ou PROBE_ROWS chaves de rollup/carteiras/categorias;
+        # a linha 0 fica sozinha nos dois casos, então os passos condicionais coincidem
+        narrow, wide = self.measure(DATASET_SIZES[0], spread=2), self.measure(DATASET_SIZES[0])
+        grew = {key: (narrow[key], wide[key]) for key in ENDPOINTS if wide[key] != narrow[key]}
+        self.assertEqual(grew, {}, "consultas variam com o número de chaves tocadas pelo lote")
@@ -0,0 +1,146 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from finance.models.wallet import Wallet
+from finance.models.category import Category
+from finance.models.transaction import Transaction
+
+User = get_user_model()
+
+ROWS_PER_USER = 3000
+
+# leituras do caminho quente; cada uma deve usar índice em finance_transaction
+HOT_PATHS = [
+    ("/api/finance/transactions/", {}),
+    ("/api/finance/transactions/", {"wallet_id": "{wallet}"}),
+    ("/api/finance/transactions/", {"type": "expense"}),
+    ("/api/finance/transactions/", {"date_start": "{start}", "date_end": "{end}"}),
+    ("/api/finance/transactions/", {"ordering": "-amount", "wallet_id": "{wallet}"}),
+    ("/api/finance/transactions/", {"pagination": "cursor"}),
+    ("/api/finance/transactions/recent/", {}),
+    ("/api/finance/transactions/recent/", {"wallet_id": "{wallet}"}),
+    ("/api/finance/transactions/balance-series/", {"granularity": "day", "date_start": "{start}"}),
+    ("/api/finance/transactions/balance-series/", {"granularity": "week", "per_wallet": "1"}),
+    ("/api/finance/transactions/dashboard/", {}),
+]
+
+# índice que cada leitura principal deve usar; os antigos (user, date), (user, type, date)
+# e (wallet, date) saíram justamente para que estes não percam para índices completos
+EXPECTED_INDEXES = [
+    ("/api/finance/transactions/", {}, "finance_transaction", "tx_active_user_date"),
+    ("/api/finance/transactions/", {"wallet_id": "{wallet}"}, "finance_transaction", "tx_active_wallet_date"),
+    ("/api/finance/transactions/", {"date_start": "{start}", "date_end": "{end}"}, "finance_transaction", "tx_active_user_date"),
+    ("/api/finance/transactions/", {"pagination": "cursor"}, "finance_transaction", "tx_active_user_date"),
+    ("/api/finance/transactions/recent/", {}, "finance_transaction", "tx_active_user_date"),
+    ("/api/finance/transactions/recent/", {"wallet_id": "{wallet}"}, "finance_transaction", "tx_active_wallet_date"),
+    # stats e gastos por categoria leem só os rollups mensais: stats soma todos os
+    # meses do usuário, gastos por categoria filtra o mês em (user, month)
+    ("/api/finance/transactions/stats/", {}, "finance_monthlyrollup", "finance_monthlyrollup_user_id_6d5078f9"),
+    ("/api/finance/transactions/expenses-by-category/", {}, "finance_monthlyrollup", "finance_mon_user_id_dff36c_idx"),
+]
+
+SEARCH_TERM = "farmacia"
+
+class ActiveTransactionQueryPlanTests(TestCase):
+    """
+    EXPLAIN de cada consulta das leituras principais com seq scan desligado:
+    se nenhum índice servir a consulta o Postgres volta ao Seq Scan e o teste falha.
+    Como qualquer índice passaria nessa checagem, EXPECTED_INDEXES fixa qual deles
+    cada leitura principal deve usar.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [
+            User.objects.create_user(email=f"plan{i}@example.com", password="123", name=f"Plan {i}")
+            for i in range(3)
+        ]
+        cls.user = cls.users[0]
+        today = date.today()
+        rows = []
+        for user in cls.users:
+            wallets = [Wallet.objects.create(user=user, name=f"W{i}") for i in range(3)]
+            categories = [Category.objects.create(user=user, name=f"C{i}") for i in range(5)]
+            for i in range(ROWS_PER_USER):
+                rows.append(Transaction(
+                    user=user,
+                    wallet=wallets[i % 3],
+                    category=categories[i % 5],
+                    type=Transaction.Type.INCOME if i % 4 == 0 else Transaction.Type.EXPENSE,
+                    amount=Decimal(i % 500 + 1),
+                    date=today - timedelta(days=i % 720),
+                    is_archived=i % 10 == 0,
+                    description="Farmácia São João" if i % 300 == 1 else f"Compra {i}",
+                ))
+        Transaction.objects.bulk_create(rows, batch_size=2000)
+        cls.wallet = Wallet.objects.filter(user=cls.user).order_by("id").first()
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE finance_transaction")
+            cursor.execute("ANALYZE finance_monthlyrollup")
+            cursor.execute("SELECT 1 FROM pg_indexes WHERE indexname = 'finance_tx_desc_trgm_idx'")
+            cls.has_trigram_index = cursor.fetchone() is not None
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _params(self, params):
+        today = date.today()
+        values = {
+            "wallet": self.wallet.id,
+            "start": (today - timedelta(days=90)).isoformat(),
+            "end": today.isoformat(),
+        }
+        return {name: value.format(**values) for name, value in params.items()}
+
+    def _plans(self, url, params, table="finance_transaction"):
+        cache.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, self._params(params))
+        self.assertEqual(response.status_code, 200, (url, params))
+
+        plans = []
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            for query in ctx.captured_queries:
+                sql = query["sql"]
+                if table not in sql or not sql.lstrip().upper().startswith(("SELECT", "WITH")):
+                    continue
+                cursor.execute("EXPLAIN " + sql)
+                plans.append((sql, "\n".join(row[0] for row in cursor.fetchall())))
+            cursor.execute("RESET enable_seqscan")
+        return plans
+
+    def test_hot_paths_never_seq_scan_transactions(self):
+        for url, params in HOT_PATHS:
+            with self.subTest(url=url, params=params):
+                plans = self._plans(url, params)
+                self.assertTrue(plans, "nenhuma consulta em finance_transaction capturada")
+                for sql, plan in plans:
+                    self.assertNotIn("Seq Scan on finance_transaction", plan, f"{sql}\n{plan}")
+
+    def test_hot_paths_use_expected_index(self):
+        for url, params, table, index in EXPECTED_INDEXES:
+            with self.subTest(url=url, params=params):
+                plans = self._plans(url, params, table)
+                self.assertTrue(plans, f"nenhuma consulta em {table} capturada")
+                self.assertTrue(any(index in plan for _, plan in plans), plans)
+
+    def test_rollup_reads_skip_transactions(self):
+        for url in ("/api/finance/transactions/stats/", "/api/finance/transactions/expenses-by-category/"):
+            with self.subTest(url=url):
+                self.assertEqual(self._plans(url, {}), [])
+
+    def test_search_uses_trigram_index(self):
+        if not self.has_trigram_index:
+            self.skipTest("pg_trgm indisponível: a busca roda sem índice")
+        plans = self._plans("/api/finance/transactions/", {"q": SEARCH_TERM})
+        self.assertTrue(plans)
+        for sql, plan in plans:
+            self.assertIn("finance_tx_desc_trgm_idx", plan, f"{sql}\n{plan}")
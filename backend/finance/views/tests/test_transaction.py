@@ -1,12 +1,22 @@
+import base64
+import csv
+import gzip
+import io
+import json
 from datetime import date, timedelta
 from decimal import Decimal
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
 from rest_framework import status
 from rest_framework.test import APIRequestFactory, force_authenticate
 from finance.models.wallet import Wallet
 from finance.models.category import Category
 from finance.models.transaction import Transaction
+from finance.models.rollup import MonthlyRollup
+from finance.views.cache import ANALYTICS_CACHE_HITS, ANALYTICS_CACHE_MISSES
 from finance.views.transaction import TransactionViewSet
 
 User = get_user_model()
@@ -23,7 +33,7 @@ class TransactionViewSetTests(TestCase):
 
         self.cat_food = Category.objects.create(user=self.user, name="Food")
         self.cat_salary = Category.objects.create(user=self.user, name="Salary")
-        self.cat_transfer = Category.objects.create(user=None, name="Transferência", is_system=True)
+        self.cat_transfer = Category.get_transfer_category()
 
         today = date.today()
         yesterday = today - timedelta(days=1)
@@ -71,6 +81,7 @@ class TransactionViewSetTests(TestCase):
             amount=Decimal("20.00"),
             date=today,
             description="transfer out",
+            is_transfer=True,
         )
 
     def _view(self, action_map):
@@ -329,7 +340,14 @@ class TransactionViewSetTests(TestCase):
         created = resp.data["created"]
         self.assertEqual(len(created), 2)
         ids = [row["id"] for row in created]
-        self.assertEqual(Transaction.objects.filter(id__in=ids).count(), 2)
+        legs = Transaction.objects.filter(id__in=ids)
+        self.assertEqual(legs.count(), 2)
+        self.assertTrue(all(leg.is_transfer for leg in legs))
+        self.assertEqual(len({leg.transfer_group for leg in legs}), 1)
+        self.assertIsNotNone(legs[0].transfer_group)
+        # saldo aninhado já reflete a transferência, sem recarregar a carteira
+        self.assertEqual(Decimal(created[0]["wallet_detail"]["current_balance"]), Decimal("0.00"))
+        self.assertEqual(Decimal(created[1]["wallet_detail"]["current_balance"]), Decimal("50.00"))
 
     def test_get_queryset_date_end_filter(self):
         view = self._view({"get": "list"})
@@ -397,7 +415,577 @@ class TransactionViewSetTests(TestCase):
         resp = view(req)
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
 
+    def test_analytics_read_rollups_excluding_transfers_and_archived(self):
+        today = date.today()
+        params = {"year": str(today.year), "month": str(today.month)}
+        Transaction.objects.create(
+            user=self.user, wallet=self.wallet1, type=Transaction.Type.EXPENSE,
+            category=self.cat_food, amount=Decimal("7.00"), date=today,
+        )
 
+        resp = self._view({"get": "expenses_by_category"})(self._auth_get("/transactions/expenses-by-category/", params))
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        names = {row["name"]: row["value"] for row in resp.data["items"]}
+        self.assertNotIn("Transferência", names)
+        expected_food = Decimal("7.00") + (Decimal("30.00") if self.tx_expense.date.month == today.month else Decimal("0.00"))
+        self.assertEqual(Decimal(names["Food"]), expected_food)
 
+        resp = self._view({"get": "stats"})(self._auth_get("/transactions/stats/"))
+        self.assertEqual(Decimal(resp.data["income"]["current"]), Decimal("100.00"))
+        self.assertEqual(Decimal(resp.data["balance"]), Decimal("63.00"))
 
+    def test_deleted_or_recategorized_rows_leave_no_empty_category(self):
+        today = date.today()
+        params = {"year": str(today.year), "month": str(today.month)}
+        gym = Category.objects.create(user=self.user, name="Gym")
+        rent = Category.objects.create(user=self.user, name="Rent")
+        only_gym = Transaction.objects.create(
+            user=self.user, wallet=self.wallet1, type=Transaction.Type.EXPENSE,
+            category=gym, amount=Decimal("50.00"), date=today,
+        )
+        only_rent = Transaction.objects.create(
+            user=self.user, wallet=self.wallet1, type=Transaction.Type.EXPENSE,
+            category=rent, amount=Decimal("80.00"), date=today,
+        )
+
+        only_gym.delete()
+        only_rent.category = self.cat_food
+        only_rent.save()
+
+        resp = self._view({"get": "expenses_by_category"})(self._auth_get("/transactions/expenses-by-category/", params))
+        names = {row["name"] for row in resp.data["items"]}
+        self.assertNotIn("Gym", names)
+        self.assertNotIn("Rent", names)
+
+    def test_deleting_category_then_transaction_clears_expenses(self):
+        stats_view = self._view({"get": "stats"})
+        by_category = self._view({"get": "expenses_by_category"})
+        before = stats_view(self._auth_get("/transactions/stats/")).data["expenses"]["current"]
+        gym = Category.objects.create(user=self.user, name="Gym")
+        tx = Transaction.objects.create(
+            user=self.user, wallet=self.wallet1, type=Transaction.Type.EXPENSE,
+            category=gym, amount=Decimal("10.00"), date=date.today(),
+        )
+
+        gym.delete()
+        Transaction.objects.get(pk=tx.pk).delete()
+
+        self.assertEqual(stats_view(self._auth_get("/transactions/stats/")).data["expenses"]["current"], before)
+        items = by_category(self._auth_get("/transactions/expenses-by-category/")).data["items"]
+        self.assertNotIn("Sem categoria", {row["name"] for row in items})
+
+    def test_dashboard_returns_all_sections(self):
+        view = self._view({"get": "dashboard"})
+        resp = view(self._auth_get("/transactions/dashboard/", {"months": "3", "limit": "5"}))
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        for key in ("stats", "monthly", "expenses_by_category", "income_by_source", "balance_series", "recent", "total_balance"):
+            self.assertIn(key, resp.data)
 
+        stats_resp = self._view({"get": "stats"})(self._auth_get("/transactions/stats/"))
+        self.assertEqual(resp.data["stats"], stats_resp.data)
+
+    def test_dashboard_sections_filter(self):
+        view = self._view({"get": "dashboard"})
+        resp = view(self._auth_get("/transactions/dashboard/", {"sections": "stats,balance-series"}))
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(resp.data), {"stats", "balance_series"})
+
+    def test_dashboard_invalid_section(self):
+        view = self._view({"get": "dashboard"})
+        resp = view(self._auth_get("/transactions/dashboard/", {"sections": "stats,nope"}))
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def _walk_cursor_pages(self, params):
+        view = self._view({"get": "list"})
+        seen = []
+        resp = view(self._auth_get("/transactions/", params))
+        while True:
+            self.assertEqual(resp.status_code, status.HTTP_200_OK)
+            seen.extend(row["id"] for row in resp.data["results"])
+            if not resp.data["next"]:
+                return seen, resp
+            query = resp.data["next"].split("?", 1)[1]
+            resp = view(self._auth_get(f"/transactions/?{query}"))
+
+    def test_cursor_pagination_walks_all_rows_in_order(self):
+        base = date.today() - timedelta(days=10)
+        for i in range(7):
+            Transaction.objects.create(
+                user=self.user, wallet=self.wallet1, type=Transaction.Type.EXPENSE,
+                amount=Decimal("1.00") + i, date=base + timedelta(days=i % 3),
+            )
+        expected = list(
+            Transaction.objects.filter(user=self.user, is_archived=False)
+            .order_by("-date", "-id").values_list("id", flat=True)
+        )
+        seen, last = self._walk_cursor_pages({"pagination": "cursor", "page_size": "3"})
+        self.assertEqual(seen, expected)
+        self.assertNotIn("count", last.data)
+
+        seen_amount, _ = self._walk_cursor_pages({"pagination": "cursor", "page_size": "2", "ordering": "amount"})
+        self.assertEqual(
+            seen_amount,
+            list(Transaction.objects.filter(user=self.user, is_archived=False).order_by("amount", "-id").values_list("id", flat=True)),
+        )
+
+    def test_cursor_pagination_previous_link_and_count(self):
+        view = self._view({"get": "list"})
+        first = view(self._auth_get("/transactions/", {"pagination": "cursor", "page_size": "1", "count": "exact"}))
+        self.assertEqual(first.data["count"], 3)
+        self.assertIsNone(first.data["previous"])
+
+        second = view(self._auth_get(f"/transactions/?{first.data['next'].split('?', 1)[1]}"))
+        back = view(self._auth_get(f"/transactions/?{second.data['previous'].split('?', 1)[1]}"))
+        self.assertEqual([r["id"] for r in back.data["results"]], [r["id"] for r in first.data["results"]])
+
+        estimate = view(self._auth_get("/transactions/", {"pagination": "cursor", "count": "estimate"}))
+        self.assertIsInstance(estimate.data["count"], int)
+
+    def test_cursor_pagination_invalid_cursor(self):
+        view = self._view({"get": "list"})
+        resp = view(self._auth_get("/transactions/", {"cursor": "not-a-cursor"}))
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_pagination_tampered_position_values(self):
+        view = self._view({"get": "list"})
+        for position in (["x", 1], ["2024-01-01", "abc"], [None, 1], [{"a": 1}, 1]):
+            raw = json.dumps({"p": position, "r": 0}).encode("utf-8")
+            cursor = base64.urlsafe_b64encode(raw).decode("ascii")
+            resp = view(self._auth_get("/transactions/", {"cursor": cursor}))
+            self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND, position)
+        raw = json.dumps({"p": ["x", 1], "r": 0}).encode("utf-8")
+        cursor = base64.urlsafe_b64encode(raw).decode("ascii")
+        resp = view(self._auth_get("/transactions/", {"cursor": cursor, "ordering": "amount"}))
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_search_is_accent_insensitive_and_ranked(self):
+        exact = Transaction.objects.create(
+            user=self.user, wallet=self.wallet1, type=Transaction.Type.EXPENSE,
+            amount=Decimal("9.00"), description="Fatura cartão de crédito",
+        )
+        partial = Transaction.objects.create(
+            user=self.user, wallet=self.wallet1, type=Transaction.Type.EXPENSE,
+            amount=Decimal("9.00"), description="Anuidade do cartao de credito internacional premium",
+        )
+        view = self._view({"get": "list"})
+        resp = view(self._auth_get("/transactions/", {"q": "CARTAO crédito"}))
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        ids = [row["id"] for row in resp.data["results"]]
+        self.assertEqual(set(ids), {exact.id, partial.id})
+
+        resp = view(self._auth_get("/transactions/", {"q": "cartão", "ordering": "amount"}))
+        self.assertEqual(len(resp.data["results"]), 2)
+
+    def _cache_counts(self, endpoint):
+        return (
+            ANALYTICS_CACHE_HITS.labels(endpoint=endpoint)._value.get(),
+            ANALYTICS_CACHE_MISSES.labels(endpoint=endpoint)._value.get(),
+        )
+
+    def test_analytics_cache_hits_until_user_data_changes(self):
+        cache.clear()
+        view = self._view({"get": "stats"})
+        hits, misses = self._cache_counts("stats")
+
+        first = view(self._auth_get("/transactions/stats/"))
+        second = view(self._auth_get("/transactions/stats/"))
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(self._cache_counts("stats"), (hits + 1, misses + 1))
+
+        # outros parâmetros ficam em outra entrada
+        view(self._auth_get("/transactions/stats/", {"wallet_id": self.wallet1.id}))
+        self.assertEqual(self._cache_counts("stats"), (hits + 1, misses + 2))
+
+        Transaction.objects.create(
+            user=self.user, wallet=self.wallet1, type=Transaction.Type.INCOME,
+            category=self.cat_salary, amount=Decimal("50.00"), date=date.today(),
+        )
+        third = view(self._auth_get("/transactions/stats/"))
+        self.assertEqual(Decimal(third.data["income"]["current"]), Decimal("150.00"))
+        self.assertEqual(self._cache_counts("stats"), (hits + 1, misses + 3))
+
+    def test_analytics_cache_invalidated_by_wallet_and_category_writes(self):
+        cache.clear()
+        today = date.today()
+        params = {"year": str(today.year), "month": str(today.month)}
+        view = self._view({"get": "income_by_source"})
+        resp = view(self._auth_get("/transactions/income-by-source/", params))
+        self.assertEqual(resp.data["items"][0]["name"], "Salary")
+
+        self.cat_salary.name = "Salário"
+        self.cat_salary.save()
+        resp = view(self._auth_get("/transactions/income-by-source/", params))
+        self.assertEqual(resp.data["items"][0]["name"], "Salário")
+
+        view = self._view({"get": "stats"})
+        before = view(self._auth_get("/transactions/stats/"))
+        self.wallet1.initial_balance = Decimal("1000.00")
+        self.wallet1.save()
+        after = view(self._auth_get("/transactions/stats/"))
+        self.assertEqual(Decimal(after.data["net_worth"]) - Decimal(before.data["net_worth"]), Decimal("1000.00"))
+
+    def test_analytics_cache_is_per_user(self):
+        cache.clear()
+        view = self._view({"get": "stats"})
+        mine = view(self._auth_get("/transactions/stats/"))
+        req = self.factory.get("/transactions/stats/")
+        force_authenticate(req, user=self.other)
+        theirs = view(req)
+        self.assertNotEqual(mine.data["income"], theirs.data["income"])
+        self.assertEqual(Decimal(theirs.data["income"]["current"]), Decimal("0.00"))
+
+    def test_etag_not_modified_until_data_changes(self):
+        view = self._view({"get": "list"})
+        first = view(self._auth_get("/transactions/"))
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        etag = first["ETag"]
+
+        req = self.factory.get("/transactions/", HTTP_IF_NONE_MATCH=etag)
+        force_authenticate(req, user=self.user)
+        self.assertEqual(view(req).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # outra URL, outro ETag
+        req = self.factory.get("/transactions/", {"type": "income"}, HTTP_IF_NONE_MATCH=etag)
+        force_authenticate(req, user=self.user)
+        self.assertEqual(view(req).status_code, status.HTTP_200_OK)
+
+        self.tx_income.description = "salary updated"
+        self.tx_income.save()
+        req = self.factory.get("/transactions/", HTTP_IF_NONE_MATCH=etag)
+        force_authenticate(req, user=self.user)
+        resp = view(req)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(resp["ETag"], etag)
+
+    def test_etag_on_analytics_short_circuits_before_aggregation(self):
+        view = self._view({"get": "dashboard"})
+        etag = view(self._auth_get("/transactions/dashboard/"))["ETag"]
+        req = self.factory.get("/transactions/dashboard/", HTTP_IF_NONE_MATCH=f'W/{etag}')
+        force_authenticate(req, user=self.user)
+        with self.assertNumQueries(1):
+            resp = view(req)
+        self.assertEqual(resp.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(resp["ETag"], etag)
+
+    def test_bulk_create_inserts_rows_and_updates_ledger(self):
+        def rows(n):
+            # cada linha cai numa chave de rollup diferente (mês x categoria x carteira)
+            return [
+                {
+                    "type": "expense" if i % 3 else "income",
+                    "wallet": (self.wallet1, self.wallet2)[i % 2].id,
+                    "category": (self.cat_food, self.cat_salary)[i // 2 % 2].id,
+                    "amount": "1.50",
+                    "date": date(2019 + i // 12, i % 12 + 1, 10).isoformat(),
+                    "description": f"row {i}",
+                }
+                for i in range(n)
+            ]
+
+        view = self._view({"post": "bulk_create"})
+        view(self._auth_post("/transactions/bulk/", {"transactions": rows(3)}))
+        with CaptureQueriesContext(connection) as small:
+            view(self._auth_post("/transactions/bulk/", {"transactions": rows(3)}))
+        Transaction.objects.filter(description__startswith="row ").delete()
+        balances = {w.pk: Wallet.objects.get(pk=w.pk).current_balance for w in (self.wallet1, self.wallet2)}
+
+        # o número de consultas não depende da quantidade de linhas nem de chaves do rollup
+        with self.assertNumQueries(len(small.captured_queries)):
+            resp = view(self._auth_post("/transactions/bulk/", {"transactions": rows(48)}))
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(resp.data["created"], 48)
+        self.assertEqual(Transaction.objects.filter(id__in=resp.data["ids"], user=self.user).count(), 48)
+        for wallet in (self.wallet1, self.wallet2):
+            signed = sum(
+                Decimal(r["amount"]) * (1 if r["type"] == "income" else -1)
+                for r in rows(48) if r["wallet"] == wallet.pk
+            )
+            self.assertEqual(Wallet.objects.get(pk=wallet.pk).current_balance, balances[wallet.pk] + signed)
+        self.assertEqual(
+            MonthlyRollup.objects.filter(user=self.user, month__lt=date(2023, 1, 1), count__gt=0).count(),
+            48,
+        )
+
+    def test_bulk_create_reports_errors_per_row_and_saves_nothing(self):
+        rows = [
+            {"type": "expense", "wallet": self.wallet1.id, "amount": "5.00"},
+            {"type": "expense", "wallet": self.wallet_other.id, "amount": "5.00"},
+            {"type": "nope", "wallet": self.wallet1.id, "amount": "-1"},
+            {"type": "income", "wallet": self.wallet1.id, "category": 999999, "amount": "5.00"},
+        ]
+        before = Transaction.objects.count()
+        resp = self._view({"post": "bulk_create"})(self._auth_post("/transactions/bulk/", rows))
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        by_index = {e["index"]: e["errors"] for e in resp.data["errors"]}
+        self.assertEqual(set(by_index), {1, 2, 3})
+        self.assertIn("wallet", by_index[1])
+        self.assertIn("type", by_index[2])
+        self.assertIn("amount", by_index[2])
+        self.assertIn("category", by_index[3])
+        self.assertEqual(Transaction.objects.count(), before)
+
+    def test_bulk_create_requires_rows(self):
+        resp = self._view({"post": "bulk_create"})(self._auth_post("/transactions/bulk/", {"transactions": []}))
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def _export(self, params):
+        resp = self._view({"get": "export"})(self._auth_get("/transactions/export/", params))
+        body = b"".join(resp.streaming_content) if resp.status_code == status.HTTP_200_OK else None
+        return resp, body
+
+    def test_export_csv_reuses_list_filters(self):
+        resp, body = self._export({"type": "expense"})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertIn("attachment", resp["Content-Disposition"])
+        rows = list(csv.DictReader(io.StringIO(body.decode("utf-8"))))
+        self.assertEqual({int(r["id"]) for r in rows}, {self.tx_expense.id, self.tx_transfer.id})
+        market = next(r for r in rows if r["description"] == "market")
+        self.assertEqual((market["amount"], market["wallet"], market["category"]), ("30.00", "W1", "Food"))
+
+    def test_export_jsonl_gzip(self):
+        resp, body = self._export({"output": "jsonl", "gzip": "1"})
+        self.assertEqual(resp["Content-Type"], "application/gzip")
+        lines = gzip.decompress(body).decode("utf-8").splitlines()
+        ids = [json.loads(line)["id"] for line in lines]
+        self.assertEqual(ids, [r["id"] for r in self._view({"get": "list"})(self._auth_get("/transactions/")).data["results"]])
+
+    def test_export_invalid_format(self):
+        resp, _ = self._export({"output": "xml"})
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def _auth_patch(self, url, data=None, params=None):
+        if params:
+            url = f"{url}?{'&'.join(f'{k}={v}' for k, v in params.items())}"
+        req = self.factory.patch(url, data=data or {}, format="json")
+        force_authenticate(req, user=self.user)
+        return req
+
+    def test_bulk_update_by_ids_moves_wallet_and_category(self):
+        view = self._view({"patch": "bulk_update"})
+        ids = [self.tx_income.id, self.tx_expense.id, self.tx_other_user.id]
+        resp = view(self._auth_patch("/transactions/bulk/", {"ids": ids, "wallet": self.wallet2.id, "category": None}))
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data["updated"], 2)
+
+        self.tx_income.refresh_from_db()
+        self.tx_other_user.refresh_from_db()
+        self.assertEqual((self.tx_income.wallet_id, self.tx_income.category_id), (self.wallet2.id, None))
+        self.assertEqual(self.tx_other_user.wallet_id, self.wallet_other.id)
+
+        self.wallet1.refresh_from_db()
+        self.wallet2.refresh_from_db()
+        self.assertEqual(self.wallet1.current_balance, Decimal("-20.00"))
+        self.assertEqual(self.wallet2.current_balance, Decimal("70.00"))
+
+    def test_bulk_update_by_filters_archives(self):
+        view = self._view({"patch": "bulk_update"})
+        resp = view(self._auth_patch("/transactions/bulk/", {"is_archived": True}, {"type": "expense"}))
+        self.assertEqual(resp.data["updated"], 2)
+        self.assertTrue(Transaction.objects.get(pk=self.tx_expense.pk).is_archived)
+        self.assertFalse(Transaction.objects.get(pk=self.tx_income.pk).is_archived)
+        self.assertFalse(Transaction.objects.get(pk=self.tx_other_user.pk).is_archived)
+
+    def test_bulk_update_rejects_foreign_targets_and_missing_selection(self):
+        view = self._view({"patch": "bulk_update"})
+        resp = view(self._auth_patch("/transactions/bulk/", {"ids": [self.tx_income.id], "wallet": self.wallet_other.id}))
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        resp = view(self._auth_patch("/transactions/bulk/", {"is_archived": True}))
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        resp = view(self._auth_patch("/transactions/bulk/", {"ids": [self.tx_income.id]}))
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_transfer_flag_follows_category_on_bulk_create(self):
+        today = date.today()
+        rows = [
+            {"type": "expense", "wallet": self.wallet1.id, "category": self.cat_transfer.id, "amount": "10.00"},
+            {"type": "expense", "wallet": self.wallet1.id, "category": self.cat_food.id, "amount": "3.00"},
+        ]
+        resp = self._view({"post": "bulk_create"})(self._auth_post("/transactions/bulk/", {"transactions": rows}))
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        flags = dict(Transaction.objects.filter(id__in=resp.data["ids"]).values_list("category_id", "is_transfer"))
+        self.assertEqual(flags, {self.cat_transfer.id: True, self.cat_food.id: False})
+
+        params = {"year": str(today.year), "month": str(today.month)}
+        resp = self._view({"get": "expenses_by_category"})(self._auth_get("/transactions/expenses-by-category/", params))
+        self.assertNotIn("Transferência", {row["name"] for row in resp.data["items"]})
+
+    def test_bulk_update_out_of_transfer_category_clears_transfer(self):
+        resp = self._view({"post": "transfer"})(self._auth_post(
+            "/transactions/transfer/",
+            {"from_wallet_id": self.wallet1.id, "to_wallet_id": self.wallet2.id, "amount": "40.00"},
+        ))
+        leg_ids = [leg["id"] for leg in resp.data["created"]]
+
+        resp = self._view({"patch": "bulk_update"})(
+            self._auth_patch("/transactions/bulk/", {"ids": leg_ids, "category": self.cat_food.id})
+        )
+        self.assertEqual(resp.data["updated"], 2)
+        legs = Transaction.objects.filter(id__in=leg_ids)
+        self.assertTrue(all(not leg.is_transfer and leg.transfer_group is None for leg in legs))
+
+        today = date.today()
+        params = {"year": str(today.year), "month": str(today.month)}
+        resp = self._view({"get": "expenses_by_category"})(self._auth_get("/transactions/expenses-by-category/", params))
+        names = {row["name"]: Decimal(row["value"]) for row in resp.data["items"]}
+        expected = Decimal("40.00") + (Decimal("30.00") if self.tx_expense.date.month == today.month else Decimal("0.00"))
+        self.assertEqual(names["Food"], expected)
+
+        # e voltar para a categoria de transferência marca de novo
+        Transaction.objects.filter(id__in=leg_ids).update(category=self.cat_transfer)
+        self.assertTrue(all(leg.is_transfer for leg in Transaction.objects.filter(id__in=leg_ids)))
+
+    def test_transfer_batch_creates_all_legs_in_one_insert(self):
+        wallet3 = Wallet.objects.create(user=self.user, name="W4")
+        transfers = [
+            {"from_wallet_id": self.wallet1.id, "to_wallet_id": self.wallet2.id, "amount": "10.00"},
+            {"from_wallet_id": self.wallet2.id, "to_wallet_id": wallet3.id, "amount": "4.00", "date": "2025-02-01"},
+            {"from_wallet_id": wallet3.id, "to_wallet_id": self.wallet1.id, "amount": "1.00"},
+        ]
+        view = self._view({"post": "transfer_batch"})
+        with CaptureQueriesContext(connection) as ctx:
+            resp = view(self._auth_post("/transactions/transfer/batch/", {"transfers": transfers}))
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(resp.data["created"]), 6)
+        inserts = [q for q in ctx.captured_queries if q["sql"].startswith('INSERT INTO "finance_transaction"')]
+        self.assertEqual(len(inserts), 1)
+
+        legs = Transaction.objects.filter(id__in=[r["id"] for r in resp.data["created"]])
+        self.assertEqual(len({leg.transfer_group for leg in legs}), 3)
+        self.assertTrue(all(leg.is_transfer and leg.category_id == self.cat_transfer.id for leg in legs))
+        self.wallet1.refresh_from_db()
+        self.assertEqual(self.wallet1.current_balance, Decimal("41.00"))
+
+    def test_transfer_batch_reports_errors_and_saves_nothing(self):
+        transfers = [
+            {"from_wallet_id": self.wallet1.id, "to_wallet_id": self.wallet2.id, "amount": "10.00"},
+            {"from_wallet_id": self.wallet1.id, "to_wallet_id": self.wallet_other.id, "amount": "10.00"},
+            {"from_wallet_id": self.wallet1.id, "to_wallet_id": self.wallet1.id, "amount": "10.00"},
+            {"from_wallet_id": self.wallet1.id, "to_wallet_id": self.wallet2.id, "amount": "abc"},
+        ]
+        before = Transaction.objects.count()
+        resp = self._view({"post": "transfer_batch"})(self._auth_post("/transactions/transfer/batch/", {"transfers": transfers}))
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([e["index"] for e in resp.data["errors"]], [1, 2, 3])
+        self.assertEqual(Transaction.objects.count(), before)
+
+    def test_list_and_recent_query_count_does_not_grow_with_rows(self):
+        list_view = self._view({"get": "list"})
+        recent_view = self._view({"get": "recent"})
+        with CaptureQueriesContext(connection) as few_list:
+            list_view(self._auth_get("/transactions/", {"page_size": "50"}))
+        with CaptureQueriesContext(connection) as few_recent:
+            recent_view(self._auth_get("/transactions/recent/", {"limit": "50"}))
+
+        wallets = [Wallet.objects.create(user=self.user, name=f"Extra {i}") for i in range(4)]
+        categories = [Category.objects.create(user=self.user, name=f"Cat {i}") for i in range(4)]
+        Transaction.objects.bulk_create([
+            Transaction(
+                user=self.user, wallet=wallets[i % 4], category=categories[i % 4],
+                type=Transaction.Type.EXPENSE, amount=Decimal("1.00"),
+            )
+            for i in range(30)
+        ])
+
+        with self.assertNumQueries(len(few_list.captured_queries)):
+            resp = list_view(self._auth_get("/transactions/", {"page_size": "50"}))
+        self.assertEqual(len(resp.data["results"]), 33)
+        with self.assertNumQueries(len(few_recent.captured_queries)):
+            resp = recent_view(self._auth_get("/transactions/recent/", {"limit": "50"}))
+        row = resp.data[0]
+        self.assertEqual(set(row["wallet_detail"]), {"id", "name", "kind", "color", "current_balance"})
+
+
+    def test_list_fields_and_expand_trim_payload_and_sql(self):
+        view = self._view({"get": "list"})
+        with CaptureQueriesContext(connection) as ctx:
+            resp = view(self._auth_get("/transactions/", {"fields": "date,amount,type,bogus"}))
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        row = resp.data["results"][0]
+        self.assertEqual(set(row), {"id", "date", "amount", "type"})
+        sql = ctx.captured_queries[-1]["sql"]
+        self.assertNotIn("JOIN", sql)
+        self.assertNotIn("description", sql)
+
+        with CaptureQueriesContext(connection) as ctx:
+            resp = view(self._auth_get("/transactions/", {"fields": "id,amount", "expand": "category"}))
+        row = resp.data["results"][0]
+        self.assertEqual(set(row), {"id", "amount", "category_detail"})
+        self.assertIn(row["category_detail"]["name"], {"Salary", "Transferência"})
+        sql = ctx.captured_queries[-1]["sql"]
+        self.assertIn("finance_category", sql)
+        self.assertNotIn("finance_wallet", sql)
+
+    def test_list_expand_only_keeps_flat_fields_and_cursor_pagination(self):
+        view = self._view({"get": "list"})
+        resp = view(self._auth_get("/transactions/", {"expand": "wallet", "pagination": "cursor", "page_size": "1"}))
+        row = resp.data["results"][0]
+        self.assertIn("wallet_detail", row)
+        self.assertNotIn("category_detail", row)
+        self.assertIn("description", row)
+        self.assertEqual(row["wallet_detail"]["current_balance"], str(self.wallet1.current_balance))
+
+        resp = view(self._auth_get(resp.data["next"], {}))
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(resp.data["results"]), 1)
+
+    def test_list_without_params_keeps_full_representation(self):
+        resp = self._view({"get": "list"})(self._auth_get("/transactions/"))
+        row = resp.data["results"][0]
+        self.assertIn("wallet_detail", row)
+        self.assertIn("category_detail", row)
+        self.assertIn("created_at", row)
+
+    def test_balance_series_daily_range_fills_gaps_in_one_query(self):
+        today = date.today()
+        start = today - timedelta(days=3)
+        view = self._view({"get": "balance_series"})
+        with CaptureQueriesContext(connection) as ctx:
+            resp = view(self._auth_get("/transactions/balance-series/", {
+                "granularity": "day", "date_start": start.isoformat(), "date_end": today.isoformat(),
+            }))
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(len([q for q in ctx.captured_queries if "generate_series" in q["sql"]]), 1)
+        points = resp.data["points"]
+        self.assertEqual([p["date"] for p in points], [(start + timedelta(days=i)).isoformat() for i in range(4)])
+        # ontem: -30 (mercado); hoje: +100 (salário) -20 (transferência)
+        balances = [Decimal(p["balance"]) for p in points]
+        self.assertEqual(balances, [Decimal("0.00"), Decimal("0.00"), Decimal("-30.00"), Decimal("50.00")])
+
+    def test_balance_series_per_wallet_weekly_and_credit_opening(self):
+        card = Wallet.objects.create(user=self.user, name="Card", kind=Wallet.Kind.CREDIT, initial_balance=Decimal("15.00"))
+        today = date.today()
+        resp = self._view({"get": "balance_series"})(self._auth_get("/transactions/balance-series/", {
+            "granularity": "week", "per_wallet": "1",
+            "date_start": (today - timedelta(days=21)).isoformat(), "date_end": today.isoformat(),
+        }))
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        by_id = {w["id"]: w for w in resp.data["wallets"]}
+        self.assertEqual(set(by_id), {self.wallet1.id, self.wallet2.id, card.id})
+        self.assertEqual(Decimal(by_id[card.id]["points"][-1]["balance"]), Decimal("-15.00"))
+        self.assertEqual(Decimal(by_id[self.wallet1.id]["points"][-1]["balance"]), self.wallet1.current_balance)
+        self.assertEqual(len(by_id[card.id]["points"]), len(by_id[self.wallet1.id]["points"]))
+
+    def test_balance_series_legacy_and_history_skip_archived_wallets(self):
+        old = Wallet.objects.create(user=self.user, name="Antiga", initial_balance=Decimal("40.00"))
+        Transaction.objects.create(user=self.user, wallet=old, type=Transaction.Type.INCOME, amount=Decimal("500.00"))
+        old.is_archived = True
+        old.save()
+
+        view = self._view({"get": "balance_series"})
+        legacy = view(self._auth_get("/transactions/balance-series/", {"months": "1"})).data
+        history = view(self._auth_get("/transactions/balance-series/", {"granularity": "month"})).data
+
+        expected = self.wallet1.current_balance + self.wallet2.current_balance
+        self.assertEqual(Decimal(legacy["months"][-1]["balance"]), expected)
+        self.assertEqual(Decimal(history["points"][-1]["balance"]), expected)
+
+    def test_balance_series_rejects_invalid_params(self):
+        view = self._view({"get": "balance_series"})
+        for params in (
+            {"granularity": "year"},
+            {"date_start": "2024-13-01"},
+            {"date_start": "2024-02-01", "date_end": "2024-01-01"},
+            {"granularity": "day", "date_start": "1990-01-01"},
+        ):
+            resp = view(self._auth_get("/transactions/balance-series/", params))
+            self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST, params)
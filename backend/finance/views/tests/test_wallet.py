@@ -1,5 +1,7 @@
 from decimal import Decimal
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIRequestFactory, force_authenticate
 from rest_framework import status
@@ -106,3 +108,27 @@ class WalletViewSetTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         ids = [w["id"] for w in response.data["results"]]
         self.assertNotIn(self.w2.id, ids)
+
+    def test_total_balance_single_query_with_credit_flip(self):
+        Wallet.objects.create(user=self.user, name="Card", kind=Wallet.Kind.CREDIT, initial_balance=Decimal("40.00"))
+        view = WalletViewSet.as_view({"get": "total_balance"})
+
+        def fetch():
+            request = self.factory.get("/wallets/total-balance/")
+            force_authenticate(request, user=self.user)
+            return view(request)
+
+        with CaptureQueriesContext(connection) as few:
+            fetch()
+        for i in range(30):
+            Wallet.objects.create(user=self.user, name=f"Extra {i}")
+        wallet_queries = lambda ctx: [q for q in ctx.captured_queries if '"finance_wallet"' in q["sql"]]
+        with CaptureQueriesContext(connection) as many:
+            response = fetch()
+
+        self.assertEqual(len(wallet_queries(many)), 1)
+        self.assertEqual(len(many.captured_queries), len(few.captured_queries))
+        card = next(w for w in response.data["wallets"] if w["name"] == "Card")
+        self.assertEqual(card["current_balance"], "-40.00")
+        # 130 (A) - 10 (B) - 40 (cartão)
+        self.assertEqual(Decimal(response.data["total_balance"]), Decimal("80.00"))
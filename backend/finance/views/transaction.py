@@ -1,26 +1,75 @@
-from datetime import date
-from calendar import monthrange
-from decimal import Decimal
 from django.db import transaction as db_transaction
-from django.db.models import Q, Sum, Case, When, F, DecimalField
-from django.db.models.functions import TruncMonth
-from django.utils import timezone
+from django.db.models import Q
+from django.http import StreamingHttpResponse
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from finance.models import Category, Wallet, Transaction
 from finance.serializers import TransactionSerializer
+from finance.services.analytics import (
+    AnalyticsParamError,
+    AnalyticsScope,
+    stats_data,
+    monthly_data,
+    expenses_by_category_data,
+    income_by_source_data,
+    balance_series_data,
+    balance_history_data,
+)
+from finance.services.bulk import BULK_CREATE_MAX_ROWS, build_transactions, insert_transactions
+from finance.services.export import EXPORT_FORMATS, export_stream
+from finance.services.transfers import (
+    TRANSFER_BATCH_MAX,
+    TransferError,
+    active_wallets,
+    build_transfers,
+    missing_wallets,
+    parse_transfer,
+    transfer_legs,
+)
 from .category import IsOwner, DefaultPagination
-
-TRANSFER_Q = Q(category__is_system=True, category__name__iexact="Transferência")
-
-def exclude_transfers(qs):
-    return qs.exclude(TRANSFER_Q)
-
-class TransactionViewSet(viewsets.ModelViewSet):
+from .cache import ConditionalGetMixin, cached_analytics
+from .pagination import KeysetCursorPagination
+from .wallet import total_balance_data
+
+LIST_FILTER_PARAMS = ("date_start", "date_end", "type", "category_id", "wallet_id", "is_archived", "q")
+
+# colunas das relações usadas pelos serializers aninhados (current_balance inclusive)
+EXPAND_COLUMNS = {
+    "wallet_detail": ("wallet", ("name", "kind", "color", "initial_balance", "transactions_balance")),
+    "category_detail": ("category", ("name", "is_system", "is_archived")),
+}
+
+DASHBOARD_SECTIONS = (
+    "stats",
+    "monthly",
+    "expenses_by_category",
+    "income_by_source",
+    "balance_series",
+    "recent",
+    "total_balance",
+)
+
+class TransactionViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = TransactionSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwner]
     pagination_class = DefaultPagination
+    cursor_pagination_class = KeysetCursorPagination
+    etag_actions = (
+        "list", "retrieve", "stats", "monthly", "expenses_by_category",
+        "balance_series", "income_by_source", "recent", "dashboard",
+    )
+
+    @property
+    def paginator(self):
+        """?pagination=cursor (ou um ?cursor=) troca a paginação por página pelo keyset."""
+        if not hasattr(self, "_paginator"):
+            params = self.request.query_params
+            if params.get("pagination") == "cursor" or params.get("cursor"):
+                self._paginator = self.cursor_pagination_class()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
 
     def get_queryset(self):
         qs = Transaction.objects.filter(user=self.request.user)
@@ -47,21 +96,78 @@ class TransactionViewSet(viewsets.ModelViewSet):
         elif is_archived in ("false", "0", None):
             qs = qs.filter(is_archived=False)
 
-        if params.get("q"):
-            qs = qs.filter(description__icontains=params.get("q"))
+        search = params.get("q")
+        if search:
+            qs = qs.search(search)
 
-        ordering = params.get("ordering", "-date")
+        ordering = params.get("ordering") or ("relevance" if search else "-date")
         allowed = {"date", "-date", "amount", "-amount", "created_at", "-created_at"}
-        if ordering not in allowed:
-            ordering = "-date"
-        qs = qs.order_by(ordering, "-id")
+        if ordering == "relevance" and search:
+            qs = qs.order_by("-search_rank", "-date", "-id")
+        else:
+            if ordering not in allowed:
+                ordering = "-date"
+            qs = qs.order_by(ordering, "-id")
 
-        return qs
+        return self.select_fields(qs)
+
+    def select_fields(self, qs):
+        """
+        Leva ?fields=/?expand= para o SQL: só faz JOIN com as relações expandidas
+        e só carrega as colunas que serão serializadas (mais as da ordenação,
+        lidas pelo cursor da paginação).
+        """
+        selected = TransactionSerializer.selected_fields(self.request)
+        if selected is None:
+            return qs.select_related("wallet", "category")
+
+        concrete = {f.name for f in Transaction._meta.concrete_fields}
+        columns = {name for name in selected if name in concrete}
+        columns |= {o.lstrip("-") for o in qs.query.order_by if o.lstrip("-") in concrete}
+        related = []
+        for detail, (relation, fields) in EXPAND_COLUMNS.items():
+            if detail in selected:
+                related.append(relation)
+                columns.add(relation)
+                columns.update(f"{relation}__{name}" for name in fields)
+        qs = qs.select_related(None)
+        if related:
+            qs = qs.select_related(*related)
+        return qs.only(*columns)
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
-    @action(detail=False, methods=["delete"], url_path="bulk")
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk_create(self, request):
+        """
+        Cria várias transações de uma vez: {"transactions": [{...}, ...]} (ou a lista direto).
+        Tudo ou nada: se alguma linha for inválida, nada é gravado e os erros
+        vêm por índice.
+        """
+        rows = request.data.get("transactions") if isinstance(request.data, dict) else request.data
+        if not isinstance(rows, list) or not rows:
+            return Response({"detail": "informe transactions"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(rows) > BULK_CREATE_MAX_ROWS:
+            return Response(
+                {"detail": f"Máximo de {BULK_CREATE_MAX_ROWS} transações por requisição."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        built, errors = build_transactions(request.user, rows)
+        if errors:
+            return Response(
+                {"errors": [{"index": i, "errors": errors[i]} for i in sorted(errors)]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        created = insert_transactions([obj for _, obj in built])
+        return Response(
+            {"created": len(created), "ids": [obj.pk for obj in created]},
+            status=status.HTTP_201_CREATED,
+        )
+
+    @bulk_create.mapping.delete
     def bulk_delete(self, request):
         raw = request.query_params.getlist("id")
         if not raw and isinstance(request.data, dict):
@@ -77,286 +183,107 @@ class TransactionViewSet(viewsets.ModelViewSet):
         qs.delete()
         return Response({"deleted": deleted}, status=status.HTTP_200_OK)
 
-    @action(detail=False, methods=["get"], url_path="stats")
-    def stats(self, request):
-        def month_bounds(y, m):
-            return date(y, m, 1), date(y, m, monthrange(y, m)[1])
-
-        def sum_signed(qs):
-            return qs.aggregate(
-                total=Sum(
-                    Case(
-                        When(type="income", then=F("amount")),
-                        When(type="expense", then=-F("amount")),
-                        output_field=DecimalField(max_digits=14, decimal_places=2),
-                    )
-                )
-            )["total"] or Decimal("0.00")
-
-        def sum_income(qs):
-            return qs.filter(type="income").aggregate(s=Sum("amount"))["s"] or Decimal("0.00")
-
-        def sum_expense(qs):
-            return qs.filter(type="expense").aggregate(s=Sum("amount"))["s"] or Decimal("0.00")
-
-        def pct_change(curr, prev):
-            if prev and prev != Decimal("0"):
-                return float((curr - prev) / prev)
-            return None
-
-        qs_base = exclude_transfers(Transaction.objects.filter(user=request.user, is_archived=False))
-        wallet_id = request.query_params.get("wallet_id")
-        if wallet_id:
-            qs_base = qs_base.filter(wallet_id=wallet_id)
-
-        today = date.today()
-        start, end = month_bounds(today.year, today.month)
-        prev_y, prev_m = (start.year, start.month - 1) if start.month > 1 else (start.year - 1, 12)
-        pstart, pend = month_bounds(prev_y, prev_m)
+    @bulk_create.mapping.patch
+    def bulk_update(self, request):
+        """
+        Altera category, wallet e/ou is_archived de várias transações num único UPDATE.
+        Seleção: {"ids": [...]} no corpo ou os mesmos filtros da listagem na query string.
+        """
+        data = request.data if isinstance(request.data, dict) else {}
+        changes = {}
+
+        if "category" in data:
+            category_id = data.get("category")
+            if category_id is not None:
+                category_exists = str(category_id).isdigit() and Category.objects.filter(
+                    Q(user=request.user) | Q(user__isnull=True), id=category_id, is_archived=False
+                ).exists()
+                if not category_exists:
+                    return Response({"detail": "Categoria não encontrada."}, status=status.HTTP_400_BAD_REQUEST)
+                category_id = int(category_id)
+            changes["category_id"] = category_id
+
+        if "wallet" in data:
+            wallet_id = data.get("wallet")
+            wallet_exists = str(wallet_id or "").isdigit() and Wallet.objects.filter(
+                id=wallet_id, user=request.user, is_archived=False
+            ).exists()
+            if not wallet_exists:
+                return Response({"detail": "Carteira não encontrada ou arquivada."}, status=status.HTTP_400_BAD_REQUEST)
+            changes["wallet_id"] = int(wallet_id)
+
+        if "is_archived" in data:
+            if not isinstance(data["is_archived"], bool):
+                return Response({"detail": "is_archived deve ser booleano."}, status=status.HTTP_400_BAD_REQUEST)
+            changes["is_archived"] = data["is_archived"]
+
+        if not changes:
+            return Response(
+                {"detail": "Informe ao menos um campo: category, wallet ou is_archived."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-        qs_period = qs_base.filter(date__gte=start, date__lte=end)
-        qs_prev = qs_base.filter(date__gte=pstart, date__lte=pend)
+        if "ids" in data:
+            try:
+                ids = [int(x) for x in data.get("ids") or []]
+            except (TypeError, ValueError):
+                return Response({"detail": "ids inválidos"}, status=status.HTTP_400_BAD_REQUEST)
+            if not ids:
+                return Response({"detail": "informe id"}, status=status.HTTP_400_BAD_REQUEST)
+            selected = Transaction.objects.filter(user=request.user, id__in=ids)
+        elif any(name in request.query_params for name in LIST_FILTER_PARAMS):
+            selected = Transaction.objects.filter(
+                user=request.user, pk__in=self.get_queryset().order_by().values("pk")
+            )
+        else:
+            return Response({"detail": "Informe ids ou filtros."}, status=status.HTTP_400_BAD_REQUEST)
 
-        balance_total = sum_signed(qs_base)
-        income_curr = sum_income(qs_period)
-        expense_curr = sum_expense(qs_period)
-        income_prev = sum_income(qs_prev)
-        expense_prev = sum_expense(qs_prev)
+        updated = selected.update(**changes)
+        return Response({"updated": updated}, status=status.HTTP_200_OK)
 
-        wallets_qs = Wallet.objects.filter(user=request.user, is_archived=False)
-        if wallet_id:
-            wallets_qs = wallets_qs.filter(id=wallet_id)
-
-        assets_initial = wallets_qs.exclude(kind=Wallet.Kind.CREDIT).aggregate(s=Sum("initial_balance"))["s"] or Decimal("0.00")
-        credit_initial = wallets_qs.filter(kind=Wallet.Kind.CREDIT).aggregate(s=Sum("initial_balance"))["s"] or Decimal("0.00")
-        opening_base = assets_initial - credit_initial
-
-        net_worth = opening_base + balance_total
-
-        data = {
-            "as_of": today.isoformat(),
-            "period": {"start": start.isoformat(), "end": end.isoformat()},
-            "balance": str(balance_total),
-            "net_worth": str(net_worth),
-            "income": {
-                "current": str(income_curr),
-                "previous": str(income_prev),
-                "change_pct": pct_change(income_curr, income_prev),
-            },
-            "expenses": {
-                "current": str(expense_curr),
-                "previous": str(expense_prev),
-                "change_pct": pct_change(expense_curr, expense_prev),
-            },
-        }
-        return Response(data, status=status.HTTP_200_OK)
+    @action(detail=False, methods=["get"], url_path="stats")
+    @cached_analytics("stats")
+    def stats(self, request):
+        scope = AnalyticsScope(request.user, request.query_params)
+        return Response(stats_data(scope), status=status.HTTP_200_OK)
 
     @action(detail=False, methods=["get"], url_path="monthly")
+    @cached_analytics("monthly")
     def monthly(self, request):
-        months_param = request.query_params.get("months", "6")
-        try:
-            months = max(1, min(24, int(months_param)))
-        except ValueError:
-            months = 6
-
-        base_qs = exclude_transfers(Transaction.objects.filter(user=request.user, is_archived=False))
-        wallet_id = request.query_params.get("wallet_id")
-
-        if wallet_id:
-            base_qs = base_qs.filter(wallet_id=wallet_id)
-
-        today = timezone.localdate()
-        start_month_year = today.year
-        start_month = today.month - (months - 1)
-
-        while start_month <= 0:
-            start_month += 12
-            start_month_year -= 1
-
-        start = date(start_month_year, start_month, 1)
-        end = date(today.year, today.month, monthrange(today.year, today.month)[1])
-
-        grouped = (
-            base_qs.filter(date__gte=start, date__lte=end)
-            .annotate(period=TruncMonth("date"))
-            .values("period")
-            .annotate(
-                income=Sum("amount", filter=Q(type="income")),
-                expenses=Sum("amount", filter=Q(type="expense")),
-            )
-            .order_by("period")
-        )
-
-        by_period = {g["period"].strftime("%Y-%m"): g for g in grouped}
-        labels = ["Jan", "Fev", "Mar", "Abr", "Mai", "Jun", "Jul", "Ago", "Set", "Out", "Nov", "Dez"]
-        out = []
-        y = start.year
-        m = start.month
-
-        for _ in range(months):
-            key = f"{y:04d}-{m:02d}"
-            g = by_period.get(key)
-            inc = g["income"] or Decimal("0.00") if g else Decimal("0.00")
-            exp = g["expenses"] or Decimal("0.00") if g else Decimal("0.00")
-
-            if inc != Decimal("0.00") or exp != Decimal("0.00"):
-                out.append({
-                    "year": y,
-                    "month_num": m,
-                    "month": labels[m - 1],
-                    "income": str(inc),
-                    "expenses": str(exp)
-                })
-
-            m += 1
-
-            if m > 12:
-                m = 1
-                y += 1
-
-        return Response({"months": out}, status=status.HTTP_200_OK)
+        scope = AnalyticsScope(request.user, request.query_params)
+        return Response(monthly_data(scope), status=status.HTTP_200_OK)
 
     @action(detail=False, methods=["get"], url_path="expenses-by-category")
+    @cached_analytics("expenses_by_category")
     def expenses_by_category(self, request):
-        qs = Transaction.objects.filter(user=request.user, is_archived=False, type="expense")
-        wallet_id = request.query_params.get("wallet_id")
-        if wallet_id:
-            qs = qs.filter(wallet_id=wallet_id)
-
-        qs = exclude_transfers(qs)
-
-        y = request.query_params.get("year")
-        m = request.query_params.get("month")
-
-        if y and m:
-            y, m = int(y), int(m)
-            start = date(y, m, 1)
-            end = date(y, m, monthrange(y, m)[1])
-        else:
-            today = date.today()
-            start = date(today.year, today.month, 1)
-            end = date(today.year, today.month, monthrange(today.year, today.month)[1])
-
-        qs = qs.filter(date__gte=start, date__lte=end)
-
-        agg = qs.values("category__name").annotate(total=Sum("amount")).order_by("-total")
-        items = [{"name": (row["category__name"] or "Sem categoria"), "value": str(row["total"] or Decimal("0.00"))} for row in agg]
-        return Response({"items": items, "period": {"start": start.isoformat(), "end": end.isoformat()}}, status=status.HTTP_200_OK)
+        scope = AnalyticsScope(request.user, request.query_params)
+        return Response(expenses_by_category_data(scope), status=status.HTTP_200_OK)
 
     @action(detail=False, methods=["get"], url_path="balance-series")
+    @cached_analytics("balance_series")
     def balance_series(self, request):
-        months_param = request.query_params.get("months", "6")
+        """
+        Sem parâmetros extras: saldo ao fim de cada mês dos últimos ?months.
+        Com ?granularity=day|week|month e/ou ?date_start/?date_end: série
+        calculada no SQL para qualquer intervalo (?per_wallet=1 separa por carteira).
+        """
+        scope = AnalyticsScope(request.user, request.query_params)
+        params = request.query_params
+        if not any(params.get(name) for name in ("granularity", "date_start", "date_end", "per_wallet")):
+            return Response(balance_series_data(scope), status=status.HTTP_200_OK)
         try:
-            months = max(1, min(24, int(months_param)))
-        except ValueError:
-            months = 6
-
-        base_qs = Transaction.objects.filter(user=request.user, is_archived=False)
-        wallet_id = request.query_params.get("wallet_id")
-        if wallet_id:
-            base_qs = base_qs.filter(wallet_id=wallet_id)
-
-        today = timezone.localdate()
-        start_month_year = today.year
-        start_month = today.month - (months - 1)
-        while start_month <= 0:
-            start_month += 12
-            start_month_year -= 1
-
-        start = date(start_month_year, start_month, 1)
-        end = date(today.year, today.month, monthrange(today.year, today.month)[1])
-
-        # saldo de abertura: ativos - crédito
-        wallets_qs = Wallet.objects.filter(user=request.user, is_archived=False)
-        if wallet_id:
-            wallets_qs = wallets_qs.filter(id=wallet_id)
-        assets_initial = wallets_qs.exclude(kind=Wallet.Kind.CREDIT).aggregate(s=Sum("initial_balance"))["s"] or Decimal("0.00")
-        credit_initial = wallets_qs.filter(kind=Wallet.Kind.CREDIT).aggregate(s=Sum("initial_balance"))["s"] or Decimal("0.00")
-        opening_base = assets_initial - credit_initial
-
-        # transações anteriores ao início
-        prior_tx = base_qs.filter(date__lt=start).aggregate(
-            total=Sum(
-                Case(
-                    When(type="income", then=F("amount")),
-                    When(type="expense", then=-F("amount")),
-                    output_field=DecimalField(max_digits=14, decimal_places=2),
-                )
-            )
-        )["total"] or Decimal("0.00")
-
-        prior = opening_base + prior_tx
-
-        grouped = (
-            base_qs.filter(date__gte=start, date__lte=end)
-            .annotate(period=TruncMonth("date"))
-            .values("period")
-            .annotate(
-                delta=Sum(
-                    Case(
-                        When(type="income", then=F("amount")),
-                        When(type="expense", then=-F("amount")),
-                        output_field=DecimalField(max_digits=14, decimal_places=2),
-                    )
-                )
-            )
-            .order_by("period")
-        )
-        by_period = {g["period"].strftime("%Y-%m"): g["delta"] or Decimal("0.00") for g in grouped}
-        labels = ["Jan", "Fev", "Mar", "Abr", "Mai", "Jun", "Jul", "Ago", "Set", "Out", "Nov", "Dez"]
-        out = []
-        running = prior
-        y = start.year
-        m = start.month
-
-        for _ in range(months):
-            key = f"{y:04d}-{m:02d}"
-            running += by_period.get(key, Decimal("0.00"))
-
-            if running != Decimal("0.00"):
-                out.append({"year": y, "month_num": m, "month": labels[m - 1], "balance": str(running)})
-
-            m += 1
-
-            if m > 12:
-                m = 1
-                y += 1
-
-        return Response({"months": out, "opening_balance": str(prior)}, status=status.HTTP_200_OK)
+            data = balance_history_data(scope)
+        except AnalyticsParamError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(data, status=status.HTTP_200_OK)
 
     @action(detail=False, methods=["get"], url_path="income-by-source")
+    @cached_analytics("income_by_source")
     def income_by_source(self, request):
-        qs = Transaction.objects.filter(user=request.user, is_archived=False, type="income")
-        wallet_id = request.query_params.get("wallet_id")
-        if wallet_id:
-            qs = qs.filter(wallet_id=wallet_id)
+        scope = AnalyticsScope(request.user, request.query_params)
+        return Response(income_by_source_data(scope), status=status.HTTP_200_OK)
 
-        qs = exclude_transfers(qs)
-
-        y = request.query_params.get("year")
-        m = request.query_params.get("month")
-        if y and m:
-            y, m = int(y), int(m)
-            start = date(y, m, 1)
-            end = date(y, m, monthrange(y, m)[1])
-        else:
-            today = date.today()
-            start = date(today.year, today.month, 1)
-            end = date(today.year, today.month, monthrange(today.year, today.month)[1])
-        qs = qs.filter(date__gte=start, date__lte=end)
-
-        agg = qs.values("category__name").annotate(total=Sum("amount")).order_by("-total")
-        total_sum = sum((row["total"] or Decimal("0")) for row in agg) or Decimal("0")
-        items = []
-        for row in agg:
-            name = row["category__name"] or "Sem categoria"
-            val = row["total"] or Decimal("0")
-            pct = float((val / total_sum) if total_sum else 0) * 100
-            items.append({"name": name, "value": str(val), "percent": round(pct)})
-        return Response({"items": items, "period": {"start": start.isoformat(), "end": end.isoformat()}}, status=status.HTTP_200_OK)
-
-    @action(detail=False, methods=["get"], url_path="recent")
-    def recent(self, request):
+    def _recent_data(self, request):
         try:
             limit = int(request.query_params.get("limit", "10"))
         except ValueError:
@@ -368,9 +295,75 @@ class TransactionViewSet(viewsets.ModelViewSet):
         if wallet_id:
             qs = qs.filter(wallet_id=wallet_id)
 
-        qs = qs.order_by("-date", "-id")[:limit]
-        ser = self.get_serializer(qs, many=True)
-        return Response(ser.data, status=status.HTTP_200_OK)
+        qs = self.select_fields(qs.order_by("-date", "-id"))[:limit]
+        return self.get_serializer(qs, many=True).data
+
+    @action(detail=False, methods=["get"], url_path="recent")
+    @cached_analytics("recent")
+    def recent(self, request):
+        return Response(self._recent_data(request), status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=["get"], url_path="dashboard")
+    @cached_analytics("dashboard")
+    def dashboard(self, request):
+        """
+        Todas as seções do dashboard em uma única resposta.
+        ?sections=stats,monthly,... limita o que é calculado (padrão: todas).
+        """
+        raw = request.query_params.get("sections")
+        if raw:
+            sections = [s.strip().replace("-", "_") for s in raw.split(",") if s.strip()]
+        else:
+            sections = list(DASHBOARD_SECTIONS)
+
+        unknown = [s for s in sections if s not in DASHBOARD_SECTIONS]
+        if unknown:
+            return Response(
+                {"detail": f"Seções inválidas: {', '.join(unknown)}", "allowed": list(DASHBOARD_SECTIONS)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        scope = AnalyticsScope(request.user, request.query_params)
+        builders = {
+            "stats": lambda: stats_data(scope),
+            "monthly": lambda: monthly_data(scope),
+            "expenses_by_category": lambda: expenses_by_category_data(scope),
+            "income_by_source": lambda: income_by_source_data(scope),
+            "balance_series": lambda: balance_series_data(scope),
+            "recent": lambda: self._recent_data(request),
+            "total_balance": lambda: total_balance_data(request.user, self.get_serializer_context()),
+        }
+        data = {name: builders[name]() for name in DASHBOARD_SECTIONS if name in sections}
+        return Response(data, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=["get"], url_path="export")
+    def export(self, request):
+        """
+        Exporta as transações filtradas (mesmos parâmetros da listagem) em streaming.
+        ?output=csv|jsonl (padrão csv), ?gzip=1 comprime o fluxo.
+        """
+        fmt = request.query_params.get("output", "csv")
+        if fmt not in EXPORT_FORMATS:
+            return Response(
+                {"detail": "Formato inválido.", "allowed": list(EXPORT_FORMATS)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        gzip = request.query_params.get("gzip") in ("true", "1")
+
+        filename = f"transacoes.{fmt}" + (".gz" if gzip else "")
+        if gzip:
+            content_type = "application/gzip"
+        elif fmt == "csv":
+            content_type = "text/csv; charset=utf-8"
+        else:
+            content_type = "application/x-ndjson; charset=utf-8"
+
+        response = StreamingHttpResponse(
+            export_stream(self.get_queryset(), fmt, gzip=gzip),
+            content_type=content_type,
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
 
     @action(detail=False, methods=["post"], url_path="transfer")
     def transfer(self, request):
@@ -379,61 +372,46 @@ class TransactionViewSet(viewsets.ModelViewSet):
         - despesa na carteira de origem
         - receita na carteira de destino
         """
-        user = request.user
-        data = request.data or {}
-        from_wallet_id = data.get("from_wallet_id")
-        to_wallet_id = data.get("to_wallet_id")
-        amount = data.get("amount")
-        date_str = data.get("date")
-        description = (data.get("description") or "Transferência").strip()
-
         try:
-            amount = Decimal(str(amount))
-        except Exception:
-            return Response({"detail": "Valor inválido."}, status=status.HTTP_400_BAD_REQUEST)
+            transfer = parse_transfer(request.data or {})
+        except TransferError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
 
-        if amount <= Decimal("0"):
-            return Response({"detail": "Valor deve ser maior que zero."}, status=status.HTTP_400_BAD_REQUEST)
-
-        if not (from_wallet_id and to_wallet_id):
-            return Response({"detail": "Informe carteiras de origem e destino."}, status=status.HTTP_400_BAD_REQUEST)
-        if str(from_wallet_id) == str(to_wallet_id):
-            return Response({"detail": "Carteiras de origem e destino devem ser diferentes."}, status=status.HTTP_400_BAD_REQUEST)
-
-        try:
-            from_wallet = Wallet.objects.get(id=from_wallet_id, user=user, is_archived=False)
-            to_wallet = Wallet.objects.get(id=to_wallet_id, user=user, is_archived=False)
-        except Wallet.DoesNotExist:
+        wallets = active_wallets(request.user, [transfer])
+        if missing_wallets(transfer, wallets):
             return Response({"detail": "Carteira não encontrada ou arquivada."}, status=status.HTTP_400_BAD_REQUEST)
 
-        try:
-            tx_date = date.fromisoformat(date_str) if date_str else timezone.localdate()
-        except Exception:
-            return Response({"detail": "Data inválida."}, status=status.HTTP_400_BAD_REQUEST)
+        legs = transfer_legs(request.user, transfer, wallets, Category.get_transfer_category())
+        with db_transaction.atomic():
+            t1, t2 = Transaction.objects.bulk_create(legs)
 
-        transfer_cat, _ = Category.objects.get_or_create(
-            user=None, is_system=True, name="Transferência"
-        )
+        ser = self.get_serializer([t1, t2], many=True)
+        return Response({"created": ser.data}, status=status.HTTP_201_CREATED)
 
-        with db_transaction.atomic():
-            t1 = Transaction.objects.create(
-                user=user,
-                wallet=from_wallet,
-                type=Transaction.Type.EXPENSE,
-                category=transfer_cat,
-                amount=amount,
-                date=tx_date,
-                description=description,
+    @action(detail=False, methods=["post"], url_path="transfer/batch")
+    def transfer_batch(self, request):
+        """
+        Várias transferências de uma vez: {"transfers": [{from_wallet_id, to_wallet_id, amount, date?, description?}, ...]}.
+        Tudo ou nada: todas as pernas entram num único bulk_create atômico.
+        """
+        rows = request.data.get("transfers") if isinstance(request.data, dict) else request.data
+        if not isinstance(rows, list) or not rows:
+            return Response({"detail": "Informe transfers."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(rows) > TRANSFER_BATCH_MAX:
+            return Response(
+                {"detail": f"Máximo de {TRANSFER_BATCH_MAX} transferências por requisição."},
+                status=status.HTTP_400_BAD_REQUEST,
             )
-            t2 = Transaction.objects.create(
-                user=user,
-                wallet=to_wallet,
-                type=Transaction.Type.INCOME,
-                category=transfer_cat,
-                amount=amount,
-                date=tx_date,
-                description=description,
+
+        legs, errors = build_transfers(request.user, rows)
+        if errors:
+            return Response(
+                {"errors": [{"index": i, "detail": errors[i]} for i in sorted(errors)]},
+                status=status.HTTP_400_BAD_REQUEST,
             )
 
-        ser = self.get_serializer([t1, t2], many=True)
+        with db_transaction.atomic():
+            created = Transaction.objects.bulk_create(legs)
+
+        ser = self.get_serializer(created, many=True)
         return Response({"created": ser.data}, status=status.HTTP_201_CREATED)
\ No newline at end of file
@@ -4,31 +4,43 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from finance.models import Wallet
 from finance.serializers import WalletSerializer
+from .cache import ConditionalGetMixin, cached_analytics
 from .category import IsOwner, DefaultPagination
 
-class WalletViewSet(viewsets.ModelViewSet):
+def total_balance_data(user, context):
+    # saldos e total saem da mesma consulta (SUM() OVER ())
+    wallets = list(
+        Wallet.objects.filter(user=user, is_archived=False).with_balance(total=True).order_by("name")
+    )
+    serializer = WalletSerializer(wallets, many=True, context=context)
+    total = wallets[0].balance_total if wallets else Decimal("0.00")
+
+    return {
+        "total_balance": str(total),
+        "wallets": serializer.data
+    }
+
+class WalletViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = WalletSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwner]
     pagination_class = DefaultPagination
+    etag_actions = ("list", "retrieve", "total_balance")
 
     def get_queryset(self):
         qs = Wallet.objects.filter(user=self.request.user, is_archived=False)
+        if self.action == "list":
+            # nas escritas a instância muda depois da leitura; o saldo anotado ficaria velho
+            qs = qs.with_balance()
         return qs.order_by("name")
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
     @action(detail=False, methods=["get"], url_path="total-balance")
+    @cached_analytics("total_balance")
     def total_balance(self, request):
-        wallets = self.get_queryset().filter(is_archived=False)
-        serializer = self.get_serializer(wallets, many=True)
-
-        total = sum(Decimal(w["current_balance"]) for w in serializer.data)
-
-        return Response({
-            "total_balance": str(total),
-            "wallets": serializer.data
-        }, status=status.HTTP_200_OK)
+        data = total_balance_data(request.user, self.get_serializer_context())
+        return Response(data, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=["post"], url_path="archive")
     def archive(self, request, pk=None):
@@ -1,6 +1,12 @@
 import { useState, useEffect, useCallback } from "react";
 import { api } from "../lib/api";
 
+const DASHBOARD_QUERY = new URLSearchParams({
+    sections: "stats,monthly,expenses_by_category,balance_series,income_by_source,recent",
+    months: "6",
+    limit: "10"
+}).toString();
+
 export const useDashboardData = () => {
     const [data, setData] = useState({
         stats: null,
@@ -18,74 +24,30 @@ export const useDashboardData = () => {
         error: null
     });
 
-    const fetchStats = useCallback(async () => {
-        try {
-        const res = await api.get("/finance/transactions/stats/");
-
-        if (res.ok) {
-            const stats = await res.json();
-
-            setData(prev => ({
-                ...prev,
-                stats,
-                loading: { ...prev.loading, stats: false }
-            }));
-        }
-        } catch (error) {
-            setData(prev => ({
-                ...prev,
-                error: error.message,
-                loading: { ...prev.loading, stats: false }
-            }));
-        }
-    }, []);
-
-    const fetchChartsData = useCallback(async () => {
+    const fetchDashboard = useCallback(async () => {
         try {
-            const endpoints = [
-                "/finance/transactions/monthly/?months=6",
-                "/finance/transactions/expenses-by-category/",
-                "/finance/transactions/balance-series/?months=6",
-                "/finance/transactions/income-by-source/",
-                "/finance/transactions/recent/?limit=10"
-            ];
-
-            const responses = await Promise.allSettled(
-                endpoints.map(
-                    endpoint => api.get(endpoint).then(res => res.ok ? res.json() : null)
-                )
-            );
-
-            const [monthlyRes, categoriesRes, balanceRes, incomeRes, recentRes] = responses;
+            const res = await api.get(`/finance/transactions/dashboard/?${DASHBOARD_QUERY}`);
+            const payload = res.ok ? await res.json() : {};
 
             const charts = {
-                monthly: monthlyRes.status === 'fulfilled' && monthlyRes.value?.months
-                    ? monthlyRes.value.months
-                    : [],
-                categories: categoriesRes.status === 'fulfilled' && categoriesRes.value?.items
-                    ? categoriesRes.value.items
-                    : [],
-                balance: balanceRes.status === 'fulfilled' && balanceRes.value?.months
-                    ? balanceRes.value.months
-                    : [],
-                incomeSources: incomeRes.status === 'fulfilled' && incomeRes.value?.items
-                    ? incomeRes.value.items
-                    : [],
-                recent: recentRes.status === 'fulfilled' && recentRes.value
-                    ? recentRes.value
-                    : []
+                monthly: payload.monthly?.months ?? [],
+                categories: payload.expenses_by_category?.items ?? [],
+                balance: payload.balance_series?.months ?? [],
+                incomeSources: payload.income_by_source?.items ?? [],
+                recent: payload.recent ?? []
             };
 
             setData(prev => ({
                 ...prev,
+                stats: payload.stats ?? prev.stats,
                 charts,
-                loading: { ...prev.loading, charts: false }
+                loading: { stats: false, charts: false }
             }));
         } catch (error) {
             setData(prev => ({
                 ...prev,
                 error: error.message,
-                loading: { ...prev.loading, charts: false }
+                loading: { stats: false, charts: false }
             }));
         }
     }, []);
@@ -97,14 +59,12 @@ export const useDashboardData = () => {
             error: null
         }));
 
-        fetchStats();
-        fetchChartsData();
-    }, [fetchStats, fetchChartsData]);
+        fetchDashboard();
+    }, [fetchDashboard]);
 
     useEffect(() => {
-        fetchStats();
-        fetchChartsData();
-    }, [fetchStats, fetchChartsData]);
+        fetchDashboard();
+    }, [fetchDashboard]);
 
     return { ...data, refetch };
 };
\ No newline at end of file
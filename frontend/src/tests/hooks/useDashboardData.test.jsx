@@ -29,7 +29,8 @@ describe("useDashboardData", () => {
         });
 
         expect(result.current.loading.charts).toBe(false);
-        expect(api.get).toHaveBeenCalledTimes(6);
+        expect(api.get).toHaveBeenCalledTimes(1);
+        expect(api.get.mock.calls[0][0]).toMatch(/^\/finance\/transactions\/dashboard\/\?sections=/);
     });
 
     it("handles stats error", async () => {
@@ -42,8 +43,28 @@ describe("useDashboardData", () => {
         });
     });
 
+    it("maps dashboard sections into stats and charts", async () => {
+        api.get.mockResolvedValueOnce(mockJson({
+            stats: { net_worth: "10.00" },
+            monthly: { months: [{ month: "Jan" }] },
+            expenses_by_category: { items: [{ name: "Food" }] },
+            recent: [{ id: 1 }],
+        }));
+
+        const { result } = renderHook(() => useDashboardData());
+
+        await waitFor(() => {
+            expect(result.current.loading.charts).toBe(false);
+        });
+
+        expect(result.current.stats).toEqual({ net_worth: "10.00" });
+        expect(result.current.charts.monthly).toEqual([{ month: "Jan" }]);
+        expect(result.current.charts.categories).toEqual([{ name: "Food" }]);
+        expect(result.current.charts.balance).toEqual([]);
+        expect(result.current.charts.recent).toEqual([{ id: 1 }]);
+    });
+
     it("handles charts missing data (ok: false case)", async () => {
-        api.get.mockResolvedValueOnce(mockJson({}));
         api.get.mockResolvedValueOnce({ ok: false });
 
         const { result } = renderHook(() => useDashboardData());
@@ -59,7 +80,7 @@ describe("useDashboardData", () => {
         const { result } = renderHook(() => useDashboardData());
 
         await waitFor(() => {
-            expect(api.get).toHaveBeenCalledTimes(6);
+            expect(api.get).toHaveBeenCalledTimes(1);
         });
 
         act(() => {
@@ -71,7 +92,7 @@ describe("useDashboardData", () => {
         });
 
         await waitFor(() => {
-            expect(api.get).toHaveBeenCalledTimes(12);
+            expect(api.get).toHaveBeenCalledTimes(2);
         });
 
         expect(result.current.error).toBe(null);